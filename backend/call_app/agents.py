@@ -0,0 +1,261 @@
+# CALLI/backend/call_app/agents.py
+#
+# Everything here (Agno, the HF client, dotenv) is imported on first use through
+# call_app.utils.get_agno_app(), never at Django startup.
+
+import os
+import asyncio
+import httpx
+import json
+from agno import Agno
+from agno.agents import Agent
+from agno.tasks import Task, Step
+from dotenv import load_dotenv
+from django.conf import settings # Import settings to access HF_TOKEN from .env
+from .http_client import inference_post
+from .voice_cache import hash_audio_file, voice_clone_cache
+from .audio import UnsupportedAudio, preprocess_voice_sample
+from .retries import enqueue_call_retry
+from .db_router import replica_queryset
+
+# Load environment variables from .env file (if not already loaded by Django's runserver)
+# It's good practice to ensure this is loaded for scripts that might run outside the full Django context
+load_dotenv()
+
+# --- Hugging Face Token ---
+# Django's settings.py should have loaded this from .env if you configured it
+# However, for direct utility usage or if running a script, load_dotenv() is safer.
+# A missing token only fails voice cloning; it must not stop the rest of the app from loading.
+HF_TOKEN = os.environ.get("HF_TOKEN")
+
+# Model used for voice cloning; also part of the voice-clone cache key
+HF_VOICE_CLONING_MODEL_ID = os.environ.get("HF_VOICE_CLONING_MODEL_ID", "YOUR_CHATTERBOX_VOICE_CLONING_MODEL")
+# Inference API host; point it at a self-hosted endpoint or a mock server for load tests
+HF_INFERENCE_API_BASE = os.environ.get("HF_INFERENCE_API_BASE", "https://api-inference.huggingface.co").rstrip("/")
+
+# --- Agno Agents Setup ---
+# Task history is kept by call_app/task_store.py (bounded in memory, persisted in batches),
+# recorded around every run_agno_task call. What Agno keeps of finished tasks depends on its own
+# storage: AGNO_APP_OPTIONS passes constructor options, e.g. a storage backend with retention.
+agno_app = Agno(**getattr(settings, "AGNO_APP_OPTIONS", {}))
+
+# --- Upload streaming helpers ---
+UPLOAD_CHUNK_SIZE = 64 * 1024
+
+def _file_size(f):
+    size = getattr(f, "size", None)
+    if size is None:
+        try:
+            size = os.fstat(f.fileno()).st_size
+        except (AttributeError, OSError, ValueError):
+            return None
+    return size
+
+async def _stream_file(f, chunk_size=UPLOAD_CHUNK_SIZE):
+    f.seek(0)
+    while True:
+        chunk = f.read(chunk_size)
+        if not chunk:
+            break
+        yield chunk
+
+# WAV samples are downmixed, resampled, trimmed and normalized before upload (call_app/audio.py);
+# anything that isn't PCM WAV (e.g. MP3) is streamed to the endpoint as uploaded.
+VOICE_PREPROCESSING_ENABLED = getattr(settings, "VOICE_PREPROCESSING_ENABLED", True)
+
+def _preprocess_upload(f):
+    if not VOICE_PREPROCESSING_ENABLED:
+        return None
+    f.seek(0)
+    header = f.read(12)
+    if header[:4] != b"RIFF" or header[8:12] != b"WAVE":
+        return None
+    f.seek(0)
+    try:
+        return preprocess_voice_sample(f) # Decodes at most VOICE_SAMPLE_MAX_SECONDS from the file
+    except UnsupportedAudio as e:
+        print(f"Uploading voice sample unprocessed: {e}")
+        return None
+
+# --- Define Agno Agents ---
+
+class VoiceCloningAgent(Agent):
+    name = "VoiceCloningAgent"
+    description = "Handles voice cloning using Hugging Face models."
+
+    @agno_app.agent_step
+    async def clone_voice_hf(self, audio_file_path: str = None, audio_file=None):
+        # Accepts either a path on disk or an open file-like upload (e.g. a Django UploadedFile);
+        # either way the audio is streamed to the endpoint in chunks rather than read into memory.
+        source = audio_file_path or getattr(audio_file, "name", "upload")
+        # This is a placeholder. Actual Hugging Face API interaction is more complex.
+        # For Chatterbox, you'd be interacting with their specific API or model.
+        print(f"Attempting to clone voice from: {source} using HF_TOKEN...")
+        if not HF_TOKEN:
+            return {"status": "failed", "error": "HF_TOKEN environment variable not set. Please set it to your Hugging Face API token."}
+        try:
+            headers = {"Authorization": f"Bearer {HF_TOKEN}"}
+            # Set HF_VOICE_CLONING_MODEL_ID to the Hugging Face model for your chosen TTS/voice cloning model
+            # For a more robust solution, research specific HF models for voice cloning (e.g., SpeechT5)
+            # and their API usage. Chatterbox might be a separate service or model you need to host.
+            HF_VOICE_CLONING_INFERENCE_API_URL = f"{HF_INFERENCE_API_BASE}/models/{HF_VOICE_CLONING_MODEL_ID}"
+
+            if audio_file is None:
+                audio_file = open(audio_file_path, "rb")
+                close_after = True
+            else:
+                close_after = False
+            try:
+                # Re-uploads of the same sample are answered from the content-addressed cache
+                content_hash = await asyncio.to_thread(hash_audio_file, audio_file)
+                cached_voice_id = await voice_clone_cache.aget(content_hash, HF_VOICE_CLONING_MODEL_ID)
+                if cached_voice_id is not None:
+                    print(f"Voice clone cache hit for {content_hash[:12]}")
+                    return {"status": "success", "voice_id": cached_voice_id, "cached": True}
+
+                # Mono, model-rate, trimmed samples are a fraction of the raw upload
+                processed = await asyncio.to_thread(_preprocess_upload, audio_file)
+                if processed is not None:
+                    headers["Content-Type"] = "audio/wav"
+                    headers["Content-Length"] = str(len(processed))
+                    content = processed
+                else:
+                    size = _file_size(audio_file)
+                    if size is not None:
+                        headers["Content-Length"] = str(size) # Avoids chunked transfer encoding
+                    # The body factory rewinds the file so a retried request streams it again from the start
+                    content = lambda: _stream_file(audio_file)
+                # Pooled, non-blocking client with timeouts and retries (see call_app/http_client.py)
+                response = await inference_post(
+                    HF_VOICE_CLONING_INFERENCE_API_URL,
+                    headers=headers,
+                    content=content,
+                )
+            finally:
+                if close_after:
+                    audio_file.close()
+            response.raise_for_status()
+            voice_id = response.json().get("voice_id", "simulated_voice_id_123")
+            await voice_clone_cache.aset(content_hash, HF_VOICE_CLONING_MODEL_ID, voice_id)
+            return {"status": "success", "voice_id": voice_id, "cached": False}
+        except (httpx.HTTPError, OSError) as e:
+            print(f"Hugging Face voice cloning error: {e}")
+            return {"status": "failed", "error": str(e)}
+
+class CallAgent(Agent):
+    name = "CallAgent"
+    description = "Manages outbound calls and updates booking status."
+
+    @agno_app.agent_step
+    async def make_outbound_call(self, booking_id: int, guest_name: str, phone_number: str, call_type: str, room_number: str):
+        from call_app.models import Booking, CallLog
+        from django.utils import timezone # For Django DateTimeField
+
+        print(f"Simulating {call_type} call to {guest_name} ({phone_number}) for Room {room_number}")
+
+        duration = 60
+        status = "completed"
+        call_made = False # Set once the call is logged; a failure after that must not dial again
+
+        try:
+            booking = await Booking.objects.aget(id=booking_id) # Using async ORM methods
+            new_call_log = CallLog(
+                booking=booking,
+                guest_name=guest_name,
+                phone_number=phone_number,
+                call_type=call_type,
+                status=status,
+                duration=duration,
+                timestamp=timezone.now(), # Use timezone.now() for DateTimeField
+                audio_file=f"simulated_call_{booking_id}_{call_type}.mp3"
+            )
+            await new_call_log.asave() # Using async ORM methods
+            call_made = True
+
+            if call_type == "confirmation":
+                booking.confirmation_call_made = True
+                await booking.asave(update_fields=["confirmation_call_made"]) # Write only the flag, not the whole row
+            elif call_type == "survey":
+                booking.survey_completed = True
+                await booking.asave(update_fields=["survey_completed"])
+
+            return {"status": "success", "call_log_id": new_call_log.id, "booking_updated": True}
+        except Booking.DoesNotExist:
+            print(f"Booking with ID {booking_id} not found.")
+            return {"status": "failed", "error": f"Booking {booking_id} not found."}
+        except Exception as e:
+            print(f"Error during call simulation and logging: {e}")
+            failure = {"status": "failed", "error": str(e)}
+            if call_made:
+                # Only the booking update failed: the guest has had the call, and dialling again
+                # would ring them twice, so this one isn't retried automatically
+                failure["call_may_have_been_placed"] = True
+                return failure
+            # Transient failures go to the retry queue (backoff, capped attempts) instead of being dropped
+            try:
+                retry = await enqueue_call_retry(booking_id, call_type, str(e))
+                failure["retry_id"] = retry.id
+                failure["next_attempt_at"] = retry.next_attempt_at.isoformat()
+            except Exception as retry_error:
+                print(f"Could not queue a retry for booking {booking_id}: {retry_error}")
+            return failure
+
+
+class BookingManagementAgent(Agent):
+    name = "BookingManagementAgent"
+    description = "Handles booking-related automation and reminders."
+
+    # Fields each selection returns when the caller doesn't pass `fields`
+    PENDING_CONFIRMATION_FIELDS = ["id", "guest_name", "phone_number", "check_in_date", "room_number"]
+    RECENT_CHECKOUT_FIELDS = ["id", "guest_name", "phone_number", "check_out_date"]
+
+    @staticmethod
+    async def _booking_rows(queryset, fields, limit):
+        # Only the requested columns are selected, and the limit is applied in SQL. These are
+        # read-only selections, so they go to the read replica when one is configured.
+        queryset = replica_queryset(queryset.order_by("id").values(*fields))
+        if limit:
+            queryset = queryset[:limit]
+        rows = []
+        async for row in queryset:
+            for date_field in ("check_in_date", "check_out_date"):
+                if date_field in row:
+                    row[date_field] = str(row[date_field])
+            rows.append(row)
+        return rows
+
+    @agno_app.agent_step
+    async def check_pending_confirmations(self, date=None, date_from=None, date_to=None, limit=None, fields=None):
+        from call_app.models import Booking
+        from datetime import date as date_cls
+
+        # Find bookings where check-in is in the near future and confirmation call not made.
+        # By default: check-in date is today or in the future. `date` selects one check-in day
+        # (e.g. tomorrow for the daily confirmation run); date_from/date_to narrow the window.
+        if date:
+            date_from = date_to = date
+        pending_bookings_queryset = Booking.objects.pending_confirmation(date_from or date_cls.today())
+        if date_to:
+            pending_bookings_queryset = pending_bookings_queryset.filter(check_in_date__lte=date_to)
+        return await self._booking_rows(pending_bookings_queryset, fields or self.PENDING_CONFIRMATION_FIELDS, limit)
+
+    @agno_app.agent_step
+    async def get_recent_checkouts_for_survey(self, date=None, date_from=None, date_to=None, limit=None, fields=None):
+        from call_app.models import Booking
+        from datetime import date as date_cls, timedelta
+
+        current_date = date_cls.today()
+        # By default: checked out within the last 7 days (up to and including today) and survey
+        # not completed. `date` selects one check-out day (e.g. two days ago for the survey run).
+        if date:
+            date_from = date_to = date
+        since = date_from or current_date - timedelta(days=7)
+        until = date_to or current_date
+        recent_checkouts_queryset = Booking.objects.due_for_survey(since, until)
+        return await self._booking_rows(recent_checkouts_queryset, fields or self.RECENT_CHECKOUT_FIELDS, limit)
+
+AGENT_CLASSES = {
+    VoiceCloningAgent.name: VoiceCloningAgent,
+    CallAgent.name: CallAgent,
+    BookingManagementAgent.name: BookingManagementAgent,
+}
@@ -0,0 +1,123 @@
+# CALLI/backend/call_app/analytics.py
+
+from collections import defaultdict
+
+from django.conf import settings
+from django.db import IntegrityError, transaction
+from django.db.models import Count, F, Q, Sum
+from django.db.models.functions import Coalesce, TruncDate
+from django.utils import timezone
+
+from .models import CallDailyStat, CallLog
+
+# Call statuses that count as answered for the answer rate
+CALL_ANSWERED_STATUSES = getattr(settings, "CALL_ANSWERED_STATUSES", ["completed"])
+
+
+# --- Incremental maintenance ---
+
+def _deltas(call_logs, sign):
+    deltas = defaultdict(lambda: [0, 0, 0]) # (day, call_type, status) -> [calls, timed, duration]
+    for log in call_logs:
+        delta = deltas[(timezone.localdate(log.timestamp), log.call_type, log.status)]
+        delta[0] += sign
+        if log.duration is not None:
+            delta[1] += sign
+            delta[2] += sign * log.duration
+    return deltas
+
+
+def _apply(deltas):
+    # One UPDATE per (day, call_type, status) touched, an INSERT only for a new bucket
+    for (day, call_type, status), (calls, timed, duration) in deltas.items():
+        bucket = CallDailyStat.objects.filter(day=day, call_type=call_type, status=status)
+        changes = {
+            "call_count": F("call_count") + calls,
+            "timed_count": F("timed_count") + timed,
+            "total_duration": F("total_duration") + duration,
+        }
+        if bucket.update(**changes):
+            if calls < 0:
+                bucket.filter(call_count__lte=0).delete() # Drop buckets whose calls were all deleted
+            continue
+        if calls <= 0:
+            continue
+        try:
+            with transaction.atomic():
+                CallDailyStat.objects.create(
+                    day=day, call_type=call_type, status=status,
+                    call_count=calls, timed_count=timed, total_duration=duration,
+                )
+        except IntegrityError:
+            bucket.update(**changes) # Another writer created the bucket first
+
+
+def record_calls(call_logs):
+    """Add newly logged calls to the daily rollup. Call inside the transaction that saved them."""
+    _apply(_deltas(call_logs, 1))
+
+
+def forget_calls(call_logs):
+    """Remove deleted calls from the daily rollup."""
+    _apply(_deltas(call_logs, -1))
+
+
+def call_log_saved(sender, instance, created, raw=False, **kwargs):
+    if created and not raw:
+        record_calls([instance])
+
+
+def call_log_deleted(sender, instance, **kwargs):
+    forget_calls([instance])
+
+
+def rebuild_call_stats(date_from=None, date_to=None):
+    """Recompute the rollup from CallLog with one grouped query. Returns the buckets written."""
+    logs = CallLog.objects.annotate(day=TruncDate("timestamp"))
+    stats = CallDailyStat.objects.all()
+    if date_from:
+        logs, stats = logs.filter(day__gte=date_from), stats.filter(day__gte=date_from)
+    if date_to:
+        logs, stats = logs.filter(day__lte=date_to), stats.filter(day__lte=date_to)
+    rows = logs.values("day", "call_type", "status").annotate(
+        call_count=Count("id"),
+        timed_count=Count("duration"),
+        total_duration=Coalesce(Sum("duration"), 0),
+    ).order_by()
+    with transaction.atomic():
+        stats.delete()
+        CallDailyStat.objects.bulk_create([CallDailyStat(**row) for row in rows], batch_size=1000)
+    return stats.count()
+
+
+# --- Reporting ---
+
+def _summarise(row):
+    row["answer_rate"] = round(row["answered"] / row["calls"], 4) if row["calls"] else None
+    row["avg_duration"] = round(row["total_duration"] / row["timed"], 2) if row["timed"] else None
+    del row["timed"]
+    return row
+
+
+def call_stats(date_from=None, date_to=None, call_type=None, status=None, group_by=("day",)):
+    """Call counts, answer rate and duration stats from the rollup, grouped by any of
+    day/call_type/status. Reads only CallDailyStat, never the call log itself."""
+    stats = CallDailyStat.objects.all()
+    if date_from:
+        stats = stats.filter(day__gte=date_from)
+    if date_to:
+        stats = stats.filter(day__lte=date_to)
+    if call_type:
+        stats = stats.filter(call_type=call_type)
+    if status:
+        stats = stats.filter(status=status)
+
+    measures = {
+        "calls": Coalesce(Sum("call_count"), 0),
+        "answered": Coalesce(Sum("call_count", filter=Q(status__in=CALL_ANSWERED_STATUSES)), 0),
+        "timed": Coalesce(Sum("timed_count"), 0),
+        "total_duration": Coalesce(Sum("total_duration"), 0),
+    }
+    group_by = list(group_by)
+    rows = [_summarise(row) for row in stats.values(*group_by).annotate(**measures).order_by(*group_by)] if group_by else []
+    return {"group_by": group_by, "rows": rows, "totals": _summarise(stats.aggregate(**measures))}
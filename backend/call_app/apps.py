@@ -4,3 +4,25 @@ from django.apps import AppConfig
 class CallAppConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'call_app'
+
+    def ready(self):
+        from django.db.backends.signals import connection_created
+        from django.db.models.signals import post_delete, post_save
+
+        from .analytics import call_log_deleted, call_log_saved
+        from .metrics import METRICS_ENABLED, instrument_connection
+        from .models import Booking, CallLog
+        from .read_cache import invalidate_read_cache
+
+        # Any booking or call log write invalidates the cached dashboard reads
+        for model in (Booking, CallLog):
+            post_save.connect(invalidate_read_cache, sender=model, dispatch_uid=f"read-cache-save-{model.__name__}")
+            post_delete.connect(invalidate_read_cache, sender=model, dispatch_uid=f"read-cache-delete-{model.__name__}")
+
+        # Keep the daily call rollup in step with the call log
+        post_save.connect(call_log_saved, sender=CallLog, dispatch_uid="call-daily-stat-save")
+        post_delete.connect(call_log_deleted, sender=CallLog, dispatch_uid="call-daily-stat-delete")
+
+        # Time every database query for /metrics (per request and per connection alias)
+        if METRICS_ENABLED:
+            connection_created.connect(instrument_connection, dispatch_uid="metrics-db-queries")
@@ -0,0 +1,81 @@
+# CALLI/backend/call_app/async_api.py
+#
+# A small native-async counterpart of DRF's @api_view for the agent endpoints. DRF dispatch is
+# synchronous, so an `async def` under @api_view never gets awaited; these views are plain
+# Django async views instead, running on the ASGI event loop from request to response.
+
+import functools
+import json
+
+from asgiref.sync import sync_to_async
+from django.core.exceptions import RequestDataTooBig
+from django.core.serializers.json import DjangoJSONEncoder
+from django.http import JsonResponse
+from django.http.multipartparser import MultiPartParserError
+from django.views.decorators.csrf import csrf_exempt
+from rest_framework import serializers
+
+
+class JSONResponse(JsonResponse):
+    """JSON response with DRF Response's call signature: JSONResponse(data, status=..., headers=...)."""
+
+    def __init__(self, data=None, status=200, headers=None):
+        super().__init__(data, encoder=DjangoJSONEncoder, safe=False, status=status, headers=headers)
+
+
+class UnsupportedMediaType(Exception):
+    pass
+
+
+async def _parse_body(request):
+    content_type = request.content_type or ""
+    if content_type.startswith(("multipart/form-data", "application/x-www-form-urlencoded")):
+        # Form parsing writes large uploads to temp files, so it runs off the event loop
+        return await sync_to_async(lambda: request.POST, thread_sensitive=False)()
+    if not request.body:
+        return {}
+    if content_type == "application/json" or content_type.endswith("+json"):
+        return json.loads(request.body)
+    raise UnsupportedMediaType(f"Unsupported media type {content_type!r}.")
+
+
+def async_api_view(methods):
+    """Decorate an ``async def view(request, ...)`` as a native async JSON endpoint.
+
+    Like @api_view, the request gets ``data`` (parsed JSON or form data) and ``query_params``,
+    other methods get a 405, bad bodies a 400 (413 if too large, 415 for unknown types) and
+    serializer ValidationErrors a 400 with their details. Views return a JSONResponse (or any
+    HttpResponse).
+    """
+    allowed = [method.upper() for method in methods]
+
+    def decorator(view):
+        @csrf_exempt
+        @functools.wraps(view)
+        async def wrapper(request, *args, **kwargs):
+            if request.method not in allowed:
+                return JSONResponse(
+                    {"detail": f'Method "{request.method}" not allowed.'},
+                    status=405, headers={"Allow": ", ".join(allowed)},
+                )
+            request.query_params = request.GET
+            # Same statuses as DRF's parsers: 400 for a body that can't be parsed, 413 past
+            # DATA_UPLOAD_MAX_MEMORY_SIZE, 415 for a content type with no parser
+            try:
+                request.data = await _parse_body(request) if request.method in ("POST", "PUT", "PATCH") else {}
+            except (json.JSONDecodeError, UnicodeDecodeError) as e:
+                return JSONResponse({"detail": f"JSON parse error - {e}"}, status=400)
+            except MultiPartParserError as e:
+                return JSONResponse({"detail": f"Multipart form parse error - {e}"}, status=400)
+            except RequestDataTooBig as e:
+                return JSONResponse({"detail": str(e)}, status=413)
+            except UnsupportedMediaType as e:
+                return JSONResponse({"detail": str(e)}, status=415)
+            try:
+                return await view(request, *args, **kwargs)
+            except serializers.ValidationError as e:
+                return JSONResponse(e.detail, status=400)
+
+        return wrapper
+
+    return decorator
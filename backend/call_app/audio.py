@@ -0,0 +1,171 @@
+# CALLI/backend/call_app/audio.py
+#
+# Voice sample preprocessing before upload to the voice cloning endpoint. Every stage is a
+# whole-array NumPy operation; nothing loops over samples in Python.
+
+import io
+import wave
+
+import numpy as np
+from numpy.lib.stride_tricks import sliding_window_view
+from django.conf import settings
+
+# --- Preprocessing settings (overridable in settings.py) ---
+VOICE_SAMPLE_RATE = getattr(settings, "VOICE_SAMPLE_RATE", 16000) # Hz expected by the cloning model
+VOICE_SAMPLE_MAX_SECONDS = getattr(settings, "VOICE_SAMPLE_MAX_SECONDS", 30)
+VOICE_SILENCE_THRESHOLD_DB = getattr(settings, "VOICE_SILENCE_THRESHOLD_DB", -45.0) # dBFS per frame
+VOICE_TARGET_LOUDNESS_DB = getattr(settings, "VOICE_TARGET_LOUDNESS_DB", -20.0) # RMS dBFS
+VOICE_PEAK_CEILING_DB = getattr(settings, "VOICE_PEAK_CEILING_DB", -1.0)
+
+FRAME_SECONDS = 0.02 # Silence detection resolution
+SILENCE_PADDING_SECONDS = 0.1 # Kept around the voiced part so onsets aren't clipped
+RESAMPLE_FILTER_TAPS = 63
+RESAMPLE_BLOCK = 65536 # output samples per matrix product (bounds the temporary window copy)
+
+
+class UnsupportedAudio(ValueError):
+    """The sample can't be decoded here (e.g. MP3); callers upload it unprocessed."""
+
+
+def _db_to_gain(db):
+    return 10.0 ** (db / 20.0)
+
+
+# --- Decoding / encoding ---
+
+def decode_wav(source, max_seconds=None):
+    """PCM WAV bytes or binary file -> (float32 array of shape (frames, channels) in [-1, 1], sample rate).
+
+    With ``max_seconds``, only that much audio is read from the source, so the memory used
+    doesn't depend on the size of the upload.
+    """
+    if isinstance(source, (bytes, bytearray, memoryview)):
+        source = io.BytesIO(source)
+    try:
+        with wave.open(source) as wav:
+            channels, width, rate = wav.getnchannels(), wav.getsampwidth(), wav.getframerate()
+            frames = wav.getnframes()
+            if max_seconds is not None:
+                frames = min(frames, int(rate * max_seconds))
+            raw = wav.readframes(frames)
+    except (wave.Error, EOFError) as e:
+        raise UnsupportedAudio(f"Not a PCM WAV file: {e}") from e
+
+    if width == 1:
+        samples = (np.frombuffer(raw, dtype=np.uint8).astype(np.float32) - 128.0) / 128.0
+    elif width == 2:
+        samples = np.frombuffer(raw, dtype="<i2").astype(np.float32) / 32768.0
+    elif width == 3:
+        # 24-bit: widen each little-endian triple to int32 by placing it in the top three bytes
+        triples = np.frombuffer(raw, dtype=np.uint8).reshape(-1, 3)
+        widened = np.zeros((len(triples), 4), dtype=np.uint8)
+        widened[:, 1:] = triples
+        samples = widened.view("<i4").ravel().astype(np.float32) / 2147483648.0
+    elif width == 4:
+        samples = np.frombuffer(raw, dtype="<i4").astype(np.float32) / 2147483648.0
+    else:
+        raise UnsupportedAudio(f"Unsupported sample width: {width} bytes")
+    return samples.reshape(-1, channels), rate
+
+
+def encode_wav(samples, rate):
+    """Mono float array -> 16-bit PCM WAV bytes."""
+    pcm = (np.clip(samples, -1.0, 1.0) * 32767.0).astype("<i2")
+    buffer = io.BytesIO()
+    with wave.open(buffer, "wb") as wav:
+        wav.setnchannels(1)
+        wav.setsampwidth(2)
+        wav.setframerate(rate)
+        wav.writeframes(pcm.tobytes())
+    return buffer.getvalue()
+
+
+# --- Stages ---
+
+def downmix(samples):
+    # A matrix-vector product is several times faster than mean(axis=1) over interleaved channels
+    if samples.ndim == 1:
+        return samples
+    if samples.shape[1] == 1:
+        return samples[:, 0]
+    return samples @ np.full(samples.shape[1], 1.0 / samples.shape[1], dtype=np.float32)
+
+
+def _lowpass_taps(cutoff):
+    # Windowed-sinc FIR; cutoff as a fraction of the input sample rate
+    n = np.arange(RESAMPLE_FILTER_TAPS) - (RESAMPLE_FILTER_TAPS - 1) / 2
+    taps = 2 * cutoff * np.sinc(2 * cutoff * n) * np.hamming(RESAMPLE_FILTER_TAPS)
+    return (taps / taps.sum()).astype(np.float32)
+
+
+def resample(samples, rate, target_rate=VOICE_SAMPLE_RATE):
+    """Band-limited resampling that only evaluates the filter at the output positions.
+
+    When downsampling, each output sample is a low-pass FIR applied to the input window around
+    it (so nothing aliases), computed as one matrix product per block of outputs instead of
+    filtering every input sample. Integer ratios (48 kHz -> 16 kHz) take a single strided product.
+    """
+    if rate == target_rate or len(samples) == 0:
+        return samples
+    length = int(len(samples) * target_rate / rate)
+    taps = _lowpass_taps(target_rate / rate / 2) if target_rate < rate else np.ones(1, dtype=np.float32)
+    half = len(taps) // 2
+    windows = sliding_window_view(np.pad(samples, (half, half + 1)), len(taps))
+    if rate % target_rate == 0:
+        return windows[::rate // target_rate][:length] @ taps
+
+    # Fractional ratio: filter at the two neighbouring input samples and interpolate between them
+    positions = np.arange(length) * (rate / target_rate)
+    output = np.empty(length, dtype=np.float32)
+    for start in range(0, length, RESAMPLE_BLOCK):
+        block = positions[start:start + RESAMPLE_BLOCK]
+        index = block.astype(np.intp)
+        fraction = (block - index).astype(np.float32)
+        before, after = windows[index] @ taps, windows[index + 1] @ taps
+        output[start:start + RESAMPLE_BLOCK] = before + (after - before) * fraction
+    return output
+
+
+def trim_silence(samples, rate, threshold_db=VOICE_SILENCE_THRESHOLD_DB):
+    frame = max(1, int(rate * FRAME_SECONDS))
+    frames = len(samples) // frame
+    if frames == 0:
+        return samples
+    rms = np.sqrt(np.mean(samples[:frames * frame].reshape(frames, frame) ** 2, axis=1))
+    voiced = np.flatnonzero(rms > _db_to_gain(threshold_db))
+    if len(voiced) == 0:
+        return samples[:0]
+    padding = int(rate * SILENCE_PADDING_SECONDS)
+    start = max(0, voiced[0] * frame - padding)
+    end = min(len(samples), (voiced[-1] + 1) * frame + padding)
+    return samples[start:end]
+
+
+def normalize_loudness(samples, target_db=VOICE_TARGET_LOUDNESS_DB, ceiling_db=VOICE_PEAK_CEILING_DB):
+    """Scale to the target RMS level, but never so far that peaks pass the ceiling."""
+    if len(samples) == 0:
+        return samples
+    rms = float(np.sqrt(np.mean(samples ** 2)))
+    peak = float(np.max(np.abs(samples)))
+    if rms == 0.0:
+        return samples
+    gain = min(_db_to_gain(target_db) / rms, _db_to_gain(ceiling_db) / peak)
+    return (samples * gain).astype(np.float32)
+
+
+def preprocess_voice_sample(source, target_rate=VOICE_SAMPLE_RATE, max_seconds=VOICE_SAMPLE_MAX_SECONDS):
+    """Raw WAV bytes or binary file -> mono, resampled, trimmed, normalized, length-capped 16-bit WAV bytes.
+
+    Only the first ``max_seconds`` of the recording are decoded. Raises UnsupportedAudio for
+    formats that can't be decoded here (MP3 and other non-PCM data), and for samples that are
+    silent throughout.
+    """
+    samples, rate = decode_wav(source, max_seconds)
+    samples = downmix(samples)
+    # Trimming first means only the audio that is kept gets resampled
+    samples = trim_silence(samples, rate)
+    if len(samples) == 0:
+        raise UnsupportedAudio("The sample contains no audible speech.")
+    samples = resample(samples, rate, target_rate)
+    samples = normalize_loudness(samples)
+    return encode_wav(samples, target_rate)
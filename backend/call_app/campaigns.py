@@ -0,0 +1,96 @@
+# CALLI/backend/call_app/campaigns.py
+
+import asyncio
+import time
+
+from django.conf import settings
+
+from .models import Booking
+from .utils import run_agno_task
+
+# Default and upper bound for how many calls a campaign dials at once.
+# Both can be overridden in settings.py.
+DEFAULT_CAMPAIGN_CONCURRENCY = getattr(settings, "CALL_CAMPAIGN_CONCURRENCY", 10)
+MAX_CAMPAIGN_CONCURRENCY = getattr(settings, "CALL_CAMPAIGN_MAX_CONCURRENCY", 50)
+
+
+def select_campaign_bookings(call_type, booking_ids=None, date_from=None, date_to=None):
+    """Build the queryset of bookings a campaign should dial."""
+    queryset = Booking.objects.all()
+    if booking_ids:
+        return queryset.filter(id__in=booking_ids).order_by("id")
+
+    # Confirmation calls are keyed on the check-in date, surveys on the check-out date.
+    # Bookings that already had this call are skipped.
+    if call_type == "confirmation":
+        queryset = queryset.filter(confirmation_call_made=False)
+        date_field = "check_in_date"
+    elif call_type == "survey":
+        queryset = queryset.filter(survey_completed=False)
+        date_field = "check_out_date"
+    else:
+        date_field = "check_in_date"
+
+    if date_from:
+        queryset = queryset.filter(**{f"{date_field}__gte": date_from})
+    if date_to:
+        queryset = queryset.filter(**{f"{date_field}__lte": date_to})
+    return queryset.order_by("id")
+
+
+async def dial_booking(booking, call_type, semaphore):
+    async with semaphore:
+        try:
+            task_result = await run_agno_task(
+                task_name=f"Outbound {call_type} Call",
+                description=f"Initiate an outbound {call_type} call to {booking.guest_name}",
+                agent_name="CallAgent",
+                action="make_outbound_call",
+                args={
+                    "booking_id": booking.id,
+                    "guest_name": booking.guest_name,
+                    "phone_number": booking.phone_number,
+                    "call_type": call_type,
+                    "room_number": booking.room_number,
+                },
+            )
+        except Exception as e:
+            return {"booking_id": booking.id, "status": "failed", "error": str(e)}
+
+    if task_result.status == "completed":
+        return {"booking_id": booking.id, **task_result.output}
+    return {"booking_id": booking.id, "status": "failed", "error": str(task_result.error)}
+
+
+async def run_call_campaign(call_type, booking_ids=None, date_from=None, date_to=None, concurrency=None):
+    """Dial every selected booking with at most `concurrency` calls in flight.
+
+    Returns the per-booking results (in booking id order) and an aggregate summary.
+    """
+    concurrency = max(1, min(concurrency or DEFAULT_CAMPAIGN_CONCURRENCY, MAX_CAMPAIGN_CONCURRENCY))
+    queryset = select_campaign_bookings(call_type, booking_ids, date_from, date_to)
+    bookings = [booking async for booking in queryset]
+
+    started = time.perf_counter()
+    semaphore = asyncio.Semaphore(concurrency)
+    results = await asyncio.gather(*(dial_booking(b, call_type, semaphore) for b in bookings))
+    elapsed = time.perf_counter() - started
+
+    # Explicitly requested ids that do not exist are reported rather than silently dropped.
+    if booking_ids:
+        found = {b.id for b in bookings}
+        results += [
+            {"booking_id": booking_id, "status": "failed", "error": f"Booking {booking_id} not found."}
+            for booking_id in dict.fromkeys(booking_ids) if booking_id not in found
+        ]
+
+    succeeded = sum(1 for r in results if r.get("status") == "success")
+    summary = {
+        "call_type": call_type,
+        "total": len(results),
+        "succeeded": succeeded,
+        "failed": len(results) - succeeded,
+        "concurrency": concurrency,
+        "duration_seconds": round(elapsed, 3),
+    }
+    return {"summary": summary, "results": results}
@@ -0,0 +1,69 @@
+# CALLI/backend/call_app/db_router.py
+
+import contextvars
+from contextlib import contextmanager
+
+from django.conf import settings
+from django.db import connections, router
+
+REPLICA_DB_ALIAS = getattr(settings, "REPLICA_DB_ALIAS", "replica")
+
+_use_replica = contextvars.ContextVar("call_app_use_replica", default=False)
+_use_primary = contextvars.ContextVar("call_app_use_primary", default=False)
+
+
+@contextmanager
+def read_from_replica():
+    """Route reads inside the block to the replica alias (when one is configured).
+
+    A context variable rather than a thread-local, so it follows the code into the async ORM's
+    sync_to_async threads.
+    """
+    token = _use_replica.set(True)
+    try:
+        yield
+    finally:
+        _use_replica.reset(token)
+
+
+@contextmanager
+def read_from_primary():
+    """Keep every read inside the block on 'default', even those marked read_from_replica(),
+    for results that must not lag behind the latest write."""
+    token = _use_primary.set(True)
+    try:
+        yield
+    finally:
+        _use_primary.reset(token)
+
+
+def replica_queryset(queryset):
+    """Pin a read-only queryset to the replica now, so it stays there even when it is evaluated
+    later (e.g. by a streaming response) outside the read_from_replica() block."""
+    with read_from_replica():
+        return queryset.using(router.db_for_read(queryset.model))
+
+
+class ReadReplicaRouter:
+    """Sends reads marked with read_from_replica() to REPLICA_DB_ALIAS; everything else, and
+    every write and migration, uses 'default'.
+
+    Reads stay on 'default' inside a transaction on it, so code that reads its own uncommitted
+    writes keeps working.
+    """
+
+    def db_for_read(self, model, **hints):
+        if not _use_replica.get() or _use_primary.get() or REPLICA_DB_ALIAS not in settings.DATABASES:
+            return None
+        if connections["default"].in_atomic_block:
+            return None
+        return REPLICA_DB_ALIAS
+
+    def db_for_write(self, model, **hints):
+        return "default"
+
+    def allow_relation(self, obj1, obj2, **hints):
+        return True # Replica and primary hold the same data
+
+    def allow_migrate(self, db, app_label, model_name=None, **hints):
+        return db != REPLICA_DB_ALIAS
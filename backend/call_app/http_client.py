@@ -0,0 +1,132 @@
+# CALLI/backend/call_app/http_client.py
+
+import asyncio
+import random
+import time
+import weakref
+from urllib.parse import urlsplit
+
+import httpx
+from django.conf import settings
+
+from .metrics import OUTBOUND_HTTP_DURATION, OUTBOUND_HTTP_RETRIES
+
+# --- Outbound inference HTTP settings (overridable in settings.py) ---
+INFERENCE_MAX_CONNECTIONS = getattr(settings, "INFERENCE_MAX_CONNECTIONS", 20)
+INFERENCE_MAX_KEEPALIVE = getattr(settings, "INFERENCE_MAX_KEEPALIVE", 10)
+INFERENCE_KEEPALIVE_EXPIRY = getattr(settings, "INFERENCE_KEEPALIVE_EXPIRY", 30.0)
+INFERENCE_CONNECT_TIMEOUT = getattr(settings, "INFERENCE_CONNECT_TIMEOUT", 5.0)
+INFERENCE_TIMEOUT = getattr(settings, "INFERENCE_TIMEOUT", 60.0)
+INFERENCE_MAX_RETRIES = getattr(settings, "INFERENCE_MAX_RETRIES", 3)
+INFERENCE_BACKOFF_BASE = getattr(settings, "INFERENCE_BACKOFF_BASE", 0.5) # seconds, doubled per retry
+INFERENCE_BACKOFF_MAX = getattr(settings, "INFERENCE_BACKOFF_MAX", 10.0)
+INFERENCE_MAX_CONCURRENCY = getattr(settings, "INFERENCE_MAX_CONCURRENCY", 8)
+
+# Status codes worth retrying: rate limiting and transient upstream failures (HF returns 503 while a model loads)
+RETRYABLE_STATUS_CODES = {429, 500, 502, 503, 504}
+
+
+async def _close_with_loop(loop, client):
+    # Left suspended at the yield; loop.shutdown_asyncgens() finalizes it, and asyncio.run (and so
+    # async_to_sync) awaits that before closing the loop. The client's connections are then closed
+    # on the loop that opened them rather than abandoned with it, and the loop's pool is dropped
+    # (the state refers back to its loop, so the weak key alone would never let it go).
+    try:
+        yield
+    finally:
+        _loop_states.pop(loop, None)
+        await client.aclose()
+
+
+class _LoopState:
+    def __init__(self, loop):
+        self.client = httpx.AsyncClient(
+            limits=httpx.Limits(
+                max_connections=INFERENCE_MAX_CONNECTIONS,
+                max_keepalive_connections=INFERENCE_MAX_KEEPALIVE,
+                keepalive_expiry=INFERENCE_KEEPALIVE_EXPIRY,
+            ),
+            timeout=httpx.Timeout(INFERENCE_TIMEOUT, connect=INFERENCE_CONNECT_TIMEOUT),
+        )
+        self.semaphore = asyncio.Semaphore(INFERENCE_MAX_CONCURRENCY)
+        # Started by hand up to its yield, which registers it with the running loop's asyncgen
+        # hooks; the reference here keeps it from being finalized before the loop shuts down
+        self._closer = _close_with_loop(loop, self.client)
+        try:
+            self._closer.__anext__().send(None)
+        except StopIteration:
+            pass
+
+
+# httpx clients and semaphores are bound to the event loop that created them, and sync views
+# drive coroutines through async_to_sync on short-lived loops, so keep one pool per loop; each
+# client is closed when its loop shuts down. Long-running callers should keep one loop (ASGI,
+# the job runner and the management commands do), so keep-alive connections get reused.
+_loop_states = weakref.WeakKeyDictionary()
+
+
+def _get_loop_state():
+    loop = asyncio.get_running_loop()
+    state = _loop_states.get(loop)
+    if state is None:
+        state = _loop_states[loop] = _LoopState(loop)
+    return state
+
+
+def get_inference_client():
+    """Return the shared keep-alive client for the running event loop."""
+    return _get_loop_state().client
+
+
+def _backoff_delay(attempt):
+    # Exponential backoff with full jitter
+    return random.uniform(0, min(INFERENCE_BACKOFF_MAX, INFERENCE_BACKOFF_BASE * (2 ** attempt)))
+
+
+async def _timed_request(client, method, url, host, **kwargs):
+    # Latency of the attempt itself, not of the wait for a concurrency slot
+    started = time.perf_counter()
+    try:
+        response = await client.request(method, url, **kwargs)
+    except httpx.HTTPError:
+        OUTBOUND_HTTP_DURATION.observe(time.perf_counter() - started, host=host, method=method, status="error")
+        raise
+    OUTBOUND_HTTP_DURATION.observe(time.perf_counter() - started, host=host, method=method, status=response.status_code)
+    return response
+
+
+async def inference_request(method, url, *, timeout=None, max_retries=None, **kwargs):
+    """Send a request to an inference backend over the pooled client.
+
+    At most INFERENCE_MAX_CONCURRENCY requests are in flight per event loop. Connection errors,
+    timeouts and RETRYABLE_STATUS_CODES are retried with backoff; the final response (or error)
+    is returned/raised to the caller. ``content`` may be a zero-argument callable returning a fresh
+    body for each attempt, which keeps streamed (non-replayable) uploads retryable.
+    """
+    state = _get_loop_state()
+    max_retries = INFERENCE_MAX_RETRIES if max_retries is None else max_retries
+    if timeout is not None:
+        kwargs["timeout"] = timeout
+    content = kwargs.pop("content", None)
+    host = urlsplit(url).netloc
+
+    attempt = 0
+    while True:
+        try:
+            async with state.semaphore:
+                body = content() if callable(content) else content
+                response = await _timed_request(state.client, method, url, host, content=body, **kwargs)
+        except (httpx.TimeoutException, httpx.NetworkError):
+            if attempt >= max_retries:
+                raise
+        else:
+            if response.status_code not in RETRYABLE_STATUS_CODES or attempt >= max_retries:
+                return response
+        OUTBOUND_HTTP_RETRIES.inc(host=host)
+        # The semaphore is released while backing off so waiting retries don't hold slots
+        await asyncio.sleep(_backoff_delay(attempt))
+        attempt += 1
+
+
+async def inference_post(url, **kwargs):
+    return await inference_request("POST", url, **kwargs)
@@ -0,0 +1,118 @@
+# CALLI/backend/call_app/importers.py
+
+import csv
+import io
+import json
+
+from django.db import transaction
+
+from .models import Booking
+from .read_cache import invalidate_read_cache
+from .serializers import BookingSerializer
+
+IMPORT_BATCH_SIZE = 1000
+MAX_REPORTED_ERRORS = 1000 # Failed rows beyond this are counted but not listed
+
+
+def detect_import_format(file_name, content_type=None):
+    name = (file_name or "").lower()
+    if name.endswith((".ndjson", ".jsonl")) or content_type in ("application/x-ndjson", "application/jsonl"):
+        return "ndjson"
+    return "csv"
+
+
+# Bytes that aren't UTF-8 (e.g. a Latin-1 export from Excel) decode to U+FFFD; rows containing it
+# are reported instead of imported with mangled names
+NOT_UTF8 = "Row is not valid UTF-8; re-export the file as UTF-8."
+
+
+def iter_booking_rows(binary_stream, file_format):
+    """Yield (row_number, row) pairs from a CSV or NDJSON byte stream without reading it all.
+
+    Rows that can't be used come back as a ValueError, reported per row by import_bookings.
+    """
+    text_stream = io.TextIOWrapper(binary_stream, encoding="utf-8-sig", errors="replace", newline="")
+    try:
+        if file_format == "csv":
+            reader = csv.DictReader(text_stream)
+            try:
+                reader.fieldnames
+            except csv.Error as e:
+                yield 1, ValueError(f"Invalid CSV header: {e}") # No row can be read without it
+                return
+            # Row 1 is the header, so data rows start at 2 like they do in a spreadsheet
+            row_number = 1
+            while True:
+                row_number += 1
+                try:
+                    row = next(reader)
+                except StopIteration:
+                    break
+                except csv.Error as e:
+                    # The reader skips past the malformed line (e.g. a NUL byte on older Pythons,
+                    # or a field over csv.field_size_limit()), so the rows after it still import
+                    row = ValueError(f"Invalid CSV: {e}")
+                else:
+                    if any("\ufffd" in str(value) for item in row.items() for value in item):
+                        row = ValueError(NOT_UTF8)
+                yield row_number, row
+        else:
+            for row_number, line in enumerate(text_stream, start=1):
+                if not line.strip():
+                    continue
+                if "\ufffd" in line:
+                    yield row_number, ValueError(NOT_UTF8)
+                    continue
+                try:
+                    row = json.loads(line)
+                except json.JSONDecodeError as e:
+                    row = ValueError(f"Invalid JSON: {e}")
+                yield row_number, row
+    finally:
+        text_stream.detach() # Leave closing the underlying file to its owner
+
+
+def _insert_batch(batch, report):
+    bookings = []
+    for row_number, row in batch:
+        if isinstance(row, ValueError):
+            _record_error(report, row_number, {"detail": [str(row)]})
+            continue
+        if not isinstance(row, dict):
+            _record_error(report, row_number, {"detail": ["Expected an object."]})
+            continue
+        serializer = BookingSerializer(data=row)
+        if serializer.is_valid():
+            bookings.append(Booking(**serializer.validated_data))
+        else:
+            _record_error(report, row_number, serializer.errors)
+
+    # One short transaction per batch keeps the SQLite write lock free between batches
+    with transaction.atomic():
+        Booking.objects.bulk_create(bookings, batch_size=len(bookings) or None)
+    if bookings:
+        invalidate_read_cache() # bulk_create sends no post_save signals
+    report["created"] += len(bookings)
+
+
+def _record_error(report, row_number, errors):
+    report["failed"] += 1
+    if len(report["errors"]) < MAX_REPORTED_ERRORS:
+        report["errors"].append({"row": row_number, "errors": errors})
+
+
+def import_bookings(binary_stream, file_format="csv", batch_size=IMPORT_BATCH_SIZE):
+    """Validate and insert bookings from a CSV/NDJSON stream in chunks.
+
+    Invalid rows are reported and skipped; they never abort the rest of the import.
+    """
+    report = {"created": 0, "failed": 0, "errors": []}
+    batch = []
+    for row_number, row in iter_booking_rows(binary_stream, file_format):
+        batch.append((row_number, row))
+        if len(batch) >= batch_size:
+            _insert_batch(batch, report)
+            batch = []
+    if batch:
+        _insert_batch(batch, report)
+    return report
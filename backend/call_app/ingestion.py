@@ -0,0 +1,170 @@
+# CALLI/backend/call_app/ingestion.py
+
+import atexit
+import threading
+import time
+
+from django.conf import settings
+from django.db import close_old_connections, transaction
+from django.utils import timezone
+
+from .analytics import record_calls
+from .models import Booking, CallLog
+from .read_cache import invalidate_read_cache
+
+CALL_RESULT_BUFFER_SIZE = getattr(settings, "CALL_RESULT_BUFFER_SIZE", 500) # results that force a flush
+CALL_RESULT_FLUSH_INTERVAL = getattr(settings, "CALL_RESULT_FLUSH_INTERVAL", 2.0) # seconds
+# Results held while the database keeps failing; beyond this, new results are refused
+CALL_RESULT_MAX_PENDING = getattr(settings, "CALL_RESULT_MAX_PENDING", 10000)
+
+# Call types that flip a flag on the booking when the call completed
+BOOKING_FLAGS = {
+    "confirmation": "confirmation_call_made",
+    "survey": "survey_completed",
+}
+
+
+class CallResultBufferFull(Exception):
+    pass
+
+
+class CallResultBuffer:
+    """Buffers telephony call results and writes them in batches.
+
+    Each flush is one transaction: a single bulk_create for the CallLog rows plus one set-based
+    UPDATE per booking flag, instead of a get + insert + full-row save per call. A background
+    thread flushes every ``flush_interval`` seconds; reaching ``max_size`` flushes right away.
+    Accepted results stay buffered until a flush succeeds; once ``max_pending`` are waiting,
+    add() raises CallResultBufferFull instead of accepting more. When a batch fails, its rows are
+    written one by one and the rows that still fail are dropped (and logged), so one bad row
+    can't hold up the rest.
+    """
+
+    def __init__(self, max_size=CALL_RESULT_BUFFER_SIZE, flush_interval=CALL_RESULT_FLUSH_INTERVAL,
+                 max_pending=CALL_RESULT_MAX_PENDING):
+        self.max_size = max_size
+        self.flush_interval = flush_interval
+        self.max_pending = max_pending
+        self._pending = []
+        self._lock = threading.Lock()
+        self._flush_lock = threading.Lock()
+        self._flusher = None
+        self.stats = {"flushes": 0, "call_logs": 0, "unknown_bookings": 0, "dropped": 0}
+
+    def __len__(self):
+        return len(self._pending)
+
+    def add(self, results):
+        self._ensure_flusher()
+        with self._lock:
+            if len(self._pending) + len(results) > self.max_pending:
+                raise CallResultBufferFull(f"{len(self._pending)} results are waiting to be written")
+            self._pending.extend(results)
+            full = len(self._pending) >= self.max_size
+        if full:
+            # The results are accepted either way: a failed flush leaves them for the flusher thread
+            self.try_flush()
+        return len(results)
+
+    def try_flush(self):
+        """flush(), reporting a failure instead of raising it; returns None if the flush failed."""
+        try:
+            return self.flush()
+        except Exception as e:
+            print(f"Call result flush failed: {e}")
+            return None
+
+    def _ensure_flusher(self):
+        if self._flusher is None:
+            with self._lock:
+                if self._flusher is None:
+                    self._flusher = threading.Thread(target=self._flush_periodically, name="call-result-flusher", daemon=True)
+                    self._flusher.start()
+                    atexit.register(self.flush)
+
+    def _flush_periodically(self):
+        while True:
+            time.sleep(self.flush_interval)
+            try:
+                self.try_flush()
+            finally:
+                close_old_connections()
+
+    def flush(self):
+        with self._flush_lock:
+            with self._lock:
+                batch, self._pending = self._pending, []
+            if not batch:
+                return {"call_logs": 0, "bookings_updated": 0, "unknown_bookings": 0}
+            try:
+                summary = self._write(batch)
+            except Exception:
+                summary, failed = self._write_each(batch)
+                if len(failed) == len(batch):
+                    # Nothing could be written, so the database is the problem rather than the rows:
+                    # put the batch back for the next flush
+                    with self._lock:
+                        self._pending[:0] = batch
+                    raise
+                for result, error in failed:
+                    print(f"Dropping call result that can't be written: {result} ({error})")
+                self.stats["dropped"] += len(failed)
+        self.stats["flushes"] += 1
+        self.stats["call_logs"] += summary["call_logs"]
+        self.stats["unknown_bookings"] += summary["unknown_bookings"]
+        return summary
+
+    def _write_each(self, batch):
+        # One transaction per row; returns the combined summary and the (result, error) that failed
+        summary = {"call_logs": 0, "bookings_updated": 0, "unknown_bookings": 0}
+        failed = []
+        for result in batch:
+            try:
+                row_summary = self._write([result])
+            except Exception as e:
+                failed.append((result, e))
+                continue
+            for key in summary:
+                summary[key] += row_summary[key]
+        return summary, failed
+
+    def _write(self, batch):
+        booking_ids = {result["booking_id"] for result in batch}
+        bookings = Booking.objects.only("id", "guest_name", "phone_number").in_bulk(booking_ids)
+
+        call_logs = []
+        flagged = {flag: set() for flag in BOOKING_FLAGS.values()}
+        unknown = 0
+        for result in batch:
+            booking = bookings.get(result["booking_id"])
+            if booking is None:
+                unknown += 1
+                continue
+            call_logs.append(CallLog(
+                booking_id=booking.id,
+                guest_name=result.get("guest_name") or booking.guest_name,
+                phone_number=result.get("phone_number") or booking.phone_number,
+                call_type=result["call_type"],
+                status=result["status"],
+                duration=result.get("duration"),
+                timestamp=result.get("timestamp") or timezone.now(), # the provider's time of the call when given
+                audio_file=result.get("audio_file"),
+            ))
+            flag = BOOKING_FLAGS.get(result["call_type"])
+            if flag and result["status"] == "completed":
+                flagged[flag].add(booking.id)
+
+        bookings_updated = 0
+        with transaction.atomic():
+            CallLog.objects.bulk_create(call_logs)
+            record_calls(call_logs) # bulk_create sends no post_save, so update the rollup here
+            for flag, ids in flagged.items():
+                if ids:
+                    # Only rows whose flag actually changes are written
+                    bookings_updated += Booking.objects.filter(id__in=ids, **{flag: False}).update(**{flag: True})
+        if call_logs:
+            invalidate_read_cache() # bulk writes send no post_save signals
+        return {"call_logs": len(call_logs), "bookings_updated": bookings_updated, "unknown_bookings": unknown}
+
+
+call_result_buffer = CallResultBuffer()
@@ -0,0 +1,221 @@
+# CALLI/backend/call_app/jobs.py
+
+import asyncio
+import contextvars
+import os
+import shutil
+import socket
+import threading
+import uuid
+from datetime import timedelta
+
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.db import close_old_connections
+from django.db.models import Q
+from django.utils import timezone
+
+from .campaigns import run_call_campaign
+from .models import AgentJob
+from .utils import run_agno_task
+
+# Jobs executing at once, and jobs this process accepts before answering 503
+JOB_WORKERS = getattr(settings, "JOB_WORKERS", 4)
+JOB_MAX_PENDING = getattr(settings, "JOB_MAX_PENDING", 1000)
+# Uploads handed to background jobs must outlive the request, so they are moved here
+JOB_UPLOAD_DIR = getattr(settings, "JOB_UPLOAD_DIR", os.path.join(settings.BASE_DIR, "job_uploads"))
+# Each process renews the lease on its queued/running jobs every JOB_HEARTBEAT_INTERVAL seconds;
+# jobs whose lease is older than JOB_LEASE_TIMEOUT belong to a process that is gone
+JOB_HEARTBEAT_INTERVAL = getattr(settings, "JOB_HEARTBEAT_INTERVAL", 15)
+JOB_LEASE_TIMEOUT = getattr(settings, "JOB_LEASE_TIMEOUT", 60)
+
+ACTIVE_STATUSES = (AgentJob.STATUS_QUEUED, AgentJob.STATUS_RUNNING)
+
+# Jobs submitted without an agent_name run one of these functions, called with the job's args;
+# what it returns is the job's result
+JOB_FUNCTIONS = {
+    "run_call_campaign": run_call_campaign,
+}
+
+
+class JobQueueFull(Exception):
+    pass
+
+
+class JobRunner:
+    """Runs AgentJobs on a dedicated event loop thread, at most ``workers`` at a time.
+
+    The loop thread is started on the first submit (or status poll of an orphaned job), so
+    importing this module is free. From then on it also keeps this process's job leases alive and
+    takes over the jobs of processes that died: queued jobs are run here, running ones are marked
+    failed rather than started again (an outbound call may already have been placed).
+    """
+
+    def __init__(self, workers=JOB_WORKERS, max_pending=JOB_MAX_PENDING):
+        self.workers = workers
+        self.max_pending = max_pending
+        self.pending = 0
+        self.worker_id = None
+        self._lock = threading.Lock()
+        self._loop = None
+        self._semaphore = None
+
+    def _ensure_loop(self):
+        with self._lock:
+            if self._loop is None:
+                self.worker_id = f"{socket.gethostname()}:{os.getpid()}:{uuid.uuid4().hex[:8]}"
+                self._loop = asyncio.new_event_loop()
+                self._semaphore = asyncio.Semaphore(self.workers)
+                threading.Thread(target=self._loop.run_forever, name="agent-job-runner", daemon=True).start()
+                contextvars.Context().run(asyncio.run_coroutine_threadsafe, self._maintain(), self._loop)
+            return self._loop
+
+    def start(self):
+        self._ensure_loop()
+
+    def reserve(self):
+        with self._lock:
+            if self.pending >= self.max_pending:
+                raise JobQueueFull(f"{self.pending} jobs already pending.")
+            self.pending += 1
+
+    def release(self):
+        with self._lock:
+            self.pending -= 1
+
+    def schedule(self, job_id):
+        # Scheduled from an empty context: a job must not inherit the submitting request's
+        # asgiref executor, which is gone once the response is sent
+        return contextvars.Context().run(asyncio.run_coroutine_threadsafe, self._run(job_id), self._ensure_loop())
+
+    async def _run(self, job_id):
+        try:
+            async with self._semaphore:
+                await self._execute(job_id)
+        finally:
+            self.release()
+            await sync_to_async(close_old_connections)()
+
+    async def _maintain(self):
+        while True:
+            try:
+                await self._renew_leases()
+                await self.recover()
+            except Exception as e:
+                print(f"Agent job lease maintenance failed: {e}")
+            finally:
+                await sync_to_async(close_old_connections)()
+            await asyncio.sleep(JOB_HEARTBEAT_INTERVAL)
+
+    async def _renew_leases(self):
+        await AgentJob.objects.filter(worker=self.worker_id, status__in=ACTIVE_STATUSES).aupdate(heartbeat_at=timezone.now())
+
+    async def recover(self):
+        """Take over the jobs of dead processes; returns how many were requeued and failed."""
+        now = timezone.now()
+        cutoff = now - timedelta(seconds=JOB_LEASE_TIMEOUT)
+        stale = AgentJob.objects.filter(status__in=ACTIVE_STATUSES).filter(
+            Q(heartbeat_at__lt=cutoff) | Q(heartbeat_at__isnull=True, created_at__lt=cutoff) # rows from before leases
+        )
+        failed = await stale.filter(status=AgentJob.STATUS_RUNNING).aupdate(
+            status=AgentJob.STATUS_FAILED, error="Interrupted: the process running this job stopped.", finished_at=now,
+        )
+        requeued = 0
+        async for job_id, heartbeat_at in stale.filter(status=AgentJob.STATUS_QUEUED).values_list("id", "heartbeat_at"):
+            try:
+                self.reserve()
+            except JobQueueFull:
+                break # Left for a later pass or another process
+            # Conditional on the old lease, so only one process claims the job
+            claimed = await AgentJob.objects.filter(
+                id=job_id, status=AgentJob.STATUS_QUEUED, heartbeat_at=heartbeat_at,
+            ).aupdate(worker=self.worker_id, heartbeat_at=now)
+            if claimed:
+                self.schedule(job_id)
+                requeued += 1
+            else:
+                self.release()
+        if requeued or failed:
+            print(f"Recovered agent jobs from stopped processes: {requeued} requeued, {failed} failed")
+        return {"requeued": requeued, "failed": failed}
+
+    async def _execute(self, job_id):
+        job = await AgentJob.objects.aget(id=job_id)
+        job.status = AgentJob.STATUS_RUNNING
+        job.started_at = timezone.now()
+        await job.asave(update_fields=["status", "started_at"])
+        try:
+            if not job.agent_name:
+                job.result = await JOB_FUNCTIONS[job.action](**job.args)
+                job.status = AgentJob.STATUS_COMPLETED
+            else:
+                task_result = await run_agno_task(
+                    task_name=job.task_name,
+                    description=f"Background job {job.id}",
+                    agent_name=job.agent_name,
+                    action=job.action,
+                    args=job.args,
+                )
+                if task_result.status == "completed":
+                    job.status = AgentJob.STATUS_COMPLETED
+                    job.result = task_result.output
+                else:
+                    job.status = AgentJob.STATUS_FAILED
+                    job.error = str(task_result.error)
+        except Exception as e:
+            job.status = AgentJob.STATUS_FAILED
+            job.error = str(e)
+        finally:
+            _discard_job_upload(job.args)
+        job.finished_at = timezone.now()
+        await job.asave(update_fields=["status", "result", "error", "finished_at"])
+
+
+job_runner = JobRunner()
+
+
+async def submit_job(task_name, agent_name, action, args=None):
+    """Persist a queued AgentJob and hand it to the runner. Raises JobQueueFull when saturated.
+
+    With an empty ``agent_name``, ``action`` names one of JOB_FUNCTIONS instead of an agent action.
+    """
+    job_runner.reserve()
+    job_runner.start()
+    try:
+        job = await AgentJob.objects.acreate(
+            task_name=task_name, agent_name=agent_name, action=action, args=args or {},
+            worker=job_runner.worker_id, heartbeat_at=timezone.now(),
+        )
+    except Exception:
+        job_runner.release()
+        raise
+    job_runner.schedule(job.id)
+    return job
+
+
+def spool_job_upload(uploaded_file):
+    """Move (or stream-copy) an upload into JOB_UPLOAD_DIR and return the new path."""
+    os.makedirs(JOB_UPLOAD_DIR, exist_ok=True)
+    path = os.path.join(JOB_UPLOAD_DIR, f"{uuid.uuid4().hex}_{os.path.basename(uploaded_file.name)}")
+    if hasattr(uploaded_file, "temporary_file_path"):
+        # Large uploads are already on disk; take over the temp file instead of copying it
+        shutil.move(uploaded_file.temporary_file_path(), path)
+    else:
+        with open(path, "wb") as f:
+            for chunk in uploaded_file.chunks():
+                f.write(chunk)
+    return path
+
+
+def _discard_job_upload(args):
+    path = (args or {}).get("audio_file_path")
+    if path and os.path.dirname(os.path.abspath(path)) == os.path.abspath(JOB_UPLOAD_DIR) and os.path.exists(path):
+        os.remove(path)
+
+
+def job_is_orphaned(job):
+    """True if a queued/running job's lease has expired, i.e. no process is looking after it."""
+    if job.status not in ACTIVE_STATUSES:
+        return False
+    lease = job.heartbeat_at or job.created_at
+    return lease < timezone.now() - timedelta(seconds=JOB_LEASE_TIMEOUT)
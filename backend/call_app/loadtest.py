@@ -0,0 +1,74 @@
+# CALLI/backend/call_app/loadtest.py
+#
+# Closed-loop HTTP load generator used by the bench_* commands: `concurrency` clients each send
+# their next request as soon as the previous one is answered.
+
+import asyncio
+import os
+import time
+from collections import Counter
+
+import httpx
+
+
+def percentile(sorted_values, fraction):
+    if not sorted_values:
+        return None
+    return sorted_values[min(len(sorted_values) - 1, int(len(sorted_values) * fraction))]
+
+
+def summarize(latencies_ms, statuses, errors, elapsed):
+    latencies_ms = sorted(latencies_ms)
+    return {
+        "requests": len(latencies_ms) + errors,
+        "errors": errors,
+        "statuses": dict(sorted(Counter(statuses).items())),
+        "elapsed_s": round(elapsed, 3),
+        "throughput_rps": round(len(latencies_ms) / elapsed, 1) if elapsed else None,
+        "latency_ms": {
+            "p50": percentile(latencies_ms, 0.50),
+            "p95": percentile(latencies_ms, 0.95),
+            "p99": percentile(latencies_ms, 0.99),
+            "max": latencies_ms[-1] if latencies_ms else None,
+        },
+    }
+
+
+async def run_load(url, method="GET", concurrency=10, requests=200, json_body=None, upload_size=None, headers=None,
+                   timeout=60, request_kwargs=None):
+    """Send ``requests`` requests with ``concurrency`` in flight and return a summary dict.
+
+    ``upload_size`` sends a multipart 'file' of that many random bytes with every request, so
+    content-addressed caches see a new sample each time. ``request_kwargs``, a zero-argument
+    callable, supplies extra httpx arguments per request (e.g. a different body each time).
+    """
+    latencies, statuses = [], []
+    errors = 0
+    remaining = requests
+
+    async def client_loop(client):
+        nonlocal remaining, errors
+        while remaining > 0:
+            remaining -= 1
+            kwargs = {"headers": headers}
+            if json_body is not None:
+                kwargs["json"] = json_body
+            if upload_size:
+                kwargs["files"] = {"file": ("sample.mp3", os.urandom(upload_size), "audio/mpeg")}
+            if request_kwargs is not None:
+                kwargs.update(request_kwargs())
+            started = time.perf_counter()
+            try:
+                response = await client.request(method, url, **kwargs)
+            except httpx.HTTPError:
+                errors += 1
+                continue
+            latencies.append(round((time.perf_counter() - started) * 1000, 2))
+            statuses.append(response.status_code)
+
+    limits = httpx.Limits(max_connections=concurrency, max_keepalive_connections=concurrency)
+    async with httpx.AsyncClient(limits=limits, timeout=timeout) as client:
+        started = time.perf_counter()
+        await asyncio.gather(*(client_loop(client) for _ in range(concurrency)))
+        elapsed = time.perf_counter() - started
+    return summarize(latencies, statuses, errors, elapsed)
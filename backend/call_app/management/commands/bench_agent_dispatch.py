@@ -0,0 +1,56 @@
+# CALLI/backend/call_app/management/commands/bench_agent_dispatch.py
+
+import asyncio
+import statistics
+import time
+
+from django.core.management.base import BaseCommand
+
+from call_app.utils import FAST_PATH_ACTIONS, run_agno_task
+
+
+class Command(BaseCommand):
+    help = "Micro-benchmark per-call overhead of run_agno_task: full orchestration vs the fast path."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--iterations", type=int, default=500)
+        parser.add_argument("--warmup", type=int, default=20)
+        parser.add_argument("--agent", default="BookingManagementAgent")
+        parser.add_argument("--action", default="check_pending_confirmations")
+
+    def handle(self, *args, **options):
+        if (options["agent"], options["action"]) not in FAST_PATH_ACTIONS:
+            self.stderr.write(f"{options['agent']}.{options['action']} has no fast path; both runs will orchestrate.")
+        results = asyncio.run(self._bench(options))
+        self.stdout.write(f"{options['agent']}.{options['action']} x {options['iterations']}")
+        for label, timings in results.items():
+            timings.sort()
+            self.stdout.write(
+                f"  {label:<13} mean {statistics.mean(timings):8.1f} us"
+                f"  p50 {timings[len(timings) // 2]:8.1f} us"
+                f"  p95 {timings[int(len(timings) * 0.95)]:8.1f} us"
+            )
+
+    async def _bench(self, options):
+        results = {}
+        for label, fast_path in (("orchestrated", False), ("fast path", True)):
+            for _ in range(options["warmup"]):
+                await self._call(options, fast_path)
+            timings = []
+            for _ in range(options["iterations"]):
+                started = time.perf_counter()
+                await self._call(options, fast_path)
+                timings.append((time.perf_counter() - started) * 1e6)
+            results[label] = timings
+        return results
+
+    async def _call(self, options, fast_path):
+        task_result = await run_agno_task(
+            task_name="Benchmark",
+            description="Dispatch overhead benchmark",
+            agent_name=options["agent"],
+            action=options["action"],
+            fast_path=fast_path,
+        )
+        if task_result.status != "completed":
+            raise RuntimeError(f"Benchmark call failed: {task_result.error}")
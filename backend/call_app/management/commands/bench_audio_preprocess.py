@@ -0,0 +1,88 @@
+# CALLI/backend/call_app/management/commands/bench_audio_preprocess.py
+
+import io
+import statistics
+import time
+import wave
+
+import numpy as np
+from django.core.management.base import BaseCommand
+
+from call_app import audio
+
+
+def synth_sample(seconds, rate, channels, silence):
+    """Speech-like test signal: a vibrato tone with harmonics and syllable-rate amplitude
+    modulation, light noise, and ``silence`` seconds of near-silence at each end."""
+    rng = np.random.default_rng(0)
+    t = np.arange(int(seconds * rate)) / rate
+    pitch = 140 + 20 * np.sin(2 * np.pi * 3 * t)
+    phase = 2 * np.pi * np.cumsum(pitch) / rate
+    voice = sum(np.sin(k * phase) / k for k in range(1, 6)) * (0.5 + 0.5 * np.sin(2 * np.pi * 4 * t) ** 2)
+    voice = 0.3 * voice / np.max(np.abs(voice)) + 0.005 * rng.standard_normal(len(t))
+    pad = 0.0005 * rng.standard_normal(int(silence * rate))
+    mono = np.concatenate([pad, voice, pad]).astype(np.float32)
+    stereo = np.repeat(mono[:, None], channels, axis=1)
+    pcm = (stereo * 32767).astype("<i2")
+    buffer = io.BytesIO()
+    with wave.open(buffer, "wb") as wav:
+        wav.setnchannels(channels)
+        wav.setsampwidth(2)
+        wav.setframerate(rate)
+        wav.writeframes(pcm.tobytes())
+    return buffer.getvalue()
+
+
+class Command(BaseCommand):
+    help = "Benchmark voice sample preprocessing per stage, and the upload size before and after."
+
+    def add_arguments(self, parser):
+        parser.add_argument("files", nargs="*", help="WAV files to process (default: a synthetic sample)")
+        parser.add_argument("--iterations", type=int, default=20)
+        parser.add_argument("--seconds", type=float, default=45, help="Synthetic sample: voiced length")
+        parser.add_argument("--rate", type=int, default=48000, help="Synthetic sample: sample rate")
+        parser.add_argument("--channels", type=int, default=2, help="Synthetic sample: channel count")
+        parser.add_argument("--silence", type=float, default=3, help="Synthetic sample: silence at each end (s)")
+
+    def handle(self, *args, **options):
+        if options["files"]:
+            samples = {}
+            for path in options["files"]:
+                with open(path, "rb") as f:
+                    samples[path] = f.read()
+        else:
+            label = f"synthetic {options['seconds']:g}s {options['rate']} Hz x{options['channels']}"
+            samples = {label: synth_sample(options["seconds"], options["rate"], options["channels"], options["silence"])}
+
+        for label, data in samples.items():
+            self._bench(label, data, options["iterations"])
+
+    def _bench(self, label, data, iterations):
+        timings = {stage: [] for stage in ("decode", "downmix", "trim", "resample", "normalize", "encode", "total")}
+        for _ in range(iterations):
+            started = last = time.perf_counter()
+
+            def lap(stage):
+                nonlocal last
+                now = time.perf_counter()
+                timings[stage].append((now - last) * 1000)
+                last = now
+
+            samples, rate = audio.decode_wav(data, audio.VOICE_SAMPLE_MAX_SECONDS); lap("decode")
+            samples = audio.downmix(samples); lap("downmix")
+            samples = audio.trim_silence(samples, rate); lap("trim")
+            samples = audio.resample(samples, rate); lap("resample")
+            samples = audio.normalize_loudness(samples); lap("normalize")
+            output = audio.encode_wav(samples, audio.VOICE_SAMPLE_RATE); lap("encode")
+            timings["total"].append((time.perf_counter() - started) * 1000)
+
+        input_samples, input_rate = audio.decode_wav(data)
+        input_seconds = len(input_samples) / input_rate
+        self.stdout.write(f"{label} x {iterations}")
+        for stage, values in timings.items():
+            self.stdout.write(f"  {stage:<10} mean {statistics.mean(values):8.2f} ms  p95 {sorted(values)[int(len(values) * 0.95)]:8.2f} ms")
+        self.stdout.write(
+            f"  payload    {len(data) / 1e6:.2f} MB ({input_seconds:.1f}s @ {input_rate} Hz)"
+            f" -> {len(output) / 1e6:.2f} MB ({len(samples) / audio.VOICE_SAMPLE_RATE:.1f}s @ {audio.VOICE_SAMPLE_RATE} Hz mono)"
+            f", {len(data) / len(output):.1f}x smaller"
+        )
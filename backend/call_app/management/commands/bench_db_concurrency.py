@@ -0,0 +1,120 @@
+# CALLI/backend/call_app/management/commands/bench_db_concurrency.py
+
+import random
+import statistics
+import threading
+import time
+from datetime import date, timedelta
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+from django.db import OperationalError, connections, transaction
+
+from call_app.db_router import replica_queryset
+from call_app.models import Booking, CallLog
+
+BENCH_GUEST = "bench-concurrency"
+
+
+class Command(BaseCommand):
+    help = (
+        "Mixed read/write load against the configured database. Run it once per settings profile "
+        "to compare them, e.g. --settings=caller.settings vs --settings=caller.settings_production."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--readers", type=int, default=8)
+        parser.add_argument("--writers", type=int, default=2)
+        parser.add_argument("--duration", type=float, default=10, help="Seconds of load")
+        parser.add_argument("--bookings", type=int, default=2000, help="Bookings seeded for the run")
+
+    def handle(self, *args, **options):
+        db = settings.DATABASES["default"]
+        self.stdout.write(
+            f"{settings.SETTINGS_MODULE}: {db['ENGINE'].rsplit('.', 1)[-1]}, DEBUG={settings.DEBUG}, "
+            f"CONN_MAX_AGE={db.get('CONN_MAX_AGE', 0)}, replica={'replica' in settings.DATABASES}"
+        )
+        booking_ids = self._seed(options["bookings"])
+        try:
+            results = self._run(booking_ids, options)
+        finally:
+            CallLog.objects.filter(guest_name=BENCH_GUEST).delete()
+            Booking.objects.filter(guest_name=BENCH_GUEST).delete()
+
+        for kind, stats in results.items():
+            timings = sorted(stats["timings"])
+            if not timings:
+                self.stdout.write(f"  {kind:<6} no successful operations, {stats['errors']} errors")
+                continue
+            self.stdout.write(
+                f"  {kind:<6} {len(timings) / options['duration']:8.1f} ops/s"
+                f"  p50 {timings[len(timings) // 2]:7.2f} ms"
+                f"  p95 {timings[int(len(timings) * 0.95)]:7.2f} ms"
+                f"  p99 {timings[int(len(timings) * 0.99)]:7.2f} ms"
+                f"  mean {statistics.mean(timings):7.2f} ms"
+                f"  errors {stats['errors']}"
+            )
+
+    def _seed(self, count):
+        today = date.today()
+        Booking.objects.bulk_create([
+            Booking(
+                guest_name=BENCH_GUEST, phone_number="+10000000000", room_number=str(100 + i % 400),
+                check_in_date=today + timedelta(days=i % 14), check_out_date=today - timedelta(days=i % 7),
+            )
+            for i in range(count)
+        ], batch_size=1000)
+        return list(Booking.objects.filter(guest_name=BENCH_GUEST).values_list("id", flat=True))
+
+    def _run(self, booking_ids, options):
+        results = {kind: {"timings": [], "errors": 0} for kind in ("read", "write")}
+        lock = threading.Lock()
+        deadline = time.monotonic() + options["duration"]
+        start = threading.Barrier(options["readers"] + options["writers"])
+
+        def worker(kind, operation):
+            timings, errors = [], 0
+            try:
+                start.wait()
+                while time.monotonic() < deadline:
+                    started = time.perf_counter()
+                    try:
+                        operation(booking_ids)
+                    except OperationalError:
+                        errors += 1 # e.g. "database is locked" once the busy timeout runs out
+                        continue
+                    timings.append((time.perf_counter() - started) * 1000)
+            finally:
+                connections.close_all()
+            with lock:
+                results[kind]["timings"].extend(timings)
+                results[kind]["errors"] += errors
+
+        threads = [threading.Thread(target=worker, args=("read", self._read)) for _ in range(options["readers"])]
+        threads += [threading.Thread(target=worker, args=("write", self._write)) for _ in range(options["writers"])]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        return results
+
+    @staticmethod
+    def _read(booking_ids):
+        # The BookingManagementAgent selection shape: indexed filter, a few columns, routed reads
+        day = date.today() + timedelta(days=random.randrange(14))
+        list(replica_queryset(
+            Booking.objects.pending_confirmation(day).filter(check_in_date__lte=day)
+            .order_by("id").values("id", "guest_name", "phone_number")[:200]
+        ))
+
+    @staticmethod
+    def _write(booking_ids):
+        # The make_outbound_call write shape: log the call and flip the booking flag together
+        booking_id = random.choice(booking_ids)
+        with transaction.atomic():
+            CallLog.objects.create(
+                booking_id=booking_id, guest_name=BENCH_GUEST, phone_number="+10000000000",
+                call_type="confirmation", status="completed", duration=60,
+            )
+            # Written back as pending so the readers keep selecting the same rows
+            Booking.objects.filter(id=booking_id).update(confirmation_call_made=False)
@@ -0,0 +1,48 @@
+# CALLI/backend/call_app/management/commands/bench_http_load.py
+
+import asyncio
+import json
+
+from django.core.management.base import BaseCommand
+
+from call_app.loadtest import run_load
+
+
+class Command(BaseCommand):
+    help = (
+        "Load-test one endpoint of a running server with concurrent clients. To measure requests "
+        "per worker, run the server with one worker, e.g. `uvicorn caller.asgi:application --workers 1`."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("url")
+        parser.add_argument("--method", default="GET")
+        parser.add_argument("--concurrency", type=int, nargs="+", default=[1, 10, 50],
+                            help="One run per concurrency level")
+        parser.add_argument("--requests", type=int, default=500, help="Requests per run")
+        parser.add_argument("--json", dest="json_body", type=json.loads, help="JSON request body")
+        parser.add_argument("--upload-size", type=int, help="Send a random multipart 'file' of this many bytes")
+        parser.add_argument("--output", help="Also write the results to this JSON file")
+
+    def handle(self, *args, **options):
+        results = asyncio.run(self._run(options))
+        if options["output"]:
+            with open(options["output"], "w") as f:
+                json.dump({"url": options["url"], "method": options["method"].upper(), "runs": results}, f, indent=2)
+
+    async def _run(self, options):
+        results = []
+        for concurrency in options["concurrency"]:
+            summary = await run_load(
+                options["url"], method=options["method"].upper(), concurrency=concurrency,
+                requests=options["requests"], json_body=options["json_body"], upload_size=options["upload_size"],
+            )
+            summary["concurrency"] = concurrency
+            results.append(summary)
+            latency = summary["latency_ms"]
+            self.stdout.write(
+                f"c={concurrency:<4} {summary['throughput_rps']:8.1f} req/s"
+                f"  p50 {latency['p50']} ms  p95 {latency['p95']} ms  p99 {latency['p99']} ms"
+                f"  statuses {summary['statuses']}  errors {summary['errors']}"
+            )
+        return results
@@ -0,0 +1,57 @@
+# CALLI/backend/call_app/management/commands/bench_startup.py
+
+import json
+import os
+import statistics
+import subprocess
+import sys
+import time
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+
+# Runs in a fresh interpreter so nothing is already imported or cached
+CHILD_SCRIPT = """
+import json, sys, time
+t0 = time.perf_counter()
+import django
+django.setup()
+t1 = time.perf_counter()
+from django.urls import resolve
+for path in {paths!r}:
+    resolve(path)
+t2 = time.perf_counter()
+print(json.dumps({{"setup": t1 - t0, "resolve": t2 - t1, "agno_loaded": "agno" in sys.modules}}))
+"""
+
+DEFAULT_PATHS = ["/api/bookings/", "/api/call-logs/", "/api/calls/outbound/", "/api/bookings/pending-confirmation/"]
+
+
+class Command(BaseCommand):
+    help = "Benchmark cold start: django.setup() plus first URL resolution, each run in a new process."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--runs", type=int, default=10)
+
+    def handle(self, *args, **options):
+        env = dict(os.environ, DJANGO_SETTINGS_MODULE=os.environ.get("DJANGO_SETTINGS_MODULE", "caller.settings"))
+        script = CHILD_SCRIPT.format(paths=DEFAULT_PATHS)
+        samples = {"setup": [], "resolve": [], "process": []}
+        agno_loaded = False
+        for _ in range(options["runs"]):
+            started = time.perf_counter()
+            completed = subprocess.run(
+                [sys.executable, "-c", script], cwd=settings.BASE_DIR, env=env,
+                capture_output=True, text=True, check=True,
+            )
+            samples["process"].append(time.perf_counter() - started)
+            child = json.loads(completed.stdout.strip().splitlines()[-1])
+            samples["setup"].append(child["setup"])
+            samples["resolve"].append(child["resolve"])
+            agno_loaded = agno_loaded or child["agno_loaded"]
+
+        self.stdout.write(f"Cold start over {options['runs']} runs (ms):")
+        for label, values in samples.items():
+            values = [v * 1000 for v in values]
+            self.stdout.write(f"  {label:<8} mean {statistics.mean(values):8.1f}  min {min(values):8.1f}  max {max(values):8.1f}")
+        self.stdout.write(f"  agent layer imported at startup: {'yes' if agno_loaded else 'no'}")
@@ -0,0 +1,364 @@
+# CALLI/backend/call_app/management/commands/bench_suite.py
+
+import asyncio
+import io
+import json
+import math
+import os
+import platform
+import random
+import socket
+import subprocess
+import sys
+import time
+from contextlib import contextmanager
+from datetime import date, timedelta
+
+import httpx
+import numpy as np
+from django.apps import apps
+from django.conf import settings
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.core.management.base import BaseCommand, CommandError
+from django.db.models.signals import post_delete
+from django.urls import reverse
+from django.utils import timezone
+
+from call_app import urls as call_app_urls
+from call_app.analytics import rebuild_call_stats
+from call_app.audio import encode_wav
+from call_app.loadtest import run_load
+from call_app.models import AgentJob, AgnoTaskRecord, Booking, CallLog, VoiceCloneResult
+from call_app.read_cache import invalidate_read_cache
+from call_app.recordings import resolve_recording, store_recording
+
+# Everything the suite creates is tagged with this guest name (or voice model) and removed afterwards
+BENCH_GUEST = "bench-suite"
+BENCH_VOICE_MODEL = "bench-suite-voice-model"
+CALL_TYPES = ["confirmation", "survey", "upsell"]
+CALL_OUTCOMES = ["completed"] * 8 + ["no-answer", "failed"]
+SAMPLE_RATE = 16000
+
+
+def _free_port():
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+
+@contextmanager
+def _bulk_delete_signals_muted():
+    # Deleting the seeded rows would otherwise update the call rollup and the read cache once per
+    # row; both are rebuilt once after the cleanup instead. ready() reconnects the receivers.
+    post_delete.disconnect(sender=CallLog, dispatch_uid="call-daily-stat-delete")
+    for model in (Booking, CallLog):
+        post_delete.disconnect(sender=model, dispatch_uid=f"read-cache-delete-{model.__name__}")
+    try:
+        yield
+    finally:
+        apps.get_app_config("call_app").ready()
+
+
+class Command(BaseCommand):
+    help = (
+        "End-to-end load test: seeds synthetic bookings and call logs, starts a local mock HF inference "
+        "server plus the app under uvicorn, drives every call_app endpoint concurrently "
+        "and writes throughput and p50/p95/p99 latency per endpoint to a JSON file. Runs offline; use "
+        "a scratch database, e.g. --settings=caller.settings_production with SQLITE_PATH=/tmp/bench.sqlite3."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--bookings", type=int, default=5000, help="Synthetic bookings to seed")
+        parser.add_argument("--call-logs", type=int, default=20000, help="Synthetic call logs to seed")
+        parser.add_argument("--days", type=int, default=30, help="Days of call history the logs are spread over")
+        parser.add_argument("--concurrency", type=int, nargs="+", default=[1, 10, 50],
+                            help="Clients in flight; one run per level")
+        parser.add_argument("--requests", type=int, default=100, help="Requests per endpoint per run")
+        parser.add_argument("--mode", choices=["isolated", "mixed", "both"], default="both",
+                            help="isolated: one endpoint at a time; mixed: all endpoints at once, each with --concurrency clients")
+        parser.add_argument("--endpoints", nargs="+", help="Only these route names (default: every route)")
+        parser.add_argument("--hf-latency-ms", type=float, default=500)
+        parser.add_argument("--voice-sample-seconds", type=float, default=3)
+        parser.add_argument("--workers", type=int, default=1, help="uvicorn workers for the app server")
+        parser.add_argument("--url", help="Benchmark an already running server (root URL, e.g. http://127.0.0.1:8000) instead of starting one")
+        parser.add_argument("--server-log", help="Append the app and mock server output to this file")
+        parser.add_argument("--keep-data", action="store_true", help="Leave the seeded and generated rows in place")
+        parser.add_argument("--output", default="bench_suite.json")
+
+    def handle(self, *args, **options):
+        routes = {pattern.name for pattern in call_app_urls.urlpatterns if pattern.name}
+        unknown = set(options["endpoints"] or []) - routes
+        if unknown:
+            raise CommandError(f"Unknown endpoints: {', '.join(sorted(unknown))}. Choose from {', '.join(sorted(routes))}.")
+
+        started_at = timezone.now()
+        self.stdout.write(f"Seeding {options['bookings']} bookings and {options['call_logs']} call logs...")
+        fixtures = self._seed(options)
+        processes = []
+        log = open(options["server_log"], "ab") if options["server_log"] else subprocess.DEVNULL
+        try:
+            mock_url = self._start_mocks(options, processes, log)
+            base_url = options["url"] or self._start_app(options, mock_url, processes, log)
+            scenarios = self._scenarios(base_url.rstrip("/"), fixtures, options)
+            self._warm_up(scenarios)
+            results = asyncio.run(self._run(scenarios, options)) # one event loop for every run
+        finally:
+            for process in processes:
+                process.terminate()
+            for process in processes:
+                process.wait(timeout=30)
+            if log is not subprocess.DEVNULL:
+                log.close()
+            if not options["keep_data"]:
+                self._cleanup(fixtures, started_at)
+
+        report = {
+            "meta": {
+                "started_at": started_at.isoformat(),
+                "settings": settings.SETTINGS_MODULE,
+                "database": settings.DATABASES["default"]["ENGINE"].rsplit(".", 1)[-1],
+                "python": platform.python_version(),
+                "cpus": os.cpu_count(),
+                "workers": None if options["url"] else options["workers"],
+                "scale": {"bookings": options["bookings"], "call_logs": options["call_logs"], "days": options["days"]},
+                "mocks": {"hf_latency_ms": options["hf_latency_ms"]},
+                "requests_per_run": options["requests"],
+                "concurrency": options["concurrency"],
+            },
+            "endpoints": results,
+        }
+        with open(options["output"], "w") as f:
+            json.dump(report, f, indent=2, sort_keys=True)
+        self.stdout.write(f"Wrote {options['output']}")
+
+    # --- Data ---
+
+    def _seed(self, options):
+        rng = random.Random(0) # Same data every run, so reports can be diffed
+        today = date.today()
+        Booking.objects.bulk_create([
+            Booking(
+                guest_name=BENCH_GUEST, phone_number=f"+1555{i:07d}", room_number=str(100 + i % 400),
+                check_in_date=today + timedelta(days=rng.randrange(-7, 21)),
+                check_out_date=today + timedelta(days=rng.randrange(-14, 7)),
+                confirmation_call_made=rng.random() < 0.5, survey_completed=rng.random() < 0.3,
+            )
+            for i in range(options["bookings"])
+        ], batch_size=1000)
+        booking_ids = list(Booking.objects.filter(guest_name=BENCH_GUEST).order_by("id").values_list("id", flat=True))
+
+        CallLog.objects.bulk_create([
+            CallLog(
+                booking_id=rng.choice(booking_ids), guest_name=BENCH_GUEST, phone_number="+15550000000",
+                call_type=rng.choice(CALL_TYPES), status=(outcome := rng.choice(CALL_OUTCOMES)),
+                duration=rng.randint(20, 240) if outcome == "completed" else None,
+            )
+            for _ in range(options["call_logs"])
+        ], batch_size=1000)
+        # timestamp is auto_now_add, so the history is spread over the past days afterwards
+        log_ids = list(CallLog.objects.filter(guest_name=BENCH_GUEST).order_by("id").values_list("id", flat=True))
+        days = max(1, options["days"])
+        per_day = math.ceil(len(log_ids) / days) or 1
+        now = timezone.now()
+        for offset, start in enumerate(range(0, len(log_ids), per_day)):
+            chunk = log_ids[start:start + per_day]
+            CallLog.objects.filter(id__gte=chunk[0], id__lte=chunk[-1], guest_name=BENCH_GUEST).update(
+                timestamp=now - timedelta(days=offset, minutes=rng.randrange(600)),
+            )
+        first_day = today - timedelta(days=days)
+        rebuild_call_stats(first_day, today)
+        invalidate_read_cache()
+
+        # One stored recording, a finished job and a task record for the detail endpoints
+        recording_log = CallLog.objects.filter(guest_name=BENCH_GUEST).order_by("id").first()
+        if recording_log is None:
+            raise CommandError("--call-logs must be at least 1.")
+        samples = np.random.default_rng(0).uniform(-0.3, 0.3, SAMPLE_RATE * 30)
+        store_recording(recording_log, SimpleUploadedFile("bench.wav", encode_wav(samples, SAMPLE_RATE), "audio/wav"))
+        job = AgentJob.objects.create(
+            task_name=BENCH_GUEST, agent_name="CallAgent", action="make_outbound_call",
+            status=AgentJob.STATUS_COMPLETED, result={"status": "success"}, finished_at=now,
+        )
+        task = AgnoTaskRecord.objects.create(
+            task_name=BENCH_GUEST, agent_name="CallAgent", action="make_outbound_call", status="completed",
+        )
+        return {
+            "booking_ids": booking_ids, "first_day": first_day, "recording_call_id": recording_log.id,
+            "job_id": job.id, "task_id": task.task_id,
+        }
+
+    def _cleanup(self, fixtures, started_at):
+        recording = CallLog.objects.filter(id=fixtures["recording_call_id"]).values_list("audio_file", flat=True).first()
+        path = resolve_recording(recording)
+        if path:
+            os.remove(path)
+        with _bulk_delete_signals_muted():
+            # Call logs, retries and results written during the run belong to the tagged bookings
+            Booking.objects.filter(guest_name=BENCH_GUEST).delete()
+        AgentJob.objects.filter(id=fixtures["job_id"]).delete()
+        # Task history of the run itself, recorded by the app server while the suite was running
+        AgnoTaskRecord.objects.filter(created_at__gte=started_at).delete()
+        VoiceCloneResult.objects.filter(model_id=BENCH_VOICE_MODEL).delete()
+        rebuild_call_stats(fixtures["first_day"], date.today())
+        invalidate_read_cache()
+
+    # --- Servers ---
+
+    def _start_server(self, app, port, env, processes, log, workers=1):
+        command = [
+            sys.executable, "-m", "uvicorn", app, "--app-dir", str(settings.BASE_DIR),
+            "--host", "127.0.0.1", "--port", str(port), "--workers", str(workers), "--log-level", "warning",
+        ]
+        process = subprocess.Popen(command, env={**os.environ, **env}, stdout=log, stderr=subprocess.STDOUT)
+        processes.append(process)
+        return process
+
+    def _wait_until_up(self, url, process, timeout=60):
+        deadline = time.monotonic() + timeout
+        while time.monotonic() < deadline:
+            if process.poll() is not None:
+                raise CommandError(f"Server for {url} exited with status {process.returncode} (see --server-log).")
+            try:
+                if httpx.get(url, timeout=2).status_code == 200:
+                    return
+            except httpx.HTTPError:
+                pass
+            time.sleep(0.2)
+        raise CommandError(f"Server for {url} did not come up within {timeout} seconds.")
+
+    def _start_mocks(self, options, processes, log):
+        port = _free_port()
+        process = self._start_server("call_app.mock_services:app", port, {
+            "MOCK_HF_LATENCY_MS": str(options["hf_latency_ms"]),
+        }, processes, log)
+        url = f"http://127.0.0.1:{port}"
+        self._wait_until_up(f"{url}/health", process)
+        self.stdout.write(f"Mock HF inference at {url}")
+        return url
+
+    def _start_app(self, options, mock_url, processes, log):
+        port = _free_port()
+        process = self._start_server("caller.asgi:application", port, {
+            "DJANGO_SETTINGS_MODULE": settings.SETTINGS_MODULE,
+            "HF_INFERENCE_API_BASE": mock_url,
+            "HF_VOICE_CLONING_MODEL_ID": BENCH_VOICE_MODEL,
+            "HF_TOKEN": os.environ.get("HF_TOKEN") or "bench-suite",
+        }, processes, log, workers=options["workers"])
+        url = f"http://127.0.0.1:{port}"
+        self._wait_until_up(url + reverse("health"), process)
+        self.stdout.write(f"App server ({options['workers']} worker(s)) at {url}")
+        return url
+
+    # --- Scenarios ---
+
+    def _scenarios(self, base_url, fixtures, options):
+        """One (key, method, url, request_kwargs) per benchmarked route and method."""
+        rng = random.Random(1)
+        booking_ids = fixtures["booking_ids"]
+        today = date.today()
+
+        def booking():
+            return {
+                "guest_name": BENCH_GUEST, "phone_number": "+15559999999", "room_number": str(rng.randrange(100, 500)),
+                "check_in_date": str(today + timedelta(days=rng.randrange(1, 30))),
+                "check_out_date": str(today + timedelta(days=rng.randrange(31, 40))),
+            }
+
+        def call(call_type):
+            return {
+                "booking_id": rng.choice(booking_ids), "guest_name": BENCH_GUEST, "phone_number": "+15559999999",
+                "call_type": call_type, "room_number": "101",
+            }
+
+        def voice_sample():
+            # A new sample every time, so each request goes through preprocessing and the HF mock
+            samples = np.random.default_rng().uniform(-0.5, 0.5, int(SAMPLE_RATE * options["voice_sample_seconds"]))
+            return encode_wav(samples, SAMPLE_RATE)
+
+        import_csv = io.StringIO()
+        import_csv.write("guest_name,phone_number,check_in_date,room_number,check_out_date\n")
+        for _ in range(50):
+            row = booking()
+            import_csv.write(f"{row['guest_name']},{row['phone_number']},{row['check_in_date']},{row['room_number']},{row['check_out_date']}\n")
+        import_body = import_csv.getvalue().encode()
+
+        retry = lambda: {"json": {"booking_id": rng.choice(booking_ids), "call_type": "confirmation", "error": BENCH_GUEST, "delay_seconds": 3600}}
+        result = lambda: {
+            "booking_id": rng.choice(booking_ids), "call_type": rng.choice(CALL_TYPES),
+            "status": rng.choice(CALL_OUTCOMES), "duration": rng.randint(20, 240),
+        }
+        scenarios = [
+            ("GET", "health", {}, None),
+            ("GET", "booking-list-create", {}, None),
+            ("POST", "booking-list-create", {}, lambda: {"json": booking()}),
+            ("POST", "booking-import", {}, lambda: {"files": {"file": ("bookings.csv", import_body, "text/csv")}}),
+            ("GET", "call-log-list", {}, None),
+            ("GET", "call-recording", {"pk": fixtures["recording_call_id"]}, lambda: {"headers": {"Range": "bytes=0-65535"}}),
+            ("GET", "call-analytics", {}, lambda: {"params": {"group_by": "day,call_type", "date_from": str(fixtures["first_day"])}}),
+            ("POST", "clone-voice", {}, lambda: {"files": {"file": ("sample.wav", voice_sample(), "audio/wav")}}),
+            ("GET", "clone-voice-cache-stats", {}, None),
+            ("POST", "initiate-outbound-call", {}, lambda: {"json": call("confirmation")}),
+            ("POST", "start-call-campaign", {}, lambda: {"json": {"call_type": "survey", "booking_ids": rng.sample(booking_ids, min(5, len(booking_ids)))}}),
+            ("POST", "schedule-call-retry", {}, retry),
+            ("POST", "mark-call-failed", {}, retry),
+            ("POST", "ingest-call-results", {}, lambda: {"json": [result() for _ in range(10)]}),
+            ("GET", "job-status", {"job_id": fixtures["job_id"]}, None),
+            ("GET", "agno-task-list", {}, None),
+            ("GET", "agno-task-detail", {"task_id": fixtures["task_id"]}, None),
+            ("GET", "pending-confirmations", {}, lambda: {"params": {"limit": 200}}),
+            ("GET", "recent-checkouts", {}, lambda: {"params": {"limit": 200}}),
+        ]
+
+        # Every named route of the app should have a scenario; new routes show up here until they get one
+        covered = {name for _, name, _, _ in scenarios}
+        missing = sorted({pattern.name for pattern in call_app_urls.urlpatterns if pattern.name} - covered)
+        if missing:
+            self.stderr.write(f"No scenario for: {', '.join(missing)}")
+
+        if options["endpoints"]:
+            scenarios = [s for s in scenarios if s[1] in options["endpoints"]]
+        return [
+            (f"{method} {name}", method, base_url + reverse(name, kwargs=kwargs), request_kwargs)
+            for method, name, kwargs, request_kwargs in scenarios
+        ]
+
+    # --- Runs ---
+
+    def _warm_up(self, scenarios):
+        # One request each before timing: loads lazy imports and agents, and flags broken scenarios early
+        with httpx.Client(timeout=60) as client:
+            for key, method, url, request_kwargs in scenarios:
+                response = client.request(method, url, **(request_kwargs() if request_kwargs else {}))
+                if response.status_code >= 400:
+                    self.stderr.write(f"{key}: warm-up answered {response.status_code}: {response.text[:200]}")
+
+    async def _run(self, scenarios, options):
+        results = {key: {} for key, _, _, _ in scenarios}
+        modes = ["isolated", "mixed"] if options["mode"] == "both" else [options["mode"]]
+        for mode in modes:
+            for concurrency in options["concurrency"]:
+                if mode == "isolated":
+                    runs = {}
+                    for scenario in scenarios:
+                        runs.update(await self._load([scenario], concurrency, options["requests"]))
+                else:
+                    runs = await self._load(scenarios, concurrency, options["requests"])
+                for key, summary in runs.items():
+                    results[key].setdefault(mode, {})[f"c{concurrency}"] = summary
+                    self._report(key, mode, concurrency, summary)
+        return results
+
+    async def _load(self, scenarios, concurrency, requests):
+        summaries = await asyncio.gather(*(
+            run_load(url, method=method, concurrency=concurrency, requests=requests, request_kwargs=request_kwargs)
+            for _, method, url, request_kwargs in scenarios
+        ))
+        return {key: summary for (key, _, _, _), summary in zip(scenarios, summaries)}
+
+    def _report(self, key, mode, concurrency, summary):
+        latency = summary["latency_ms"]
+        self.stdout.write(
+            f"{mode:<8} c={concurrency:<4} {key:<32} {summary['throughput_rps']:8.1f} req/s"
+            f"  p50 {latency['p50']} ms  p95 {latency['p95']} ms  p99 {latency['p99']} ms"
+            f"  statuses {summary['statuses']}  errors {summary['errors']}"
+        )
@@ -0,0 +1,29 @@
+# CALLI/backend/call_app/management/commands/drain_call_retries.py
+
+import asyncio
+
+from django.core.management.base import BaseCommand
+
+from call_app.retries import CALL_RETRY_BATCH_SIZE, CALL_RETRY_CONCURRENCY, drain_call_retries
+
+
+class Command(BaseCommand):
+    help = "Dial due calls from the retry queue in batches (run_scheduler does this too while it is leader)."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--batch-size", type=int, default=CALL_RETRY_BATCH_SIZE)
+        parser.add_argument("--concurrency", type=int, default=CALL_RETRY_CONCURRENCY)
+        parser.add_argument("--loop", action="store_true", help="Keep draining every --interval seconds")
+        parser.add_argument("--interval", type=float, default=30)
+
+    def handle(self, *args, **options):
+        asyncio.run(self._drain(options))
+
+    async def _drain(self, options):
+        # One event loop for the whole command, so pooled connections are reused across batches
+        while True:
+            summary = await drain_call_retries(options["batch_size"], options["concurrency"])
+            self.stdout.write(f"Drained call retries: {summary}")
+            if not options["loop"]:
+                return
+            await asyncio.sleep(options["interval"])
@@ -0,0 +1,28 @@
+# CALLI/backend/call_app/management/commands/import_bookings.py
+
+import json
+
+from django.core.management.base import BaseCommand, CommandError
+
+from call_app.importers import IMPORT_BATCH_SIZE, detect_import_format, import_bookings
+
+
+class Command(BaseCommand):
+    help = "Bulk import bookings from a CSV or NDJSON export (e.g. the nightly PMS file)."
+
+    def add_arguments(self, parser):
+        parser.add_argument("path", help="CSV or NDJSON file to import")
+        parser.add_argument("--format", choices=["csv", "ndjson"], help="Defaults to the file extension")
+        parser.add_argument("--batch-size", type=int, default=IMPORT_BATCH_SIZE)
+
+    def handle(self, *args, **options):
+        file_format = options["format"] or detect_import_format(options["path"])
+        try:
+            with open(options["path"], "rb") as f:
+                report = import_bookings(f, file_format, batch_size=options["batch_size"])
+        except OSError as e:
+            raise CommandError(f"Could not read {options['path']}: {e}")
+
+        for error in report["errors"]:
+            self.stderr.write(f"Row {error['row']}: {json.dumps(error['errors'])}")
+        self.stdout.write(self.style.SUCCESS(f"Imported {report['created']} bookings, {report['failed']} rows failed."))
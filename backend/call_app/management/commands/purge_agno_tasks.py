@@ -0,0 +1,21 @@
+# CALLI/backend/call_app/management/commands/purge_agno_tasks.py
+
+from datetime import timedelta
+
+from django.core.management.base import BaseCommand
+from django.utils import timezone
+
+from call_app.models import AgnoTaskRecord
+from call_app.task_store import AGNO_TASK_STORE_RETENTION_DAYS
+
+
+class Command(BaseCommand):
+    help = "Delete persisted Agno task records older than --days (DjangoTaskStore also does this on its own)."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--days", type=int, default=AGNO_TASK_STORE_RETENTION_DAYS or 30)
+
+    def handle(self, *args, **options):
+        cutoff = timezone.now() - timedelta(days=options["days"])
+        deleted, _ = AgnoTaskRecord.objects.filter(created_at__lt=cutoff).delete()
+        self.stdout.write(self.style.SUCCESS(f"Removed {deleted} Agno task records older than {options['days']} days."))
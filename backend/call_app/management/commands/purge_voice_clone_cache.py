@@ -0,0 +1,13 @@
+# CALLI/backend/call_app/management/commands/purge_voice_clone_cache.py
+
+from django.core.management.base import BaseCommand
+
+from call_app.voice_cache import voice_clone_cache
+
+
+class Command(BaseCommand):
+    help = "Delete persisted voice-clone cache entries older than VOICE_CLONE_CACHE_TTL."
+
+    def handle(self, *args, **options):
+        deleted = voice_clone_cache.purge_expired()
+        self.stdout.write(self.style.SUCCESS(f"Removed {deleted} expired voice-clone cache entries."))
@@ -0,0 +1,19 @@
+# CALLI/backend/call_app/management/commands/rebuild_call_stats.py
+
+from datetime import date
+
+from django.core.management.base import BaseCommand
+
+from call_app.analytics import rebuild_call_stats
+
+
+class Command(BaseCommand):
+    help = "Recompute the daily call rollup (CallDailyStat) from the call log, optionally for a date range."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--from", dest="date_from", type=date.fromisoformat, help="First day (YYYY-MM-DD)")
+        parser.add_argument("--to", dest="date_to", type=date.fromisoformat, help="Last day (YYYY-MM-DD)")
+
+    def handle(self, *args, **options):
+        buckets = rebuild_call_stats(options["date_from"], options["date_to"])
+        self.stdout.write(self.style.SUCCESS(f"Rebuilt {buckets} daily call stat rows."))
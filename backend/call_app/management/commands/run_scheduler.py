@@ -0,0 +1,27 @@
+# CALLI/backend/call_app/management/commands/run_scheduler.py
+
+import asyncio
+
+from django.core.management.base import BaseCommand
+
+from call_app.scheduler import SCHEDULER_TICK_SECONDS, CallScheduler
+
+
+class Command(BaseCommand):
+    help = (
+        "Run the confirmation/survey call schedules (CALL_SCHEDULES) in-process. "
+        "Safe to start on several hosts: only the holder of the leader lease dials."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--once", action="store_true", help="Run whatever is due now, then exit")
+        parser.add_argument("--tick", type=float, default=SCHEDULER_TICK_SECONDS, help="Seconds between checks")
+
+    def handle(self, *args, **options):
+        scheduler = CallScheduler(tick=options["tick"], log=self.stdout.write)
+        for schedule in scheduler.schedules:
+            self.stdout.write(f"Schedule {schedule.name}: '{schedule.cron.expression}' ({schedule.call_type}, offset {schedule.offset_days:+d} days)")
+        try:
+            asyncio.run(scheduler.serve(once=options["once"]))
+        except KeyboardInterrupt:
+            self.stdout.write("Scheduler stopped.")
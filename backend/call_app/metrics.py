@@ -0,0 +1,225 @@
+# CALLI/backend/call_app/metrics.py
+#
+# Process-local metrics in the Prometheus text exposition format, served at /metrics. Every worker
+# process keeps its own numbers: scrape each worker (or run one worker per container), not a
+# load-balanced URL.
+
+import bisect
+import contextvars
+import threading
+import time
+
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction
+from django.conf import settings
+from django.core.exceptions import MiddlewareNotUsed
+
+# --- Metrics settings (overridable in settings.py) ---
+METRICS_ENABLED = getattr(settings, "METRICS_ENABLED", True)
+METRICS_TOKEN = getattr(settings, "METRICS_TOKEN", None) # When set, /metrics requires "Authorization: Bearer <token>"
+METRICS_LATENCY_BUCKETS = tuple(getattr(
+    settings, "METRICS_LATENCY_BUCKETS", (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0),
+)) # seconds
+QUERY_COUNT_BUCKETS = (0, 1, 2, 5, 10, 20, 50, 100, 200, 500)
+
+CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+# Anything else is reported as "other" so odd clients can't grow the label set
+HTTP_METHODS = {"GET", "HEAD", "POST", "PUT", "PATCH", "DELETE", "OPTIONS"}
+
+REGISTRY = []
+
+
+def _label_value(value):
+    return ("true" if value else "false") if isinstance(value, bool) else str(value)
+
+
+def _escape(value):
+    return str(value).replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+class _Metric:
+    kind = None
+
+    def __init__(self, name, documentation, labelnames=()):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self._lock = threading.Lock()
+        self._values = {} # label values tuple -> value
+        REGISTRY.append(self)
+
+    def _key(self, labels):
+        return tuple(_label_value(labels[name]) for name in self.labelnames)
+
+    def _labels(self, key, extra=()):
+        pairs = list(zip(self.labelnames, key)) + list(extra)
+        if not pairs:
+            return ""
+        return "{" + ",".join(f'{name}="{_escape(value)}"' for name, value in pairs) + "}"
+
+    def render(self):
+        lines = [f"# HELP {self.name} {self.documentation}", f"# TYPE {self.name} {self.kind}"]
+        lines.extend(self._samples(self._snapshot()))
+        return lines
+
+
+class Counter(_Metric):
+    kind = "counter"
+
+    def inc(self, amount=1, **labels):
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0) + amount
+
+    def _snapshot(self):
+        with self._lock:
+            return sorted(self._values.items())
+
+    def _samples(self, items):
+        for key, value in items:
+            yield f"{self.name}{self._labels(key)} {value}"
+
+
+class Histogram(_Metric):
+    kind = "histogram"
+
+    def __init__(self, name, documentation, labelnames=(), buckets=METRICS_LATENCY_BUCKETS):
+        super().__init__(name, documentation, labelnames)
+        self.buckets = tuple(sorted(buckets))
+
+    def observe(self, value, **labels):
+        key = self._key(labels)
+        index = bisect.bisect_left(self.buckets, value) # first bucket with value <= le; len() is +Inf
+        with self._lock:
+            state = self._values.get(key)
+            if state is None:
+                state = self._values[key] = [[0] * (len(self.buckets) + 1), 0.0]
+            state[0][index] += 1
+            state[1] += value
+
+    def _snapshot(self):
+        with self._lock:
+            return sorted((key, (list(counts), total)) for key, (counts, total) in self._values.items())
+
+    def _samples(self, items):
+        for key, (counts, total) in items:
+            cumulative = 0
+            for bound, count in zip(self.buckets, counts):
+                cumulative += count
+                yield f"{self.name}_bucket{self._labels(key, [('le', repr(float(bound)))])} {cumulative}"
+            cumulative += counts[-1]
+            yield f"{self.name}_bucket{self._labels(key, [('le', '+Inf')])} {cumulative}"
+            yield f"{self.name}_sum{self._labels(key)} {total!r}"
+            yield f"{self.name}_count{self._labels(key)} {cumulative}"
+
+
+def render_metrics():
+    return "\n".join(line for metric in REGISTRY for line in metric.render()) + "\n"
+
+
+# --- Metrics ---
+HTTP_REQUESTS = Counter(
+    "calli_http_requests_total", "HTTP requests handled, by route, method and status.", ["route", "method", "status"],
+)
+HTTP_REQUEST_DURATION = Histogram(
+    "calli_http_request_duration_seconds",
+    "Time until the response is ready (streamed bodies excluded), by route and method.", ["route", "method"],
+)
+HTTP_REQUEST_DB_QUERIES = Histogram(
+    "calli_http_request_db_queries", "Database queries executed per request, by route.", ["route"],
+    buckets=QUERY_COUNT_BUCKETS,
+)
+HTTP_REQUEST_DB_SECONDS = Histogram(
+    "calli_http_request_db_seconds", "Time spent in database queries per request, by route.", ["route"],
+)
+DB_QUERY_DURATION = Histogram(
+    "calli_db_query_duration_seconds", "Latency of every database query, by connection alias.", ["alias"],
+)
+AGENT_TASK_DURATION = Histogram(
+    "calli_agent_task_duration_seconds", "run_agno_task latency, by agent, action, status and dispatch path.",
+    ["agent", "action", "status", "fast_path"],
+)
+OUTBOUND_HTTP_DURATION = Histogram(
+    "calli_outbound_http_duration_seconds",
+    "Latency of each outbound HTTP attempt, by host, method and status ('error' if no response).",
+    ["host", "method", "status"],
+)
+OUTBOUND_HTTP_RETRIES = Counter(
+    "calli_outbound_http_retries_total", "Outbound HTTP attempts that were retried, by host.", ["host"],
+)
+
+
+# --- Database queries ---
+# [query count, seconds] of the request being handled. The ORM's sync_to_async threads run in a
+# copy of the request's context, so their queries land in the same list.
+_request_db_stats = contextvars.ContextVar("calli_request_db_stats", default=None)
+
+
+def _time_query(execute, sql, params, many, context):
+    started = time.perf_counter()
+    try:
+        return execute(sql, params, many, context)
+    finally:
+        elapsed = time.perf_counter() - started
+        DB_QUERY_DURATION.observe(elapsed, alias=context["connection"].alias)
+        stats = _request_db_stats.get()
+        if stats is not None:
+            stats[0] += 1
+            stats[1] += elapsed
+
+
+def instrument_connection(sender, connection, **kwargs):
+    """connection_created receiver: time every query run on the new connection."""
+    if _time_query not in connection.execute_wrappers:
+        # Outermost, so a caller's `with connection.execute_wrapper(...)` still pops its own wrapper
+        connection.execute_wrappers.insert(0, _time_query)
+
+
+# --- HTTP requests ---
+
+class MetricsMiddleware:
+    """Records latency, status and database work per resolved route. Put it first in MIDDLEWARE
+    so the time spent in the other middleware is included."""
+
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        if not METRICS_ENABLED:
+            raise MiddlewareNotUsed
+        self.get_response = get_response
+        self.is_async = iscoroutinefunction(get_response)
+        if self.is_async:
+            markcoroutinefunction(self)
+
+    def __call__(self, request):
+        if self.is_async:
+            return self.__acall__(request)
+        started, token = time.perf_counter(), _request_db_stats.set([0, 0.0])
+        try:
+            response = self.get_response(request)
+        finally:
+            stats = _request_db_stats.get()
+            _request_db_stats.reset(token)
+        self._record(request, response, started, stats)
+        return response
+
+    async def __acall__(self, request):
+        started, token = time.perf_counter(), _request_db_stats.set([0, 0.0])
+        try:
+            response = await self.get_response(request)
+        finally:
+            stats = _request_db_stats.get()
+            _request_db_stats.reset(token)
+        self._record(request, response, started, stats)
+        return response
+
+    @staticmethod
+    def _record(request, response, started, stats):
+        elapsed = time.perf_counter() - started
+        match = getattr(request, "resolver_match", None)
+        route = match.view_name if match else "unmatched"
+        method = request.method if request.method in HTTP_METHODS else "other"
+        HTTP_REQUESTS.inc(route=route, method=method, status=response.status_code)
+        HTTP_REQUEST_DURATION.observe(elapsed, route=route, method=method)
+        HTTP_REQUEST_DB_QUERIES.observe(stats[0], route=route)
+        HTTP_REQUEST_DB_SECONDS.observe(stats[1], route=route)
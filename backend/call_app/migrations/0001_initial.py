@@ -0,0 +1,43 @@
+# Generated by Django 5.2.18 on 2026-10-18 04:18
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    initial = True
+
+    dependencies = [
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='Booking',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('guest_name', models.CharField(max_length=255)),
+                ('phone_number', models.CharField(max_length=20)),
+                ('check_in_date', models.DateField()),
+                ('room_number', models.CharField(max_length=50)),
+                ('confirmation_call_made', models.BooleanField(default=False)),
+                ('survey_completed', models.BooleanField(default=False)),
+                ('check_out_date', models.DateField()),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+            ],
+        ),
+        migrations.CreateModel(
+            name='CallLog',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('guest_name', models.CharField(max_length=255)),
+                ('phone_number', models.CharField(max_length=20)),
+                ('call_type', models.CharField(max_length=100)),
+                ('status', models.CharField(max_length=100)),
+                ('duration', models.IntegerField(blank=True, null=True)),
+                ('timestamp', models.DateTimeField(auto_now_add=True)),
+                ('audio_file', models.CharField(blank=True, max_length=255, null=True)),
+                ('booking', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='call_logs', to='call_app.booking')),
+            ],
+        ),
+    ]
@@ -0,0 +1,25 @@
+# Generated by Django 5.2.18 on 2026-10-18 04:18
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('call_app', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='booking',
+            index=models.Index(condition=models.Q(('confirmation_call_made', False)), fields=['check_in_date'], name='booking_pending_confirm_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='booking',
+            index=models.Index(condition=models.Q(('survey_completed', False)), fields=['check_out_date'], name='booking_survey_due_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='calllog',
+            index=models.Index(fields=['booking', 'timestamp'], name='calllog_booking_ts_idx'),
+        ),
+    ]
@@ -0,0 +1,17 @@
+# Generated by Django 5.2.18 on 2026-10-18 04:19
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('call_app', '0002_booking_calllog_indexes'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='calllog',
+            index=models.Index(fields=['-timestamp', '-id'], name='calllog_timestamp_idx'),
+        ),
+    ]
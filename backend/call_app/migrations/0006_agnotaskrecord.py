@@ -0,0 +1,34 @@
+# Generated by Django 5.2.18 on 2026-10-18 04:25
+
+import django.core.serializers.json
+import django.utils.timezone
+import uuid
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('call_app', '0005_agentjob'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='AgnoTaskRecord',
+            fields=[
+                ('task_id', models.UUIDField(default=uuid.uuid4, editable=False, primary_key=True, serialize=False)),
+                ('task_name', models.CharField(max_length=255)),
+                ('agent_name', models.CharField(max_length=100)),
+                ('action', models.CharField(max_length=100)),
+                ('status', models.CharField(max_length=20)),
+                ('output', models.JSONField(blank=True, encoder=django.core.serializers.json.DjangoJSONEncoder, null=True)),
+                ('error', models.TextField(blank=True, default='')),
+                ('fast_path', models.BooleanField(default=False)),
+                ('duration_ms', models.FloatField(blank=True, null=True)),
+                ('created_at', models.DateTimeField(default=django.utils.timezone.now)),
+            ],
+            options={
+                'indexes': [models.Index(fields=['-created_at'], name='agno_task_created_idx')],
+            },
+        ),
+    ]
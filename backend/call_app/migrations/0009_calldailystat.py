@@ -0,0 +1,28 @@
+# Generated by Django 5.2.18 on 2026-10-18 04:32
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('call_app', '0008_callretry'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='CallDailyStat',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('day', models.DateField()),
+                ('call_type', models.CharField(max_length=100)),
+                ('status', models.CharField(max_length=100)),
+                ('call_count', models.PositiveIntegerField(default=0)),
+                ('timed_count', models.PositiveIntegerField(default=0)),
+                ('total_duration', models.BigIntegerField(default=0)),
+            ],
+            options={
+                'constraints': [models.UniqueConstraint(fields=('day', 'call_type', 'status'), name='call_daily_stat_unique')],
+            },
+        ),
+    ]
@@ -0,0 +1,27 @@
+# Generated by Django 5.2.18 on 2026-10-18 05:06
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('call_app', '0009_calldailystat'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='agentjob',
+            name='heartbeat_at',
+            field=models.DateTimeField(blank=True, null=True),
+        ),
+        migrations.AddField(
+            model_name='agentjob',
+            name='worker',
+            field=models.CharField(blank=True, default='', max_length=100),
+        ),
+        migrations.AddIndex(
+            model_name='agentjob',
+            index=models.Index(fields=['status', 'heartbeat_at'], name='call_app_ag_status_84370e_idx'),
+        ),
+    ]
@@ -0,0 +1,18 @@
+# Generated by Django 5.2.18 on 2026-10-18 05:17
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('call_app', '0010_agentjob_lease'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='callretry',
+            name='status',
+            field=models.CharField(choices=[('pending', 'Pending'), ('in_progress', 'In progress'), ('succeeded', 'Succeeded'), ('exhausted', 'Exhausted'), ('needs_review', 'Needs review')], default='pending', max_length=20),
+        ),
+    ]
@@ -0,0 +1,19 @@
+# Generated by Django 5.2.18 on 2026-10-18 05:18
+
+import django.utils.timezone
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('call_app', '0011_callretry_needs_review'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='calllog',
+            name='timestamp',
+            field=models.DateTimeField(default=django.utils.timezone.now),
+        ),
+    ]
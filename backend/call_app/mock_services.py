@@ -0,0 +1,66 @@
+# CALLI/backend/call_app/mock_services.py
+#
+# Local stand-in for the Hugging Face inference API, used by `manage.py bench_suite` so load
+# tests run offline. A plain ASGI app with no Django imports:
+#
+#     MOCK_HF_LATENCY_MS=800 uvicorn call_app.mock_services:app --port 8765
+#
+# then point HF_INFERENCE_API_BASE at http://127.0.0.1:8765. Outbound calls need no mock: they
+# are simulated in-process by CallAgent.
+
+import asyncio
+import hashlib
+import json
+import os
+import random
+
+# Simulated upstream latency: each response waits latency +/- jitter milliseconds
+MOCK_HF_LATENCY_MS = float(os.environ.get("MOCK_HF_LATENCY_MS", 500))
+MOCK_JITTER = float(os.environ.get("MOCK_JITTER", 0.2)) # fraction of the latency
+
+
+async def _read_body(receive):
+    body = bytearray()
+    while True:
+        message = await receive()
+        body += message.get("body", b"")
+        if not message.get("more_body"):
+            return bytes(body)
+
+
+async def _respond(send, status, payload):
+    body = json.dumps(payload).encode()
+    await send({
+        "type": "http.response.start",
+        "status": status,
+        "headers": [(b"content-type", b"application/json"), (b"content-length", str(len(body)).encode())],
+    })
+    await send({"type": "http.response.body", "body": body})
+
+
+async def _wait(latency_ms):
+    await asyncio.sleep(max(0.0, latency_ms * random.uniform(1 - MOCK_JITTER, 1 + MOCK_JITTER)) / 1000)
+
+
+async def app(scope, receive, send):
+    if scope["type"] == "lifespan":
+        while True:
+            message = await receive()
+            if message["type"] == "lifespan.startup":
+                await send({"type": "lifespan.startup.complete"})
+            elif message["type"] == "lifespan.shutdown":
+                await send({"type": "lifespan.shutdown.complete"})
+                return
+    if scope["type"] != "http":
+        return
+
+    body = await _read_body(receive)
+    path = scope["path"]
+    if scope["method"] == "POST" and path.startswith("/models/"):
+        # Voice cloning: the same sample always clones to the same voice id
+        await _wait(MOCK_HF_LATENCY_MS)
+        await _respond(send, 200, {"voice_id": "mock-" + hashlib.sha256(body).hexdigest()[:16]})
+    elif path == "/health":
+        await _respond(send, 200, {"status": "ok"})
+    else:
+        await _respond(send, 404, {"detail": "Not found."})
@@ -1,6 +1,22 @@
 # CALLI/backend/call_app/models.py
 
+import uuid
+
+from django.core.serializers.json import DjangoJSONEncoder
 from django.db import models
+from django.db.models import Q
+from django.utils import timezone
+
+
+class BookingQuerySet(models.QuerySet):
+    # These filters mirror the partial indexes declared on Booking.Meta; keep them in sync
+    # so the planner can answer the agent queries from the index instead of a table scan.
+    def pending_confirmation(self, from_date):
+        return self.filter(confirmation_call_made=False, check_in_date__gte=from_date)
+
+    def due_for_survey(self, since, until):
+        return self.filter(survey_completed=False, check_out_date__gte=since, check_out_date__lte=until)
+
 
 class Booking(models.Model):
     guest_name = models.CharField(max_length=255)
@@ -12,6 +28,24 @@ class Booking(models.Model):
     check_out_date = models.DateField() # Changed to DateField for Django
     created_at = models.DateTimeField(auto_now_add=True) # Added for tracking
 
+    objects = BookingQuerySet.as_manager()
+
+    class Meta:
+        indexes = [
+            # BookingManagementAgent.check_pending_confirmations
+            models.Index(
+                fields=['check_in_date'],
+                condition=Q(confirmation_call_made=False),
+                name='booking_pending_confirm_idx',
+            ),
+            # BookingManagementAgent.get_recent_checkouts_for_survey
+            models.Index(
+                fields=['check_out_date'],
+                condition=Q(survey_completed=False),
+                name='booking_survey_due_idx',
+            ),
+        ]
+
     def __str__(self):
         return f"{self.guest_name} - Room {self.room_number}"
 
@@ -22,8 +56,178 @@ class CallLog(models.Model):
     call_type = models.CharField(max_length=100)
     status = models.CharField(max_length=100)
     duration = models.IntegerField(null=True, blank=True) # Duration in seconds
-    timestamp = models.DateTimeField(auto_now_add=True) # Automatically sets on creation
+    timestamp = models.DateTimeField(default=timezone.now) # Time of the call; results ingested later keep the provider's time
     audio_file = models.CharField(max_length=255, null=True, blank=True)
 
+    class Meta:
+        indexes = [
+            # Call history per booking, newest first
+            models.Index(fields=['booking', 'timestamp'], name='calllog_booking_ts_idx'),
+            # Keyset pagination of the call log list
+            models.Index(fields=['-timestamp', '-id'], name='calllog_timestamp_idx'),
+        ]
+
+    def __str__(self):
+        return f"Call to {self.guest_name} ({self.call_type}) - {self.status}"
+
+class VoiceCloneResult(models.Model):
+    # Persistent tier of the voice-clone cache (see call_app/voice_cache.py):
+    # sha256 of the uploaded audio + inference model -> cloned voice id
+    content_hash = models.CharField(max_length=64)
+    model_id = models.CharField(max_length=255)
+    voice_id = models.CharField(max_length=255)
+    created_at = models.DateTimeField(auto_now_add=True)
+    last_used_at = models.DateTimeField(auto_now=True)
+    hit_count = models.PositiveIntegerField(default=0)
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(fields=['content_hash', 'model_id'], name='voice_clone_result_key'),
+        ]
+
+    def __str__(self):
+        return f"{self.content_hash[:12]} ({self.model_id}) -> {self.voice_id}"
+
+
+class AgentJob(models.Model):
+    # An Agno task accepted with 202 and executed in the background by call_app/jobs.py
+    STATUS_QUEUED = 'queued'
+    STATUS_RUNNING = 'running'
+    STATUS_COMPLETED = 'completed'
+    STATUS_FAILED = 'failed'
+    STATUS_CHOICES = [
+        (STATUS_QUEUED, 'Queued'),
+        (STATUS_RUNNING, 'Running'),
+        (STATUS_COMPLETED, 'Completed'),
+        (STATUS_FAILED, 'Failed'),
+    ]
+
+    id = models.UUIDField(primary_key=True, default=uuid.uuid4, editable=False)
+    task_name = models.CharField(max_length=255)
+    agent_name = models.CharField(max_length=100)
+    action = models.CharField(max_length=100)
+    args = models.JSONField(default=dict, blank=True)
+    status = models.CharField(max_length=20, choices=STATUS_CHOICES, default=STATUS_QUEUED)
+    result = models.JSONField(null=True, blank=True)
+    error = models.TextField(blank=True, default='')
+    created_at = models.DateTimeField(auto_now_add=True)
+    started_at = models.DateTimeField(null=True, blank=True)
+    finished_at = models.DateTimeField(null=True, blank=True)
+    # Lease of the worker process that owns a queued/running job, renewed while it is alive
+    worker = models.CharField(max_length=100, blank=True, default='')
+    heartbeat_at = models.DateTimeField(null=True, blank=True)
+
+    class Meta:
+        indexes = [models.Index(fields=['status', 'heartbeat_at'])]
+
+    def __str__(self):
+        return f"{self.task_name} [{self.status}]"
+
+
+class AgnoTaskRecord(models.Model):
+    # Durable history of run_agno_task calls, written in batches by call_app/task_store.py
+    task_id = models.UUIDField(primary_key=True, default=uuid.uuid4, editable=False)
+    task_name = models.CharField(max_length=255)
+    agent_name = models.CharField(max_length=100)
+    action = models.CharField(max_length=100)
+    status = models.CharField(max_length=20)
+    output = models.JSONField(null=True, blank=True, encoder=DjangoJSONEncoder)
+    error = models.TextField(blank=True, default='')
+    fast_path = models.BooleanField(default=False)
+    duration_ms = models.FloatField(null=True, blank=True)
+    created_at = models.DateTimeField(default=timezone.now)
+
+    class Meta:
+        indexes = [
+            models.Index(fields=['-created_at'], name='agno_task_created_idx'),
+        ]
+
+    def __str__(self):
+        return f"{self.agent_name}.{self.action} [{self.status}]"
+
+
+class SchedulerLease(models.Model):
+    # Leader lock of the in-process call scheduler: only the holder of an unexpired lease runs schedules
+    name = models.CharField(max_length=100, primary_key=True)
+    owner = models.CharField(max_length=255)
+    expires_at = models.DateTimeField()
+
+    def __str__(self):
+        return f"{self.name} held by {self.owner} until {self.expires_at}"
+
+
+class ScheduleState(models.Model):
+    # Last fire time per schedule, used to catch up on runs missed while no scheduler was up
+    name = models.CharField(max_length=100, primary_key=True)
+    last_run_at = models.DateTimeField(null=True, blank=True)
+    last_result = models.JSONField(null=True, blank=True, encoder=DjangoJSONEncoder)
+
+    def __str__(self):
+        return f"{self.name} (last run {self.last_run_at})"
+
+
+class CallRetry(models.Model):
+    # Durable retry queue entry for a failed outbound call (see call_app/retries.py)
+    STATUS_PENDING = 'pending'
+    STATUS_IN_PROGRESS = 'in_progress'
+    STATUS_SUCCEEDED = 'succeeded'
+    STATUS_EXHAUSTED = 'exhausted'
+    STATUS_NEEDS_REVIEW = 'needs_review' # The last attempt may have reached the guest; not redialed automatically
+    STATUS_CHOICES = [
+        (STATUS_PENDING, 'Pending'),
+        (STATUS_IN_PROGRESS, 'In progress'),
+        (STATUS_SUCCEEDED, 'Succeeded'),
+        (STATUS_EXHAUSTED, 'Exhausted'),
+        (STATUS_NEEDS_REVIEW, 'Needs review'),
+    ]
+    ACTIVE_STATUSES = (STATUS_PENDING, STATUS_IN_PROGRESS)
+
+    booking = models.ForeignKey(Booking, on_delete=models.CASCADE, related_name='call_retries')
+    call_type = models.CharField(max_length=100)
+    status = models.CharField(max_length=20, choices=STATUS_CHOICES, default=STATUS_PENDING)
+    attempts = models.PositiveIntegerField(default=0)
+    max_attempts = models.PositiveIntegerField(default=3)
+    next_attempt_at = models.DateTimeField()
+    last_error = models.TextField(blank=True, default='')
+    call_log = models.ForeignKey(CallLog, null=True, blank=True, on_delete=models.SET_NULL, related_name='+') # Log of the attempt that succeeded
+    created_at = models.DateTimeField(auto_now_add=True)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        indexes = [
+            # The drain query: due pending retries, oldest first
+            models.Index(fields=['next_attempt_at'], condition=Q(status='pending'), name='call_retry_due_idx'),
+        ]
+        constraints = [
+            # At most one active retry per booking and call type
+            models.UniqueConstraint(
+                fields=['booking', 'call_type'],
+                condition=Q(status__in=['pending', 'in_progress']),
+                name='call_retry_one_active',
+            ),
+        ]
+
+    def __str__(self):
+        return f"Retry {self.call_type} call for booking {self.booking_id} [{self.status}, {self.attempts}/{self.max_attempts}]"
+
+
+class CallDailyStat(models.Model):
+    """Daily CallLog rollup per call type and status, kept up to date as calls are logged.
+
+    Maintained incrementally by call_app.analytics; `manage.py rebuild_call_stats` recomputes it
+    from the log (backfill, or after CallLog rows were edited in place).
+    """
+    day = models.DateField()
+    call_type = models.CharField(max_length=100)
+    status = models.CharField(max_length=100)
+    call_count = models.PositiveIntegerField(default=0)
+    timed_count = models.PositiveIntegerField(default=0) # Calls that reported a duration
+    total_duration = models.BigIntegerField(default=0) # Seconds, summed over timed calls
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(fields=['day', 'call_type', 'status'], name='call_daily_stat_unique'),
+        ]
+
     def __str__(self):
-        return f"Call to {self.guest_name} ({self.call_type}) - {self.status}"
\ No newline at end of file
+        return f"{self.day} {self.call_type}/{self.status}: {self.call_count} calls"
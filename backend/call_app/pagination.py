@@ -0,0 +1,79 @@
+# CALLI/backend/call_app/pagination.py
+
+from asgiref.sync import sync_to_async
+from django.core.handlers.asgi import ASGIRequest
+from django.http import StreamingHttpResponse
+from rest_framework.exceptions import ValidationError
+from rest_framework.pagination import CursorPagination
+from rest_framework.utils.encoders import JSONEncoder
+
+
+# --- Keyset (cursor) pagination ---
+# Cursor pagination seeks straight to the next page with an indexed WHERE clause,
+# so deep pages cost the same as the first one (no OFFSET scans).
+
+class BookingCursorPagination(CursorPagination):
+    ordering = '-id' # Newest bookings first, so the first page is the one the dashboard shows
+    page_size = 100
+    page_size_query_param = 'page_size'
+    max_page_size = 1000
+
+
+class CallLogCursorPagination(CursorPagination):
+    ordering = ('-timestamp', '-id') # Newest calls first
+    page_size = 100
+    page_size_query_param = 'page_size'
+    max_page_size = 1000
+
+
+# --- NDJSON streaming ---
+
+class NDJSONStreamMixin:
+    """List views mixing this in stream every row as NDJSON when called with ``?stream=ndjson``.
+
+    Rows are fetched in primary-key chunks and serialized one chunk at a time, so worker
+    memory stays bounded by ``stream_chunk_size`` no matter how large the table is.
+    ``?after=<id>`` resumes a stream after the last id a client received. Under ASGI the stream
+    is an async iterator: Django would read a sync one into memory before sending it.
+    """
+    stream_chunk_size = 500
+
+    def list(self, request, *args, **kwargs):
+        if request.query_params.get('stream') == 'ndjson':
+            queryset = self.filter_queryset(self.get_queryset())
+            after = request.query_params.get('after')
+            if after is not None:
+                try:
+                    queryset = queryset.filter(pk__gt=int(after))
+                except ValueError:
+                    raise ValidationError({"after": "Must be an integer id."})
+            queryset = queryset.order_by('pk')
+            if isinstance(request._request, ASGIRequest):
+                rows = self.aiter_ndjson(queryset)
+            else:
+                rows = self.iter_ndjson(queryset)
+            return StreamingHttpResponse(rows, content_type='application/x-ndjson')
+        return super().list(request, *args, **kwargs)
+
+    def ndjson_chunk(self, queryset, after=None):
+        """NDJSON lines of the next chunk of rows after pk ``after``, the last pk in the chunk,
+        and whether there may be more rows."""
+        chunk = list((queryset if after is None else queryset.filter(pk__gt=after))[:self.stream_chunk_size])
+        encoder = JSONEncoder()
+        lines = ''.join(encoder.encode(row) + '\n' for row in self.get_serializer(chunk, many=True).data)
+        return lines, chunk[-1].pk if chunk else after, len(chunk) == self.stream_chunk_size
+
+    def iter_ndjson(self, queryset):
+        last_pk, more = None, True
+        while more:
+            lines, last_pk, more = self.ndjson_chunk(queryset, last_pk)
+            if lines:
+                yield lines
+
+    async def aiter_ndjson(self, queryset):
+        # Each chunk is fetched and serialized on a worker thread; the event loop only sends it
+        last_pk, more = None, True
+        while more:
+            lines, last_pk, more = await sync_to_async(self.ndjson_chunk)(queryset, last_pk)
+            if lines:
+                yield lines
@@ -0,0 +1,317 @@
+# CALLI/backend/call_app/profiling.py
+#
+# Opt-in profiling of single requests from real traffic. A request is profiled when it sends the
+# PROFILING_TOKEN in the X-Calli-Profile header, or at random with probability PROFILING_SAMPLE_RATE.
+# While it runs, a sampler thread records every PROFILING_INTERVAL seconds the stacks that belong to
+# that request:
+#
+#   - the thread it runs on under WSGI, or under ASGI the sync_to_async thread Django gives each
+#     request, which runs its ORM queries and sync views;
+#   - under ASGI, its task on the event loop: the running frames while it has the loop, otherwise
+#     the chain of coroutines it is waiting in (an Agno task, an inference call...).
+#
+# So a profile is the wall-clock time of that one request, even with other requests interleaved on
+# the same loop. Child tasks it spawns (asyncio.gather in campaigns) only show up through their ORM
+# work. Profiles are collapsed stacks ("frame;frame;frame count" per line, as read by speedscope,
+# flamegraph.pl and inferno), kept as a ring buffer of the newest PROFILING_MAX_PROFILES files in
+# PROFILING_DIR and listed/downloaded at /profiles/.
+
+import asyncio
+import functools
+import hmac
+import json
+import os
+import random
+import re
+import sys
+import threading
+import time
+import uuid
+from collections import Counter
+from datetime import datetime, timezone
+
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction, sync_to_async
+from django.conf import settings
+from django.core.exceptions import MiddlewareNotUsed
+
+# --- Profiling settings (overridable in settings.py) ---
+PROFILING_TOKEN = getattr(settings, "PROFILING_TOKEN", None) # Triggers profiling and unlocks /profiles/
+PROFILING_SAMPLE_RATE = float(getattr(settings, "PROFILING_SAMPLE_RATE", 0.0)) # Share of requests profiled at random
+PROFILING_INTERVAL = float(getattr(settings, "PROFILING_INTERVAL", 0.005)) # seconds between samples
+PROFILING_DIR = str(getattr(settings, "PROFILING_DIR", os.path.join(settings.BASE_DIR, "profiles")))
+PROFILING_MAX_PROFILES = max(1, int(getattr(settings, "PROFILING_MAX_PROFILES", 200)))
+
+PROFILE_HEADER = "X-Calli-Profile"
+PROFILE_ID_HEADER = "X-Calli-Profile-Id"
+MAX_STACK_DEPTH = 256
+_PROFILE_ID = re.compile(r"^\d{8}T\d{12}-[0-9a-f]{8}$")
+
+
+def profiling_exempt(view):
+    """Don't store profiles of requests to this view (the profile endpoints send the token too)."""
+    view.profiling_exempt = True
+    return view
+
+
+def profiling_authorized(request):
+    """True if the request carries the profiling token; without a token configured, only under DEBUG."""
+    if not PROFILING_TOKEN:
+        return settings.DEBUG
+    return hmac.compare_digest(request.headers.get(PROFILE_HEADER, "").encode(), PROFILING_TOKEN.encode())
+
+
+# --- Stacks ---
+
+@functools.lru_cache(maxsize=8192)
+def _frame_label(code):
+    directory, filename = os.path.split(code.co_filename)
+    if directory: # not "<frozen ...>" / "<string>"
+        filename = f"{os.path.basename(directory)}/{filename}"
+    return f"{code.co_name} ({filename}:{code.co_firstlineno})"
+
+
+def _thread_stack(frame):
+    stack = []
+    while frame is not None and len(stack) < MAX_STACK_DEPTH:
+        stack.append(_frame_label(frame.f_code))
+        frame = frame.f_back
+    stack.reverse()
+    return stack
+
+
+def _await_stack(coro):
+    """The coroutines a suspended task is waiting in, outermost first."""
+    stack = []
+    while coro is not None and len(stack) < MAX_STACK_DEPTH:
+        frame = getattr(coro, "cr_frame", None) or getattr(coro, "gi_frame", None) or getattr(coro, "ag_frame", None)
+        if frame is None:
+            break
+        stack.append(_frame_label(frame.f_code))
+        coro = getattr(coro, "cr_await", None) or getattr(coro, "gi_yieldfrom", None) or getattr(coro, "ag_await", None)
+    return stack
+
+
+def _idle(frame):
+    # The request's sync_to_async thread between calls: a ThreadPoolExecutor worker waiting for work
+    code = frame.f_code
+    return code.co_name == "_worker" and code.co_filename.endswith(os.path.join("concurrent", "futures", "thread.py"))
+
+
+class ProfileSession:
+    """The samples of one profiled request."""
+
+    def __init__(self, request, trigger):
+        self.created_at = datetime.now(timezone.utc)
+        self.id = f"{self.created_at:%Y%m%dT%H%M%S%f}-{uuid.uuid4().hex[:8]}"
+        self.request = request
+        self.trigger = trigger
+        self.threads = [] # idents of threads that only run this request
+        self.loop = self.task = self.loop_thread = None # ASGI only
+        self.stacks = Counter()
+        self.samples = 0
+        self.started = time.perf_counter()
+        self.duration = None
+
+    def sample(self, frames):
+        self.samples += 1
+        busy = False
+        for ident in self.threads:
+            frame = frames.get(ident)
+            if frame is not None and not _idle(frame):
+                self.stacks[";".join(_thread_stack(frame))] += 1
+                busy = True
+        if self.task is None:
+            return
+        if asyncio.current_task(self.loop) is self.task:
+            frame = frames.get(self.loop_thread)
+            if frame is not None:
+                self.stacks[";".join(_thread_stack(frame))] += 1
+        elif not busy:
+            # Waiting on the loop (not on its own thread, which was sampled above)
+            stack = _await_stack(self.task.get_coro())
+            if stack:
+                self.stacks[";".join(stack + ["(waiting)"])] += 1
+
+
+class _Sampler:
+    """One daemon thread per process samples every request being profiled; it sleeps while there are none."""
+
+    def __init__(self):
+        self._sessions = set()
+        self._lock = threading.Lock()
+        self._active = threading.Event()
+        self._thread = None
+
+    def add(self, session):
+        with self._lock:
+            self._sessions.add(session)
+            self._active.set()
+            if self._thread is None or not self._thread.is_alive(): # also after a fork
+                self._thread = threading.Thread(target=self._run, name="calli-profiler", daemon=True)
+                self._thread.start()
+
+    def remove(self, session):
+        # Takes the lock, so no sample of this session is still being recorded once it returns
+        with self._lock:
+            self._sessions.discard(session)
+            if not self._sessions:
+                self._active.clear()
+
+    def _run(self):
+        while True:
+            self._active.wait()
+            with self._lock:
+                if self._sessions:
+                    frames = sys._current_frames()
+                    for session in self._sessions:
+                        session.sample(frames)
+                    del frames
+            time.sleep(PROFILING_INTERVAL)
+
+
+_sampler = _Sampler()
+
+
+# --- Ring buffer on disk ---
+# <id>.folded holds the stacks and <id>.json the request metadata, written last so the listing
+# only shows complete profiles. Ids sort by creation time.
+
+def _profile_path(profile_id, extension):
+    return os.path.join(PROFILING_DIR, f"{profile_id}.{extension}")
+
+
+def _write(path, text):
+    temp_path = f"{path}.{uuid.uuid4().hex[:8]}.tmp"
+    with open(temp_path, "w", encoding="utf-8") as f:
+        f.write(text)
+    os.replace(temp_path, path)
+
+
+def _profile_ids():
+    try:
+        names = os.listdir(PROFILING_DIR)
+    except FileNotFoundError:
+        return []
+    return sorted(name[:-5] for name in names if name.endswith(".json") and _PROFILE_ID.match(name[:-5]))
+
+
+def save_profile(session, response):
+    """Store a finished session, then drop the oldest profiles beyond PROFILING_MAX_PROFILES."""
+    os.makedirs(PROFILING_DIR, exist_ok=True)
+    match = getattr(session.request, "resolver_match", None)
+    metadata = {
+        "id": session.id,
+        "created_at": session.created_at.isoformat(),
+        "method": session.request.method,
+        "path": session.request.path,
+        "route": match.view_name if match else None,
+        "status": response.status_code,
+        "duration_ms": round(session.duration * 1000, 2),
+        "trigger": session.trigger,
+        "samples": session.samples,
+        "interval_ms": PROFILING_INTERVAL * 1000,
+    }
+    _write(_profile_path(session.id, "folded"), "".join(f"{stack} {count}\n" for stack, count in sorted(session.stacks.items())))
+    _write(_profile_path(session.id, "json"), json.dumps(metadata))
+
+    profile_ids = _profile_ids()
+    for profile_id in profile_ids[:max(0, len(profile_ids) - PROFILING_MAX_PROFILES)]:
+        for extension in ("json", "folded"):
+            try:
+                os.remove(_profile_path(profile_id, extension))
+            except FileNotFoundError: # pruned by another worker
+                pass
+
+
+def list_profiles():
+    """Metadata of the stored profiles, newest first."""
+    profiles = []
+    for profile_id in reversed(_profile_ids()):
+        try:
+            with open(_profile_path(profile_id, "json"), encoding="utf-8") as f:
+                profiles.append(json.load(f))
+        except FileNotFoundError:
+            continue
+    return profiles
+
+
+def read_profile(profile_id):
+    """The collapsed stacks of a stored profile, or None if there is no such profile."""
+    if not _PROFILE_ID.match(profile_id):
+        return None
+    try:
+        with open(_profile_path(profile_id, "folded"), encoding="utf-8") as f:
+            return f.read()
+    except FileNotFoundError:
+        return None
+
+
+# --- Middleware ---
+
+class ProfilingMiddleware:
+    """Profiles the requests that ask for it (plus the random sample) and names the stored profile in
+    their X-Calli-Profile-Id response header. Other requests cost a header lookup and, with a sample
+    rate, one random(); with neither a token nor a sample rate the middleware isn't loaded at all.
+    Put it right after MetricsMiddleware so the rest of the stack is included."""
+
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        if not (PROFILING_TOKEN or PROFILING_SAMPLE_RATE > 0):
+            raise MiddlewareNotUsed
+        self.get_response = get_response
+        self.is_async = iscoroutinefunction(get_response)
+        if self.is_async:
+            markcoroutinefunction(self)
+
+    @staticmethod
+    def _trigger(request):
+        if PROFILING_TOKEN and PROFILE_HEADER in request.headers and profiling_authorized(request):
+            return "header"
+        if PROFILING_SAMPLE_RATE > 0 and random.random() < PROFILING_SAMPLE_RATE:
+            return "sample"
+        return None
+
+    def __call__(self, request):
+        if self.is_async:
+            return self.__acall__(request)
+        trigger = self._trigger(request)
+        if trigger is None:
+            return self.get_response(request)
+        session = ProfileSession(request, trigger)
+        session.threads.append(threading.get_ident())
+        _sampler.add(session)
+        try:
+            response = self.get_response(request)
+        finally:
+            _sampler.remove(session)
+        return self._finish(session, response)
+
+    async def __acall__(self, request):
+        trigger = self._trigger(request)
+        if trigger is None:
+            return await self.get_response(request)
+        session = ProfileSession(request, trigger)
+        # Django runs each ASGI request's sync code on a thread of its own; this finds out which
+        session.threads.append(await sync_to_async(threading.get_ident)())
+        session.loop, session.task, session.loop_thread = asyncio.get_running_loop(), asyncio.current_task(), threading.get_ident()
+        _sampler.add(session)
+        try:
+            response = await self.get_response(request)
+        finally:
+            _sampler.remove(session)
+        return await sync_to_async(self._finish, thread_sensitive=False)(session, response)
+
+    @staticmethod
+    def _finish(session, response):
+        session.duration = time.perf_counter() - session.started
+        match = getattr(session.request, "resolver_match", None)
+        if match and getattr(match.func, "profiling_exempt", False):
+            return response
+        try:
+            save_profile(session, response)
+        except OSError: # A full or read-only disk loses the profile, not the response
+            return response
+        response[PROFILE_ID_HEADER] = session.id
+        return response
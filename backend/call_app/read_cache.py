@@ -0,0 +1,133 @@
+# CALLI/backend/call_app/read_cache.py
+
+import functools
+import hashlib
+import uuid
+from contextlib import nullcontext
+from datetime import date
+
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction
+from django.conf import settings
+from django.core.cache import caches
+from django.http import HttpResponse, HttpResponseNotModified
+from django.utils.cache import patch_vary_headers
+from django.utils.http import parse_etags, quote_etag
+
+from .db_router import read_from_primary
+
+# --- Read cache settings (overridable in settings.py) ---
+READ_CACHE_ALIAS = getattr(settings, "READ_CACHE_ALIAS", "default")
+READ_CACHE_TIMEOUT = getattr(settings, "READ_CACHE_TIMEOUT", 300) # seconds; writes invalidate sooner
+# For this long after a write, cache misses are read from the primary instead of the replica
+READ_CACHE_REPLICA_LAG = getattr(settings, "READ_CACHE_REPLICA_LAG", 5) # seconds
+
+DATA_VERSION_KEY = "call_app:read-cache:version"
+RECENT_WRITE_KEY = "call_app:read-cache:recent-write"
+
+
+def _cache():
+    return caches[READ_CACHE_ALIAS]
+
+
+def data_version():
+    """Token that changes on every Booking/CallLog write; part of every cache key and ETag."""
+    version = _cache().get(DATA_VERSION_KEY)
+    if version is None:
+        version = uuid.uuid4().hex
+        # add() so concurrent first readers agree on one token
+        _cache().add(DATA_VERSION_KEY, version, timeout=None)
+        version = _cache().get(DATA_VERSION_KEY, version)
+    return version
+
+
+def invalidate_read_cache(**kwargs):
+    """Drop every cached read response. Connected to post_save/post_delete of Booking and CallLog;
+    bulk writes that skip signals (bulk_create, queryset.update) call it directly."""
+    _cache().set(DATA_VERSION_KEY, uuid.uuid4().hex, timeout=None)
+    if READ_CACHE_REPLICA_LAG:
+        _cache().set(RECENT_WRITE_KEY, True, timeout=READ_CACHE_REPLICA_LAG)
+
+
+def _fresh_reads():
+    # A replica that hasn't replayed the write yet would answer a miss with the old data, which
+    # would then be cached under the new version until it expires
+    if READ_CACHE_REPLICA_LAG and _cache().get(RECENT_WRITE_KEY):
+        return read_from_primary()
+    return nullcontext()
+
+
+def _cache_key(request, version):
+    # The default selections depend on today's date, so the day is part of the key as well
+    raw = "|".join([version, date.today().isoformat(), request.get_full_path(), request.META.get("HTTP_ACCEPT", "")])
+    return "call_app:read-cache:" + hashlib.sha1(raw.encode()).hexdigest()
+
+
+def _not_modified(request, etag):
+    etags = parse_etags(request.META.get("HTTP_IF_NONE_MATCH", ""))
+    return etag in etags or "*" in etags
+
+
+def _from_cache(request):
+    if request.method != "GET":
+        return None, None
+    key = _cache_key(request, data_version())
+    cached = _cache().get(key)
+    if cached is None:
+        return key, None
+    content, content_type, etag = cached
+    if _not_modified(request, etag):
+        response = HttpResponseNotModified()
+        response["ETag"] = etag
+    else:
+        response = _build_response(content, content_type, etag)
+    return key, response
+
+
+def _build_response(content, content_type, etag):
+    response = HttpResponse(content, content_type=content_type)
+    response["ETag"] = etag
+    patch_vary_headers(response, ["Accept"])
+    return response
+
+
+def _store(request, key, response):
+    if key is None or response.status_code != 200 or response.streaming:
+        return response # Errors and NDJSON streams are never cached
+    if hasattr(response, "render") and not response.is_rendered:
+        response.render()
+    etag = quote_etag(hashlib.sha1(response.content).hexdigest())
+    _cache().set(key, (response.content, response["Content-Type"], etag), READ_CACHE_TIMEOUT)
+    if _not_modified(request, etag):
+        not_modified = HttpResponseNotModified()
+        not_modified["ETag"] = etag
+        return not_modified
+    response["ETag"] = etag
+    patch_vary_headers(response, ["Accept"])
+    return response
+
+
+def cached_read(view):
+    """Cache a read endpoint's GET responses until the next Booking/CallLog write.
+
+    Responses carry an ETag; a request whose If-None-Match matches gets a 304 with no body.
+    Misses shortly after a write read from the primary, so a lagging replica isn't cached.
+    Works for function views and ``as_view()`` callables, sync or async.
+    """
+    if iscoroutinefunction(view):
+        async def wrapper(request, *args, **kwargs):
+            key, response = _from_cache(request)
+            if response is not None:
+                return response
+            with _fresh_reads():
+                response = await view(request, *args, **kwargs)
+            return _store(request, key, response)
+        markcoroutinefunction(wrapper)
+    else:
+        def wrapper(request, *args, **kwargs):
+            key, response = _from_cache(request)
+            if response is not None:
+                return response
+            with _fresh_reads():
+                response = view(request, *args, **kwargs)
+            return _store(request, key, response)
+    return functools.wraps(view)(wrapper)
@@ -0,0 +1,168 @@
+# CALLI/backend/call_app/recordings.py
+
+import mimetypes
+import os
+import re
+import shutil
+import uuid
+
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.core.handlers.asgi import ASGIRequest
+from django.http import FileResponse, HttpResponse, StreamingHttpResponse
+from django.utils import timezone
+from django.utils.http import content_disposition_header, http_date
+
+# --- Recording storage settings (overridable in settings.py) ---
+RECORDINGS_ROOT = str(getattr(settings, "RECORDINGS_ROOT", os.path.join(settings.BASE_DIR, "recordings")))
+RECORDING_MAX_BYTES = getattr(settings, "RECORDING_MAX_BYTES", 200 * 1024 * 1024)
+RECORDING_BLOCK_SIZE = getattr(settings, "RECORDING_BLOCK_SIZE", 64 * 1024) # read size when not using sendfile
+
+# Stored recordings are named YYYY/MM/DD/<call_log_id>-<random>.<ext> under RECORDINGS_ROOT
+STORED_RECORDING_RE = re.compile(r"^\d{4}/\d{2}/\d{2}/\d+-[0-9a-f]{32}\.\w+$")
+RANGE_RE = re.compile(r"^bytes=(\d*)-(\d*)$")
+
+
+# --- Storage ---
+
+def is_stored_recording(name):
+    return bool(name) and STORED_RECORDING_RE.match(name) is not None
+
+
+def resolve_recording(name):
+    """Absolute path of a stored recording, or None if ``name`` isn't one (or escapes the root)."""
+    if not is_stored_recording(name):
+        return None
+    root = os.path.realpath(RECORDINGS_ROOT)
+    path = os.path.realpath(os.path.join(root, name))
+    if not path.startswith(root + os.sep) or not os.path.isfile(path):
+        return None
+    return path
+
+
+def store_recording(call_log, uploaded_file):
+    """Write an uploaded recording into the date-sharded store and point ``call_log`` at it.
+
+    The audio is written chunk by chunk (or, for uploads Django already spooled to disk, the
+    temp file is moved), so a long call never sits in worker memory. Returns the stored name.
+    """
+    extension = os.path.splitext(uploaded_file.name)[1].lstrip(".").lower() or "bin"
+    day = timezone.localdate(call_log.timestamp) if call_log.timestamp else timezone.localdate()
+    name = f"{day:%Y/%m/%d}/{call_log.id}-{uuid.uuid4().hex}.{extension}"
+    path = os.path.join(RECORDINGS_ROOT, name)
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+
+    partial = f"{path}.part"
+    if hasattr(uploaded_file, "temporary_file_path"):
+        shutil.move(uploaded_file.temporary_file_path(), partial)
+    else:
+        with open(partial, "wb") as f:
+            for chunk in uploaded_file.chunks():
+                f.write(chunk)
+    os.replace(partial, path) # Readers never see a half-written recording
+
+    previous = resolve_recording(call_log.audio_file)
+    call_log.audio_file = name
+    call_log.save(update_fields=["audio_file"])
+    if previous:
+        os.remove(previous)
+    return name
+
+
+# --- Delivery ---
+
+class _RangeFile:
+    """Read-only view of ``length`` bytes of an open file starting at its current position.
+
+    fileno() is passed through, so WSGI servers with sendfile support (gunicorn's file_wrapper
+    uses the current offset and Content-Length) send the range straight from the page cache.
+    """
+
+    def __init__(self, f, length):
+        self._file = f
+        self._remaining = length
+        self.name = f.name
+
+    def read(self, size=-1):
+        if self._remaining <= 0:
+            return b""
+        size = self._remaining if size is None or size < 0 else min(size, self._remaining)
+        data = self._file.read(size)
+        self._remaining -= len(data)
+        return data
+
+    def fileno(self):
+        return self._file.fileno()
+
+    def close(self):
+        self._file.close()
+
+
+def parse_range(header, size):
+    """(start, end) inclusive for a single ``bytes=`` range; None to serve the whole file;
+    raises ValueError when the range can't be satisfied."""
+    match = RANGE_RE.match(header.strip()) if header else None
+    if match is None:
+        return None # Absent, malformed or multi-range: a full 200 response is always allowed
+    first, last = match.groups()
+    if not first and not last:
+        return None
+    if not first: # bytes=-N: the last N bytes
+        length = int(last)
+        if length == 0:
+            raise ValueError("Empty suffix range")
+        return max(0, size - length), size - 1
+    start = int(first)
+    end = min(int(last), size - 1) if last else size - 1
+    if start >= size or start > end:
+        raise ValueError("Range not satisfiable")
+    return start, end
+
+
+async def _aread_range(path, start, length):
+    # Under ASGI Django reads a sync file iterator into memory before sending it, so the file is
+    # read here one block at a time on a worker thread instead
+    f = await sync_to_async(open, thread_sensitive=False)(path, "rb")
+    read = sync_to_async(f.read, thread_sensitive=False)
+    try:
+        f.seek(start) # No I/O: only sets the offset
+        while length > 0:
+            data = await read(min(RECORDING_BLOCK_SIZE, length))
+            if not data:
+                return
+            length -= len(data)
+            yield data
+    finally:
+        f.close()
+
+
+def recording_response(request, path):
+    """Serve a recording with Range support; the body is streamed, never read into memory."""
+    size = os.path.getsize(path)
+    content_type = mimetypes.guess_type(path)[0] or "application/octet-stream"
+    try:
+        byte_range = parse_range(request.META.get("HTTP_RANGE"), size)
+    except ValueError:
+        response = HttpResponse(status=416)
+        response["Content-Range"] = f"bytes */{size}"
+        return response
+    start, end = byte_range or (0, size - 1)
+    status = 200 if byte_range is None else 206
+
+    if isinstance(request, ASGIRequest):
+        response = StreamingHttpResponse(_aread_range(path, start, end - start + 1), status=status, content_type=content_type)
+        response["Content-Disposition"] = content_disposition_header(False, os.path.basename(path))
+    else:
+        f = open(path, "rb")
+        if byte_range is None:
+            response = FileResponse(f, content_type=content_type)
+        else:
+            f.seek(start)
+            response = FileResponse(_RangeFile(f, end - start + 1), status=206, content_type=content_type)
+        response.block_size = RECORDING_BLOCK_SIZE
+    if byte_range is not None:
+        response["Content-Range"] = f"bytes {start}-{end}/{size}"
+    response["Content-Length"] = end - start + 1
+    response["Accept-Ranges"] = "bytes"
+    response["Last-Modified"] = http_date(os.path.getmtime(path))
+    return response
@@ -0,0 +1,131 @@
+# CALLI/backend/call_app/retries.py
+
+import asyncio
+import random
+from datetime import timedelta
+
+from django.conf import settings
+from django.db import IntegrityError
+from django.utils import timezone
+
+from .campaigns import dial_booking
+from .models import Booking, CallRetry
+
+# --- Retry queue settings (overridable in settings.py) ---
+CALL_RETRY_MAX_ATTEMPTS = getattr(settings, "CALL_RETRY_MAX_ATTEMPTS", 3)
+CALL_RETRY_BASE_DELAY = getattr(settings, "CALL_RETRY_BASE_DELAY", 300) # seconds before the first retry
+CALL_RETRY_MAX_DELAY = getattr(settings, "CALL_RETRY_MAX_DELAY", 6 * 3600)
+CALL_RETRY_BATCH_SIZE = getattr(settings, "CALL_RETRY_BATCH_SIZE", 50) # retries claimed per drain
+CALL_RETRY_CONCURRENCY = getattr(settings, "CALL_RETRY_CONCURRENCY", 5) # retried calls in flight
+CALL_RETRY_STALE_AFTER = getattr(settings, "CALL_RETRY_STALE_AFTER", 3600) # in-progress claims older than this go to review
+
+
+def retry_delay(attempts):
+    """Exponential backoff with jitter: between half and all of base * 2^attempts, capped.
+
+    The jitter spreads retries of calls that failed together (e.g. during a dialer outage)
+    so they don't all come due in the same instant.
+    """
+    delay = min(CALL_RETRY_MAX_DELAY, CALL_RETRY_BASE_DELAY * (2 ** attempts))
+    return random.uniform(delay / 2, delay)
+
+
+async def enqueue_call_retry(booking_id, call_type, error="", delay=None, max_attempts=None):
+    """Queue a retry for a failed call, or return the retry already active for it.
+
+    Raises Booking.DoesNotExist for unknown bookings.
+    """
+    existing = await CallRetry.objects.filter(
+        booking_id=booking_id, call_type=call_type, status__in=CallRetry.ACTIVE_STATUSES
+    ).afirst()
+    if existing is not None:
+        if error:
+            existing.last_error = error
+            await existing.asave(update_fields=["last_error", "updated_at"])
+        return existing
+
+    booking = await Booking.objects.aget(id=booking_id)
+    delay = retry_delay(0) if delay is None else delay
+    try:
+        return await CallRetry.objects.acreate(
+            booking=booking,
+            call_type=call_type,
+            max_attempts=max_attempts or CALL_RETRY_MAX_ATTEMPTS,
+            next_attempt_at=timezone.now() + timedelta(seconds=delay),
+            last_error=error,
+        )
+    except IntegrityError:
+        # Another request queued the same retry concurrently
+        return await CallRetry.objects.aget(
+            booking_id=booking_id, call_type=call_type, status__in=CallRetry.ACTIVE_STATUSES
+        )
+
+
+async def mark_call_failed(booking_id, call_type, error=""):
+    """Give up on a call: active retries for it are marked exhausted. Returns how many."""
+    return await CallRetry.objects.filter(
+        booking_id=booking_id, call_type=call_type, status__in=CallRetry.ACTIVE_STATUSES
+    ).aupdate(status=CallRetry.STATUS_EXHAUSTED, last_error=error, updated_at=timezone.now())
+
+
+async def _claim_due_retries(batch_size):
+    now = timezone.now()
+    # Claims left behind by a drainer that died mid-batch may have been dialed already, so they
+    # are left for review rather than dialed again
+    await CallRetry.objects.filter(
+        status=CallRetry.STATUS_IN_PROGRESS, updated_at__lt=now - timedelta(seconds=CALL_RETRY_STALE_AFTER)
+    ).aupdate(status=CallRetry.STATUS_NEEDS_REVIEW, last_error="Drainer stopped during the attempt", updated_at=now)
+
+    due_ids = [
+        pk async for pk in CallRetry.objects.filter(status=CallRetry.STATUS_PENDING, next_attempt_at__lte=now)
+        .order_by("next_attempt_at").values_list("pk", flat=True)[:batch_size]
+    ]
+    claimed = []
+    for pk in due_ids:
+        # Conditional UPDATE per row: a retry is only dialed by the drainer whose claim wins
+        if await CallRetry.objects.filter(pk=pk, status=CallRetry.STATUS_PENDING).aupdate(
+            status=CallRetry.STATUS_IN_PROGRESS, updated_at=now
+        ):
+            claimed.append(pk)
+    return [retry async for retry in CallRetry.objects.filter(pk__in=claimed).select_related("booking")]
+
+
+async def _record_attempt(retry, result):
+    retry.attempts += 1
+    if result.get("status") == "success":
+        retry.status = CallRetry.STATUS_SUCCEEDED
+        retry.call_log_id = result.get("call_log_id")
+        retry.last_error = ""
+    else:
+        retry.last_error = str(result.get("error", ""))
+        if result.get("call_may_have_been_placed"):
+            # Same rule as make_outbound_call: an ambiguous failure is never redialed automatically
+            retry.status = CallRetry.STATUS_NEEDS_REVIEW
+        elif retry.attempts >= retry.max_attempts:
+            retry.status = CallRetry.STATUS_EXHAUSTED
+        else:
+            retry.status = CallRetry.STATUS_PENDING
+            retry.next_attempt_at = timezone.now() + timedelta(seconds=retry_delay(retry.attempts))
+    await retry.asave(update_fields=["attempts", "status", "call_log", "last_error", "next_attempt_at", "updated_at"])
+
+
+async def _attempt(retry, semaphore):
+    try:
+        result = await dial_booking(retry.booking, retry.call_type, semaphore)
+    except asyncio.CancelledError:
+        # Stopped mid-call (e.g. the scheduler lost its lease): the guest may have been rung
+        await _record_attempt(retry, {"error": "Cancelled during the attempt", "call_may_have_been_placed": True})
+        raise
+    await _record_attempt(retry, result)
+    return retry.status
+
+
+async def drain_call_retries(batch_size=CALL_RETRY_BATCH_SIZE, concurrency=CALL_RETRY_CONCURRENCY):
+    """Dial one batch of due retries, at most ``concurrency`` at a time. Returns counts by outcome."""
+    retries = await _claim_due_retries(batch_size)
+    semaphore = asyncio.Semaphore(concurrency)
+    outcomes = await asyncio.gather(*(_attempt(retry, semaphore) for retry in retries))
+    summary = {"claimed": len(retries), "succeeded": 0, "pending": 0, "exhausted": 0, "needs_review": 0}
+    for outcome in outcomes:
+        summary[outcome] += 1
+    return summary
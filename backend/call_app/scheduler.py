@@ -0,0 +1,302 @@
+# CALLI/backend/call_app/scheduler.py
+
+import asyncio
+import os
+import random
+import socket
+import uuid
+from datetime import timedelta
+
+from django.conf import settings
+from django.db import IntegrityError
+from django.db.models import Q
+from django.utils import timezone
+
+from .campaigns import run_call_campaign
+from .models import ScheduleState, SchedulerLease
+from .retries import drain_call_retries
+from .utils import run_agno_task
+
+# --- Scheduler settings (overridable in settings.py) ---
+# Each schedule selects bookings through BookingManagementAgent for the day `offset_days` away
+# from the run date and dials them through CallAgent. The defaults mirror the n8n workflows:
+# confirmations for tomorrow's check-ins at 10:00, surveys for check-outs two days ago at 14:00.
+CALL_SCHEDULES = getattr(settings, "CALL_SCHEDULES", [
+    {"name": "confirmation-calls", "cron": "0 10 * * *", "call_type": "confirmation", "offset_days": 1},
+    {"name": "survey-calls", "cron": "0 14 * * *", "call_type": "survey", "offset_days": -2},
+])
+SCHEDULER_TICK_SECONDS = getattr(settings, "SCHEDULER_TICK_SECONDS", 15)
+SCHEDULER_LEASE_SECONDS = getattr(settings, "SCHEDULER_LEASE_SECONDS", 60)
+SCHEDULER_JITTER_SECONDS = getattr(settings, "SCHEDULER_JITTER_SECONDS", 30)
+SCHEDULER_CATCHUP_SECONDS = getattr(settings, "SCHEDULER_CATCHUP_SECONDS", 6 * 3600)
+
+LEADER_LEASE_NAME = "call-scheduler"
+
+# Agent action that selects the bookings for each call type
+SELECTION_ACTIONS = {
+    "confirmation": "check_pending_confirmations",
+    "survey": "get_recent_checkouts_for_survey",
+}
+
+
+# --- Cron expressions ---
+
+class CronSchedule:
+    """Standard 5-field cron expression (minute hour day-of-month month day-of-week).
+
+    Supports ``*``, lists, ranges and steps (``*/15``, ``1-5``, ``0,30``). Day-of-week uses
+    0-6 with 0 = Sunday (7 is accepted as Sunday too).
+    """
+
+    RANGES = [(0, 59), (0, 23), (1, 31), (1, 12), (0, 7)]
+
+    def __init__(self, expression):
+        parts = expression.split()
+        if len(parts) != 5:
+            raise ValueError(f"Cron expression needs 5 fields: {expression!r}")
+        self.expression = expression
+        self.minutes, self.hours, self.days, self.months, weekdays = (
+            self._parse(part, low, high) for part, (low, high) in zip(parts, self.RANGES)
+        )
+        self.weekdays = {day % 7 for day in weekdays}
+        self.any_day = parts[2] == "*"
+        self.any_weekday = parts[4] == "*"
+
+    @staticmethod
+    def _parse(field, low, high):
+        values = set()
+        for item in field.split(","):
+            step = 1
+            if "/" in item:
+                item, step = item.split("/")
+                step = int(step)
+            if item == "*":
+                start, end = low, high
+            elif "-" in item:
+                start, end = (int(v) for v in item.split("-"))
+            else:
+                start = end = int(item)
+            if start < low or end > high or start > end or step < 1:
+                raise ValueError(f"Invalid cron field {field!r}")
+            values.update(range(start, end + 1, step))
+        return values
+
+    def _day_matches(self, dt):
+        # Like cron: if both day fields are restricted, either one matching is enough
+        day_ok = dt.day in self.days
+        weekday_ok = (dt.isoweekday() % 7) in self.weekdays
+        if self.any_day:
+            return weekday_ok
+        if self.any_weekday:
+            return day_ok
+        return day_ok or weekday_ok
+
+    def matches(self, dt):
+        return (dt.minute in self.minutes and dt.hour in self.hours
+                and dt.month in self.months and self._day_matches(dt))
+
+    def next_after(self, dt):
+        """First matching minute strictly after ``dt`` (same tzinfo)."""
+        candidate = dt.replace(second=0, microsecond=0) + timedelta(minutes=1)
+        for _ in range(366 * 24 * 60):
+            if candidate.month not in self.months or not self._day_matches(candidate):
+                candidate = (candidate + timedelta(days=1)).replace(hour=0, minute=0)
+                continue
+            if candidate.hour not in self.hours:
+                candidate = (candidate + timedelta(hours=1)).replace(minute=0)
+                continue
+            if candidate.minute in self.minutes:
+                return candidate
+            candidate += timedelta(minutes=1)
+        raise ValueError(f"Cron expression never fires: {self.expression!r}")
+
+
+# --- Schedules ---
+
+class CallSchedule:
+    def __init__(self, name, cron, call_type, offset_days=0, concurrency=None, jitter=SCHEDULER_JITTER_SECONDS):
+        if call_type not in SELECTION_ACTIONS:
+            raise ValueError(f"No booking selection for call type {call_type!r}")
+        self.name = name
+        self.cron = CronSchedule(cron)
+        self.call_type = call_type
+        self.offset_days = offset_days
+        self.concurrency = concurrency
+        self.jitter = jitter
+
+    def due_fire_time(self, now, last_run_at, catchup=SCHEDULER_CATCHUP_SECONDS):
+        """Latest fire time that is due and not yet run, or None.
+
+        Fire times older than the catch-up window are dropped; several missed fire times collapse
+        into one run so a long outage doesn't replay every missed campaign.
+        """
+        local_now = timezone.localtime(now)
+        base = local_now - timedelta(seconds=catchup)
+        if last_run_at is not None:
+            base = max(base, timezone.localtime(last_run_at))
+        fire_time = self.cron.next_after(base)
+        if fire_time > local_now:
+            return None
+        while True:
+            following = self.cron.next_after(fire_time)
+            if following > local_now:
+                return fire_time
+            fire_time = following
+
+    async def run(self, fire_time):
+        target_date = timezone.localtime(fire_time).date() + timedelta(days=self.offset_days)
+        selection = await run_agno_task(
+            task_name=f"Scheduled {self.call_type} selection",
+            description=f"Select {self.call_type} calls for {target_date}",
+            agent_name="BookingManagementAgent",
+            action=SELECTION_ACTIONS[self.call_type],
+            args={"date": target_date, "fields": ["id"]},
+            fast_path=True,
+        )
+        if selection.status != "completed":
+            return {"target_date": target_date, "error": str(selection.error)}
+
+        booking_ids = [row["id"] for row in selection.output]
+        if not booking_ids:
+            return {"target_date": target_date, "summary": {"total": 0}}
+        campaign = await run_call_campaign(self.call_type, booking_ids=booking_ids, concurrency=self.concurrency)
+        return {"target_date": target_date, "summary": campaign["summary"]}
+
+
+def load_schedules(config=None):
+    return [CallSchedule(**entry) for entry in (CALL_SCHEDULES if config is None else config)]
+
+
+# --- Leader election ---
+
+async def acquire_leadership(owner, lease_seconds=SCHEDULER_LEASE_SECONDS):
+    """Take or renew the scheduler lease. Returns True while this process is the leader."""
+    now = timezone.now()
+    expires_at = now + timedelta(seconds=lease_seconds)
+    renewed = await SchedulerLease.objects.filter(
+        Q(name=LEADER_LEASE_NAME) & (Q(owner=owner) | Q(expires_at__lt=now))
+    ).aupdate(owner=owner, expires_at=expires_at)
+    if renewed:
+        return True
+    try:
+        await SchedulerLease.objects.acreate(name=LEADER_LEASE_NAME, owner=owner, expires_at=expires_at)
+    except IntegrityError:
+        return False # Another process holds an unexpired lease
+    return True
+
+
+async def release_leadership(owner):
+    await SchedulerLease.objects.filter(name=LEADER_LEASE_NAME, owner=owner).adelete()
+
+
+# --- Scheduler loop ---
+
+class CallScheduler:
+    def __init__(self, schedules=None, tick=SCHEDULER_TICK_SECONDS, lease_seconds=SCHEDULER_LEASE_SECONDS, log=print):
+        self.schedules = load_schedules() if schedules is None else schedules
+        self.tick = tick
+        self.lease_seconds = lease_seconds
+        self.log = log
+        self.owner = f"{socket.gethostname()}:{os.getpid()}:{uuid.uuid4().hex[:8]}"
+        self.is_leader = False
+        self._running = {} # schedule name -> asyncio.Task
+        self._draining = None # asyncio.Task of the current retry drain
+
+    async def run_due(self, wait=False):
+        """Start every due schedule that isn't already running. Returns the started tasks."""
+        now = timezone.now()
+        started = []
+        for schedule in self.schedules:
+            if schedule.name in self._running:
+                continue
+            state, _ = await ScheduleState.objects.aget_or_create(name=schedule.name)
+            fire_time = schedule.due_fire_time(now, state.last_run_at)
+            if fire_time is None:
+                continue
+            # The fire time is claimed before anything is dialed, so a scheduler that takes the lease
+            # over mid-campaign doesn't run it again. The conditional update loses to a concurrent claim.
+            claimed = await ScheduleState.objects.filter(
+                name=schedule.name, last_run_at=state.last_run_at
+            ).aupdate(last_run_at=fire_time)
+            if not claimed:
+                continue
+            state.last_run_at = fire_time
+            task = asyncio.create_task(self._run_schedule(schedule, state, fire_time))
+            self._running[schedule.name] = task
+            started.append(task)
+        if wait and started:
+            await asyncio.gather(*started)
+        return started
+
+    async def _run_schedule(self, schedule, state, fire_time):
+        try:
+            # Jitter spreads the dialer load when several schedules fire on the same minute
+            await asyncio.sleep(random.uniform(0, schedule.jitter))
+            self.log(f"Running schedule {schedule.name} for {fire_time.isoformat()}")
+            try:
+                result = await schedule.run(fire_time)
+            except asyncio.CancelledError:
+                # Calls already placed stay placed; the fire time stays claimed so they aren't redialed
+                state.last_result = {"error": "Cancelled before finishing"}
+                await state.asave(update_fields=["last_result"])
+                raise
+            except Exception as e:
+                result = {"error": str(e)}
+            state.last_result = result
+            await state.asave(update_fields=["last_result"])
+            self.log(f"Schedule {schedule.name} finished: {result}")
+        finally:
+            self._running.pop(schedule.name, None)
+
+    async def drain_retries(self):
+        # The leader also works through the call retry queue, one bounded batch at a time
+        summary = await drain_call_retries()
+        if summary["claimed"]:
+            self.log(f"Call retries: {summary}")
+
+    def _start_drain(self):
+        if self._draining is None or self._draining.done():
+            self._draining = asyncio.create_task(self.drain_retries())
+        return self._draining
+
+    async def _cancel_work(self):
+        work = [task for task in [*self._running.values(), self._draining] if task is not None and not task.done()]
+        for task in work:
+            task.cancel()
+        await asyncio.gather(*work, return_exceptions=True)
+
+    async def _hold_lease(self):
+        # Renewed on its own schedule, so a long campaign or retry drain can't outlive the lease.
+        # Once it is lost (or can't be renewed) the work started under it is cancelled right away:
+        # the next leader may already be running it.
+        while True:
+            await asyncio.sleep(min(self.tick, self.lease_seconds / 3))
+            try:
+                self.is_leader = await acquire_leadership(self.owner, self.lease_seconds)
+            except Exception as e:
+                self.log(f"Could not renew the leader lease: {e}")
+                self.is_leader = False
+            if not self.is_leader and (self._running or self._draining):
+                self.log("Lost the leader lease; cancelling scheduled calls in progress.")
+                await self._cancel_work()
+
+    async def serve(self, once=False):
+        self.is_leader = await acquire_leadership(self.owner, self.lease_seconds)
+        lease = asyncio.create_task(self._hold_lease())
+        try:
+            while True:
+                if self.is_leader:
+                    started = await self.run_due()
+                    draining = self._start_drain()
+                    if once:
+                        await asyncio.gather(*started, draining, return_exceptions=True)
+                elif once:
+                    self.log("Another scheduler holds the leader lease; nothing to do.")
+                if once:
+                    return
+                await asyncio.sleep(self.tick)
+        finally:
+            lease.cancel()
+            await self._cancel_work()
+            if self.is_leader:
+                await release_leadership(self.owner)
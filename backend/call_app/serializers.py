@@ -1,7 +1,9 @@
 # CALLI/backend/call_app/serializers.py
 
+from django.urls import reverse
 from rest_framework import serializers
-from .models import Booking, CallLog
+from .models import Booking, CallLog, AgentJob, CallRetry
+from .recordings import is_stored_recording
 
 class BookingSerializer(serializers.ModelSerializer):
     class Meta:
@@ -9,6 +11,114 @@ class BookingSerializer(serializers.ModelSerializer):
         fields = '__all__' # Includes all fields from the Booking model
 
 class CallLogSerializer(serializers.ModelSerializer):
+    # Streaming URL of the stored recording; None for calls without one (e.g. simulated calls)
+    recording_url = serializers.SerializerMethodField()
+
     class Meta:
         model = CallLog
-        fields = '__all__' # Includes all fields from the CallLog model
\ No newline at end of file
+        fields = '__all__' # Includes all fields from the CallLog model
+
+    def get_recording_url(self, obj):
+        if not is_stored_recording(obj.audio_file):
+            return None
+        url = reverse('call-recording', args=[obj.pk])
+        request = self.context.get('request')
+        return request.build_absolute_uri(url) if request else url
+
+class CallCampaignSerializer(serializers.Serializer):
+    # Select bookings either explicitly by id or by call_type plus a date window
+    call_type = serializers.ChoiceField(choices=["confirmation", "survey", "upsell"])
+    booking_ids = serializers.ListField(child=serializers.IntegerField(min_value=1), required=False, allow_empty=False)
+    date_from = serializers.DateField(required=False)
+    date_to = serializers.DateField(required=False)
+    concurrency = serializers.IntegerField(required=False, min_value=1)
+
+    def validate(self, data):
+        if not data.get("booking_ids") and not (data.get("date_from") or data.get("date_to")):
+            raise serializers.ValidationError("Provide booking_ids or a date_from/date_to window.")
+        if data.get("date_from") and data.get("date_to") and data["date_from"] > data["date_to"]:
+            raise serializers.ValidationError("date_from must not be after date_to.")
+        return data
+
+
+class AgentJobSerializer(serializers.ModelSerializer):
+    class Meta:
+        model = AgentJob
+        exclude = ['worker', 'heartbeat_at'] # Lease bookkeeping of call_app/jobs.py
+
+
+class BookingSelectionQuerySerializer(serializers.Serializer):
+    # Query parameters of the pending-confirmation and recent-checkouts endpoints
+    SELECTABLE_FIELDS = [
+        "id", "guest_name", "phone_number", "check_in_date", "check_out_date",
+        "room_number", "confirmation_call_made", "survey_completed",
+    ]
+
+    date = serializers.DateField(required=False)
+    date_from = serializers.DateField(required=False)
+    date_to = serializers.DateField(required=False)
+    limit = serializers.IntegerField(required=False, min_value=1, max_value=10000)
+    fields = serializers.CharField(required=False) # Comma-separated, e.g. "id,guest_name,phone_number"
+
+    def validate_fields(self, value):
+        fields = [field.strip() for field in value.split(",") if field.strip()]
+        unknown = [field for field in fields if field not in self.SELECTABLE_FIELDS]
+        if unknown:
+            raise serializers.ValidationError(f"Unknown fields: {', '.join(unknown)}. Choose from {', '.join(self.SELECTABLE_FIELDS)}.")
+        return fields or None
+
+    def validate(self, data):
+        if data.get("date") and (data.get("date_from") or data.get("date_to")):
+            raise serializers.ValidationError("Use either date or date_from/date_to, not both.")
+        if data.get("date_from") and data.get("date_to") and data["date_from"] > data["date_to"]:
+            raise serializers.ValidationError("date_from must not be after date_to.")
+        return data
+
+
+class CallRetryRequestSerializer(serializers.Serializer):
+    # Body of calls/schedule-retry/ and calls/mark-failed/; extra keys (e.g. n8n's retry_count) are ignored
+    booking_id = serializers.IntegerField(min_value=1)
+    call_type = serializers.CharField(max_length=100)
+    error = serializers.CharField(required=False, allow_blank=True, default="")
+    delay_seconds = serializers.IntegerField(required=False, min_value=0) # Overrides the backoff for this retry
+
+
+class CallRetrySerializer(serializers.ModelSerializer):
+    class Meta:
+        model = CallRetry
+        fields = '__all__'
+
+
+class CallResultSerializer(serializers.Serializer):
+    # One telephony call result for calls/results/; guest_name/phone_number default to the booking's
+    booking_id = serializers.IntegerField(min_value=1)
+    call_type = serializers.CharField(max_length=100)
+    status = serializers.CharField(max_length=100)
+    duration = serializers.IntegerField(required=False, allow_null=True, min_value=0)
+    timestamp = serializers.DateTimeField(required=False)
+    guest_name = serializers.CharField(required=False, max_length=255)
+    phone_number = serializers.CharField(required=False, max_length=20)
+    audio_file = serializers.CharField(required=False, allow_null=True, max_length=255)
+
+
+class CallAnalyticsQuerySerializer(serializers.Serializer):
+    # Query parameters of call-analytics/
+    GROUP_BY_FIELDS = ["day", "call_type", "status"]
+
+    date_from = serializers.DateField(required=False)
+    date_to = serializers.DateField(required=False)
+    call_type = serializers.CharField(required=False, max_length=100)
+    status = serializers.CharField(required=False, max_length=100)
+    group_by = serializers.CharField(required=False, default="day") # Comma-separated, e.g. "day,call_type"
+
+    def validate_group_by(self, value):
+        group_by = [field.strip() for field in value.split(",") if field.strip()]
+        unknown = [field for field in group_by if field not in self.GROUP_BY_FIELDS]
+        if unknown:
+            raise serializers.ValidationError(f"Unknown fields: {', '.join(unknown)}. Choose from {', '.join(self.GROUP_BY_FIELDS)}.")
+        return group_by
+
+    def validate(self, data):
+        if data.get("date_from") and data.get("date_to") and data["date_from"] > data["date_to"]:
+            raise serializers.ValidationError("date_from must not be after date_to.")
+        return data
@@ -0,0 +1,218 @@
+# CALLI/backend/call_app/task_store.py
+
+import atexit
+import json
+import threading
+import time
+import uuid
+from collections import OrderedDict
+from datetime import timedelta
+
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.core.serializers.json import DjangoJSONEncoder
+from django.db import close_old_connections
+from django.utils import timezone
+from django.utils.module_loading import import_string
+
+# --- Task store settings (overridable in settings.py) ---
+AGNO_TASK_STORE = getattr(settings, "AGNO_TASK_STORE", "call_app.task_store.DjangoTaskStore")
+AGNO_TASK_STORE_MEMORY_SIZE = getattr(settings, "AGNO_TASK_STORE_MEMORY_SIZE", 1000) # records kept in-process
+AGNO_TASK_STORE_MEMORY_TTL = getattr(settings, "AGNO_TASK_STORE_MEMORY_TTL", 3600) # seconds
+AGNO_TASK_STORE_BATCH_SIZE = getattr(settings, "AGNO_TASK_STORE_BATCH_SIZE", 50)
+AGNO_TASK_STORE_FLUSH_INTERVAL = getattr(settings, "AGNO_TASK_STORE_FLUSH_INTERVAL", 2.0) # seconds
+AGNO_TASK_STORE_RETENTION_DAYS = getattr(settings, "AGNO_TASK_STORE_RETENTION_DAYS", 30) # older records are deleted
+AGNO_TASK_STORE_PURGE_INTERVAL = getattr(settings, "AGNO_TASK_STORE_PURGE_INTERVAL", 3600) # seconds between purges
+
+
+def _json_safe(value):
+    # Outputs are stored as JSON; anything the encoder can't handle is kept as its repr
+    try:
+        json.dumps(value, cls=DjangoJSONEncoder)
+        return value
+    except (TypeError, ValueError):
+        return repr(value)
+
+
+def _output_summary(output):
+    # Stands in for outputs that aren't worth keeping, e.g. the rows of a read-only selection
+    return {"rows": len(output)} if isinstance(output, (list, tuple)) else None
+
+
+def build_task_record(task_name, agent_name, action, result, fast_path=False, duration_ms=None, keep_output=True):
+    output = getattr(result, "output", None)
+    return {
+        "task_id": uuid.uuid4(),
+        "task_name": task_name,
+        "agent_name": agent_name,
+        "action": action,
+        "status": str(result.status),
+        "output": _json_safe(output) if keep_output else _output_summary(output),
+        "error": "" if getattr(result, "error", None) is None else str(result.error),
+        "fast_path": fast_path,
+        "duration_ms": duration_ms,
+        "created_at": timezone.now(),
+    }
+
+
+class MemoryTaskStore:
+    """Bounded in-process task history: LRU capped at ``max_entries`` with a TTL per record."""
+
+    def __init__(self, max_entries=AGNO_TASK_STORE_MEMORY_SIZE, ttl=AGNO_TASK_STORE_MEMORY_TTL):
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self._records = OrderedDict() # task_id -> (record, expires_at monotonic)
+        self._lock = threading.Lock()
+
+    def _remember(self, record):
+        with self._lock:
+            self._records[record["task_id"]] = (record, time.monotonic() + self.ttl)
+            self._records.move_to_end(record["task_id"])
+            while len(self._records) > self.max_entries:
+                self._records.popitem(last=False)
+
+    def _recall(self, task_id):
+        with self._lock:
+            entry = self._records.get(task_id)
+            if entry is None:
+                return None
+            record, expires_at = entry
+            if expires_at <= time.monotonic():
+                del self._records[task_id]
+                return None
+            self._records.move_to_end(task_id)
+            return record
+
+    def record(self, record):
+        self._remember(record)
+
+    async def arecord(self, record):
+        self.record(record)
+
+    def remember(self, record):
+        """Keep a record in the in-memory tier only; it is never persisted."""
+        self._remember(record)
+
+    def get(self, task_id):
+        return self._recall(task_id)
+
+    def recent(self, limit=50):
+        now = time.monotonic()
+        with self._lock:
+            live = [record for record, expires_at in self._records.values() if expires_at > now]
+        return list(reversed(live))[:limit]
+
+    def flush(self):
+        pass
+
+
+class DjangoTaskStore(MemoryTaskStore):
+    """Task history in the AgnoTaskRecord table, shared by every worker and kept across restarts.
+
+    Records are buffered and written with one bulk_create per batch: as soon as ``batch_size``
+    records are waiting, otherwise by a background thread every ``flush_interval`` seconds, and at
+    interpreter exit. Recent records are also kept in the bounded in-memory tier so lookups of
+    just-finished tasks don't hit the database. The same thread deletes records older than
+    ``retention_days`` every ``purge_interval`` seconds.
+    """
+
+    def __init__(self, batch_size=AGNO_TASK_STORE_BATCH_SIZE, flush_interval=AGNO_TASK_STORE_FLUSH_INTERVAL,
+                 retention_days=AGNO_TASK_STORE_RETENTION_DAYS, purge_interval=AGNO_TASK_STORE_PURGE_INTERVAL, **kwargs):
+        super().__init__(**kwargs)
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self.retention_days = retention_days
+        self.purge_interval = purge_interval
+        self._pending = []
+        self._pending_lock = threading.Lock()
+        self._flusher = None
+        atexit.register(self.flush)
+
+    def _buffer(self, record):
+        self._remember(record)
+        self._ensure_flusher()
+        with self._pending_lock:
+            self._pending.append(record)
+            return len(self._pending) >= self.batch_size
+
+    def _ensure_flusher(self):
+        if self._flusher is None:
+            with self._pending_lock:
+                if self._flusher is None:
+                    self._flusher = threading.Thread(target=self._flush_periodically, name="agno-task-store-flusher", daemon=True)
+                    self._flusher.start()
+
+    def _flush_periodically(self):
+        next_purge = time.monotonic()
+        while True:
+            time.sleep(self.flush_interval)
+            try:
+                self.flush()
+                if self.retention_days and time.monotonic() >= next_purge:
+                    next_purge = time.monotonic() + self.purge_interval
+                    self.purge()
+            except Exception as e:
+                print(f"Agno task store purge failed: {e}")
+            finally:
+                close_old_connections()
+
+    def purge(self, days=None):
+        """Delete persisted records older than ``days`` (default: retention_days). Returns how many."""
+        from .models import AgnoTaskRecord
+
+        cutoff = timezone.now() - timedelta(days=self.retention_days if days is None else days)
+        deleted, _ = AgnoTaskRecord.objects.filter(created_at__lt=cutoff).delete()
+        return deleted
+
+    def record(self, record):
+        if self._buffer(record):
+            self.flush()
+
+    async def arecord(self, record):
+        if self._buffer(record):
+            await sync_to_async(self.flush)()
+
+    def flush(self):
+        from .models import AgnoTaskRecord
+
+        with self._pending_lock:
+            pending, self._pending = self._pending, []
+        if not pending:
+            return 0
+        try:
+            AgnoTaskRecord.objects.bulk_create([AgnoTaskRecord(**record) for record in pending])
+        except Exception as e:
+            # Keep the batch for the next flush rather than dropping history on a transient error
+            print(f"Agno task store flush failed, will retry: {e}")
+            with self._pending_lock:
+                self._pending[:0] = pending
+                del self._pending[:-self.max_entries] # Stay bounded if the database stays down
+            return 0
+        return len(pending)
+
+    def get(self, task_id):
+        from .models import AgnoTaskRecord
+
+        record = self._recall(task_id)
+        if record is not None:
+            return record
+        return AgnoTaskRecord.objects.filter(task_id=task_id).values().first()
+
+    def recent(self, limit=50):
+        from .models import AgnoTaskRecord
+
+        self.flush()
+        return list(AgnoTaskRecord.objects.order_by('-created_at').values()[:limit])
+
+
+_task_store = None
+_task_store_lock = threading.Lock()
+
+
+def get_task_store():
+    global _task_store
+    if _task_store is None:
+        with _task_store_lock:
+            if _task_store is None:
+                _task_store = import_string(AGNO_TASK_STORE)()
+    return _task_store
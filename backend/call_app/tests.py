@@ -1,3 +1,351 @@
-from django.test import TestCase
+import asyncio
+import io
+import os
+import tempfile
+from datetime import date, datetime, timedelta
+from unittest import skipUnless
+from unittest.mock import AsyncMock, patch
 
-# Create your tests here.
+from asgiref.sync import sync_to_async
+from django.db import connection
+from django.conf import settings
+from django.http import HttpResponse
+from django.test import AsyncRequestFactory, RequestFactory, SimpleTestCase, TestCase, TransactionTestCase
+from django.utils import timezone
+
+from .importers import import_bookings
+from .db_router import ReadReplicaRouter, read_from_replica
+from .ingestion import CallResultBuffer
+from .jobs import JobRunner
+from .models import AgentJob, AgnoTaskRecord, Booking, CallLog, CallRetry, ScheduleState, SchedulerLease
+from .read_cache import cached_read, invalidate_read_cache
+from .recordings import parse_range, recording_response
+from .retries import _attempt
+from .scheduler import CallSchedule, CallScheduler, acquire_leadership
+from .task_store import DjangoTaskStore
+from .utils import run_agno_task
+
+
+@skipUnless(connection.vendor == 'sqlite', "EXPLAIN QUERY PLAN output is SQLite specific")
+class AgentQueryIndexTests(TestCase):
+    def assertUsesIndex(self, queryset, index_name):
+        plan = queryset.explain()
+        self.assertIn(index_name, plan)
+        self.assertNotIn("SCAN call_app_", plan)
+
+    def test_pending_confirmations_use_partial_index(self):
+        self.assertUsesIndex(Booking.objects.pending_confirmation(date.today()), 'booking_pending_confirm_idx')
+
+    def test_survey_candidates_use_partial_index(self):
+        today = date.today()
+        self.assertUsesIndex(
+            Booking.objects.due_for_survey(today - timedelta(days=7), today),
+            'booking_survey_due_idx',
+        )
+
+    def test_call_history_uses_booking_timestamp_index(self):
+        self.assertUsesIndex(
+            CallLog.objects.filter(booking_id=1).order_by('-timestamp'),
+            'calllog_booking_ts_idx',
+        )
+
+
+class _ProbeSchedule(CallSchedule):
+    # Stands in for the booking selection + campaign; blocks until `release` is set
+    def __init__(self, name='probe'):
+        super().__init__(name, '* * * * *', 'confirmation', jitter=0)
+        self.release = asyncio.Event()
+
+    async def run(self, fire_time):
+        state = await ScheduleState.objects.aget(name=self.name)
+        await self.release.wait()
+        return {'claimed_before_run': state.last_run_at == fire_time}
+
+
+class CallSchedulerTests(TransactionTestCase):
+    # Not TestCase: acquire_leadership relies on a failed INSERT, which would break the test's transaction
+
+    def at(self, *args):
+        return timezone.make_aware(datetime(*args))
+
+    def test_due_fire_time(self):
+        schedule = CallSchedule('daily', '0 10 * * *', 'confirmation')
+        now = self.at(2026, 3, 5, 12, 0)
+        self.assertEqual(schedule.due_fire_time(now, None), self.at(2026, 3, 5, 10, 0))
+        self.assertIsNone(schedule.due_fire_time(now, self.at(2026, 3, 5, 10, 0)))
+        self.assertIsNone(schedule.due_fire_time(self.at(2026, 3, 5, 9, 59), None))
+        # Fire times past the catch-up window are dropped, several missed ones collapse into the latest
+        self.assertIsNone(schedule.due_fire_time(self.at(2026, 3, 5, 17, 0), None))
+        self.assertEqual(
+            schedule.due_fire_time(now, self.at(2026, 3, 1, 10, 0), catchup=7 * 86400),
+            self.at(2026, 3, 5, 10, 0),
+        )
+
+    async def test_leadership(self):
+        self.assertTrue(await acquire_leadership('a'))
+        self.assertFalse(await acquire_leadership('b'))
+        self.assertTrue(await acquire_leadership('a'))
+        await SchedulerLease.objects.aupdate(expires_at=timezone.now() - timedelta(seconds=1))
+        self.assertTrue(await acquire_leadership('b'))
+        self.assertFalse(await acquire_leadership('a'))
+
+    async def test_fire_time_is_claimed_before_the_run(self):
+        schedule = _ProbeSchedule()
+        schedule.release.set()
+        await CallScheduler([schedule], log=lambda message: None).run_due(wait=True)
+        state = await ScheduleState.objects.aget(name='probe')
+        self.assertEqual(state.last_result, {'claimed_before_run': True})
+        # Another scheduler (e.g. a new leader) doesn't run the same fire time again
+        self.assertEqual(await CallScheduler([schedule], log=lambda message: None).run_due(), [])
+
+    async def test_losing_the_lease_cancels_running_schedules(self):
+        schedule = _ProbeSchedule()
+        scheduler = CallScheduler([schedule], tick=0.01, log=lambda message: None)
+        self.assertTrue(await acquire_leadership(scheduler.owner))
+        [task] = await scheduler.run_due()
+        await SchedulerLease.objects.aupdate(owner='other', expires_at=timezone.now() + timedelta(minutes=1))
+
+        lease = asyncio.create_task(scheduler._hold_lease())
+        try:
+            await asyncio.wait_for(asyncio.gather(task, return_exceptions=True), timeout=5)
+        finally:
+            lease.cancel()
+        self.assertTrue(task.cancelled())
+        self.assertFalse(scheduler.is_leader)
+        state = await ScheduleState.objects.aget(name='probe')
+        self.assertEqual(state.last_result, {'error': 'Cancelled before finishing'})
+
+
+def make_booking(**fields):
+    today = date.today()
+    defaults = dict(guest_name='Guest', phone_number='+15550100', room_number='101',
+                    check_in_date=today, check_out_date=today + timedelta(days=2))
+    return Booking.objects.create(**{**defaults, **fields})
+
+
+class CallRetryAttemptTests(TestCase):
+    def setUp(self):
+        self.retry = CallRetry.objects.create(
+            booking=make_booking(), call_type='confirmation', status=CallRetry.STATUS_IN_PROGRESS,
+            max_attempts=2, next_attempt_at=timezone.now(),
+        )
+
+    async def attempt(self, result=None, side_effect=None):
+        retry = await CallRetry.objects.select_related('booking').aget(pk=self.retry.pk)
+        with patch('call_app.retries.dial_booking', AsyncMock(return_value=result, side_effect=side_effect)):
+            status = await _attempt(retry, asyncio.Semaphore(1))
+        await retry.arefresh_from_db()
+        return status, retry
+
+    async def test_success(self):
+        log = await CallLog.objects.acreate(booking=self.retry.booking, guest_name='Guest', phone_number='1',
+                                            call_type='confirmation', status='completed')
+        status, retry = await self.attempt({'status': 'success', 'call_log_id': log.id})
+        self.assertEqual(status, CallRetry.STATUS_SUCCEEDED)
+        self.assertEqual((retry.attempts, retry.call_log_id), (1, log.id))
+
+    async def test_failure_is_retried_until_max_attempts(self):
+        status, retry = await self.attempt({'status': 'failed', 'error': 'busy'})
+        self.assertEqual(status, CallRetry.STATUS_PENDING)
+        self.assertGreater(retry.next_attempt_at, timezone.now())
+        status, retry = await self.attempt({'status': 'failed', 'error': 'busy'})
+        self.assertEqual((status, retry.attempts, retry.last_error), (CallRetry.STATUS_EXHAUSTED, 2, 'busy'))
+
+    async def test_ambiguous_failure_is_not_redialed(self):
+        status, retry = await self.attempt({'status': 'failed', 'error': 'timed out', 'call_may_have_been_placed': True})
+        self.assertEqual(status, CallRetry.STATUS_NEEDS_REVIEW)
+        self.assertEqual(retry.attempts, 1)
+
+    async def test_cancelled_attempt_is_set_aside(self):
+        with self.assertRaises(asyncio.CancelledError):
+            await self.attempt(side_effect=asyncio.CancelledError)
+        await self.retry.arefresh_from_db()
+        self.assertEqual(self.retry.status, CallRetry.STATUS_NEEDS_REVIEW)
+
+
+@patch.object(CallResultBuffer, '_ensure_flusher') # flushed by hand, not from a background thread
+class CallResultBufferTests(TestCase):
+    def setUp(self):
+        self.booking = make_booking()
+        self.buffer = CallResultBuffer(max_size=100)
+
+    def result(self, **fields):
+        return {'booking_id': self.booking.id, 'call_type': 'confirmation', 'status': 'completed', **fields}
+
+    def test_supplied_timestamp_is_kept(self, _):
+        called_at = timezone.make_aware(datetime(2020, 1, 2, 3, 4))
+        self.buffer.add([self.result(timestamp=called_at), self.result()])
+        self.assertEqual(self.buffer.flush()['call_logs'], 2)
+        timestamps = sorted(CallLog.objects.values_list('timestamp', flat=True))
+        self.assertEqual(timestamps[0], called_at)
+        self.assertGreater(timestamps[1], timezone.now() - timedelta(minutes=1))
+        self.booking.refresh_from_db()
+        self.assertTrue(self.booking.confirmation_call_made)
+
+    def test_rows_that_cannot_be_written_are_dropped(self, _):
+        def record_calls(call_logs):
+            if any(log.call_type == 'broken' for log in call_logs):
+                raise ValueError('cannot write')
+
+        self.buffer.add([self.result(), self.result(call_type='broken'), self.result(call_type='survey')])
+        with patch('call_app.ingestion.record_calls', side_effect=record_calls):
+            summary = self.buffer.flush()
+        self.assertEqual(summary['call_logs'], 2)
+        self.assertEqual(self.buffer.stats['dropped'], 1)
+        self.assertEqual(len(self.buffer), 0)
+        self.assertEqual(sorted(CallLog.objects.values_list('call_type', flat=True)), ['confirmation', 'survey'])
+
+    def test_batch_is_kept_when_nothing_can_be_written(self, _):
+        self.buffer.add([self.result(), self.result()])
+        with patch('call_app.ingestion.record_calls', side_effect=ValueError('database down')):
+            self.assertIsNone(self.buffer.try_flush())
+        self.assertEqual(len(self.buffer), 2)
+        self.assertEqual(self.buffer.stats['dropped'], 0)
+        self.assertEqual(self.buffer.flush()['call_logs'], 2)
+
+
+
+class BookingImportTests(TestCase):
+    HEADER = 'guest_name,phone_number,room_number,check_in_date,check_out_date\n'
+
+    def row(self, name):
+        return f'{name},+15550100,101,2030-01-01,2030-01-03\n'
+
+    def test_malformed_csv_line_is_reported_per_row(self):
+        data = self.HEADER + self.row('Ann') + self.row('x' * 200000) + self.row('Bob')
+        report = import_bookings(io.BytesIO(data.encode()), 'csv')
+        self.assertEqual((report['created'], report['failed']), (2, 1))
+        self.assertEqual(report['errors'][0]['row'], 3)
+        self.assertIn('Invalid CSV', report['errors'][0]['errors']['detail'][0])
+        self.assertEqual(sorted(Booking.objects.values_list('guest_name', flat=True)), ['Ann', 'Bob'])
+
+    def test_invalid_rows_do_not_abort_the_import(self):
+        data = self.HEADER + self.row('Ann') + 'Bob,+15550100,101,not a date,2030-01-03\n'
+        report = import_bookings(io.BytesIO(data.encode() + self.row('Caf\xe9').encode('latin-1')), 'csv')
+        self.assertEqual((report['created'], report['failed']), (1, 2))
+        self.assertEqual([error['row'] for error in report['errors']], [3, 4])
+
+
+@patch.dict(settings.DATABASES, {'replica': {}})
+class ReadCacheTests(SimpleTestCase):
+    def setUp(self):
+        self.routed_to = []
+
+        @cached_read
+        def view(request):
+            with read_from_replica():
+                self.routed_to.append(ReadReplicaRouter().db_for_read(Booking) or 'default')
+            return HttpResponse(str(len(self.routed_to)))
+
+        self.view = view
+
+    def get(self):
+        return self.view(RequestFactory().get('/bookings/')).content
+
+    def test_writes_invalidate_and_the_next_miss_reads_the_primary(self):
+        invalidate_read_cache()
+        self.assertEqual(self.get(), b'1')
+        self.assertEqual(self.get(), b'1') # cached
+        with patch('call_app.read_cache.READ_CACHE_REPLICA_LAG', 0):
+            invalidate_read_cache()
+            self.assertEqual(self.get(), b'2')
+        self.assertEqual(self.routed_to, ['default', 'replica'])
+
+class RecordingResponseTests(TestCase):
+    def setUp(self):
+        f = tempfile.NamedTemporaryFile(suffix='.wav', delete=False)
+        f.write(bytes(range(100)))
+        f.close()
+        self.path = f.name
+        self.addCleanup(os.remove, self.path)
+
+    def get(self, range_header=None):
+        headers = {'HTTP_RANGE': range_header} if range_header else {}
+        response = recording_response(RequestFactory().get('/', **headers), self.path)
+        body = b''.join(response.streaming_content) if response.streaming else response.content
+        response.close()
+        return response, body
+
+    def test_parse_range(self):
+        self.assertEqual(parse_range('bytes=10-19', 100), (10, 19))
+        self.assertEqual(parse_range('bytes=90-', 100), (90, 99))
+        self.assertEqual(parse_range('bytes=95-200', 100), (95, 99))
+        self.assertEqual(parse_range('bytes=-10', 100), (90, 99))
+        self.assertEqual(parse_range('bytes=-500', 100), (0, 99))
+        for header in (None, '', 'bytes=-', 'items=0-1', 'bytes=0-1,5-6'):
+            self.assertIsNone(parse_range(header, 100))
+        for header in ('bytes=100-', 'bytes=20-10', 'bytes=-0'):
+            with self.assertRaises(ValueError):
+                parse_range(header, 100)
+
+    def test_whole_file(self):
+        response, body = self.get()
+        self.assertEqual((response.status_code, response['Content-Length'], response['Accept-Ranges']), (200, '100', 'bytes'))
+        self.assertEqual(body, bytes(range(100)))
+
+    def test_range(self):
+        response, body = self.get('bytes=10-19')
+        self.assertEqual(response.status_code, 206)
+        self.assertEqual((response['Content-Range'], response['Content-Length']), ('bytes 10-19/100', '10'))
+        self.assertEqual(body, bytes(range(10, 20)))
+
+    def test_unsatisfiable_range(self):
+        response, _ = self.get('bytes=100-')
+        self.assertEqual((response.status_code, response['Content-Range']), (416, 'bytes */100'))
+
+    async def test_asgi_streams_asynchronously(self):
+        request = AsyncRequestFactory().get('/', headers={'Range': 'bytes=-30'})
+        response = recording_response(request, self.path)
+        self.assertTrue(response.is_async)
+        self.assertEqual((response.status_code, response['Content-Range']), (206, 'bytes 70-99/100'))
+        self.assertEqual(b''.join([chunk async for chunk in response.streaming_content]), bytes(range(70, 100)))
+
+
+class TaskStoreTests(TestCase):
+    async def test_fast_path_reads_are_only_kept_in_memory(self):
+        store = DjangoTaskStore()
+        for _ in range(3):
+            await sync_to_async(make_booking)()
+        with patch('call_app.utils.get_task_store', return_value=store):
+            result = await run_agno_task('Select', '', 'BookingManagementAgent', 'check_pending_confirmations', fast_path=True)
+        self.assertEqual(len(result.output), 3)
+        self.assertEqual(await sync_to_async(store.flush)(), 0)
+        [(record, _)] = store._records.values()
+        self.assertEqual(record['output'], {'rows': 3})
+
+    def test_purge(self):
+        AgnoTaskRecord.objects.create(task_name='old', agent_name='A', action='a', status='completed',
+                                      created_at=timezone.now() - timedelta(days=31))
+        AgnoTaskRecord.objects.create(task_name='new', agent_name='A', action='a', status='completed')
+        self.assertEqual(DjangoTaskStore(retention_days=30).purge(), 1)
+        self.assertEqual(list(AgnoTaskRecord.objects.values_list('task_name', flat=True)), ['new'])
+
+
+class JobRunnerTests(TestCase):
+    def make_job(self, status, heartbeat_at, **fields):
+        return AgentJob.objects.create(task_name='Job', agent_name='', action='run_call_campaign',
+                                       status=status, worker='gone', heartbeat_at=heartbeat_at, **fields)
+
+    async def test_recover_requeues_queued_and_fails_running_jobs(self):
+        stale = timezone.now() - timedelta(hours=1)
+        queued = await sync_to_async(self.make_job)(AgentJob.STATUS_QUEUED, stale)
+        running = await sync_to_async(self.make_job)(AgentJob.STATUS_RUNNING, stale)
+        alive = await sync_to_async(self.make_job)(AgentJob.STATUS_RUNNING, timezone.now())
+        runner = JobRunner()
+        runner.worker_id = 'here'
+        with patch.object(runner, 'schedule') as schedule:
+            self.assertEqual(await runner.recover(), {'requeued': 1, 'failed': 1})
+        schedule.assert_called_once_with(queued.id)
+        for job, status, worker in [(queued, AgentJob.STATUS_QUEUED, 'here'), (running, AgentJob.STATUS_FAILED, 'gone'),
+                                    (alive, AgentJob.STATUS_RUNNING, 'gone')]:
+            await job.arefresh_from_db()
+            self.assertEqual((job.status, job.worker), (status, worker))
+
+    async def test_job_function_result_is_stored(self):
+        job = await sync_to_async(self.make_job)(AgentJob.STATUS_QUEUED, timezone.now(), args={'call_type': 'survey'})
+        campaign = AsyncMock(return_value={'calls_made': 2})
+        with patch.dict('call_app.jobs.JOB_FUNCTIONS', {'run_call_campaign': campaign}):
+            await JobRunner()._execute(job.id)
+        campaign.assert_awaited_once_with(call_type='survey')
+        await job.arefresh_from_db()
+        self.assertEqual((job.status, job.result), (AgentJob.STATUS_COMPLETED, {'calls_made': 2}))
@@ -2,20 +2,39 @@
 
 from django.urls import path
 from . import views
+from .read_cache import cached_read
 
 urlpatterns = [
+    # Lightweight liveness check (used by the dashboard sidebar)
+    path('health/', views.health_view, name='health'),
+
     # Bookings API
-    path('bookings/', views.BookingListCreate.as_view(), name='booking-list-create'),
+    path('bookings/', cached_read(views.BookingListCreate.as_view()), name='booking-list-create'),
+    path('bookings/import/', views.import_bookings_view, name='booking-import'),
     # You might want a detail view later: path('bookings/<int:pk>/', views.BookingDetail.as_view(), name='booking-detail'),
 
     # Call Logs API
-    path('call-logs/', views.CallLogList.as_view(), name='call-log-list'),
+    path('call-logs/', cached_read(views.CallLogList.as_view()), name='call-log-list'),
+    path('call-logs/<int:pk>/recording/', views.call_recording_view, name='call-recording'),
+    path('call-analytics/', views.call_analytics_view, name='call-analytics'),
 
     # Voice Cloning API
     path('clone-voice/', views.clone_voice_view, name='clone-voice'),
+    path('clone-voice/cache-stats/', views.voice_clone_cache_stats_view, name='clone-voice-cache-stats'),
 
     # Outbound Calls API
     path('calls/outbound/', views.initiate_outbound_call_view, name='initiate-outbound-call'),
+    path('calls/campaign/', views.start_call_campaign_view, name='start-call-campaign'),
+    path('calls/schedule-retry/', views.schedule_call_retry_view, name='schedule-call-retry'),
+    path('calls/mark-failed/', views.mark_call_failed_view, name='mark-call-failed'),
+    path('calls/results/', views.ingest_call_results_view, name='ingest-call-results'),
+
+    # Background jobs (?async=true on clone-voice and calls/outbound)
+    path('jobs/<uuid:job_id>/', views.job_status_view, name='job-status'),
+
+    # Agno task history (shared across workers via the task store)
+    path('agno-tasks/', views.agno_task_list_view, name='agno-task-list'),
+    path('agno-tasks/<uuid:task_id>/', views.agno_task_detail_view, name='agno-task-detail'),
 
     # Agno Agent Trigger Endpoints
     path('bookings/pending-confirmation/', views.get_pending_confirmations_view, name='pending-confirmations'),
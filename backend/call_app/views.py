@@ -3,13 +3,33 @@
 from rest_framework import generics, status
 from rest_framework.decorators import api_view # For function-based API views
 from rest_framework.response import Response
-from .models import Booking, CallLog
-from .serializers import BookingSerializer, CallLogSerializer # We'll define these
+from .models import AgentJob, Booking, CallLog
+from .serializers import BookingSerializer, CallLogSerializer, CallCampaignSerializer, AgentJobSerializer, BookingSelectionQuerySerializer, CallRetryRequestSerializer, CallRetrySerializer, CallResultSerializer, CallAnalyticsQuerySerializer
 from .utils import run_agno_task # Import the utility function
+from .importers import detect_import_format, import_bookings
+from .voice_cache import voice_clone_cache
+from .jobs import JobQueueFull, job_is_orphaned, job_runner, spool_job_upload, submit_job
+from .task_store import get_task_store
+from .retries import enqueue_call_retry, mark_call_failed
+from .ingestion import CallResultBufferFull, call_result_buffer
+from .read_cache import cached_read
+from .analytics import call_stats
+from .db_router import replica_queryset
+from .async_api import JSONResponse, async_api_view
+from .metrics import CONTENT_TYPE as METRICS_CONTENT_TYPE, METRICS_ENABLED, METRICS_TOKEN, render_metrics
+from .profiling import list_profiles, profiling_authorized, profiling_exempt, read_profile
+from .recordings import RECORDING_MAX_BYTES, recording_response, resolve_recording, store_recording
+from django.http import Http404, HttpResponse, JsonResponse
+from django.shortcuts import get_object_or_404
+from django.views.decorators.csrf import csrf_exempt
+from .pagination import BookingCursorPagination, CallLogCursorPagination, NDJSONStreamMixin
 import asyncio # For running async Agno tasks
-from django.core.files.storage import default_storage # For saving uploaded files
-from django.core.files.base import ContentFile
-import os # For cleaning up temporary files
+import hmac
+import math
+from asgiref.sync import async_to_sync
+import time
+from django.urls import reverse
+from django.conf import settings
 
 # --- Serializers (Add these to CALLI/backend/call_app/serializers.py) ---
 # Create a new file: CALLI/backend/call_app/serializers.py
@@ -29,56 +49,202 @@ import os # For cleaning up temporary files
 #         fields = '__all__'
 # ---------------------------------------------------------------------
 
+# --- Background job helpers ---
+# Agent-backed endpoints accept ?async=true: the task is queued as an AgentJob and the
+# request returns 202 right away instead of waiting for inference/telephony.
+JOB_STATUS_MAX_WAIT = 30 # seconds a status request may long-poll with ?wait=
+
+def _wants_async(request):
+    return request.query_params.get('async', '').lower() in ('1', 'true', 'yes')
+
+async def _accept_job(request, task_name, agent_name, action, args):
+    try:
+        job = await submit_job(task_name=task_name, agent_name=agent_name, action=action, args=args)
+    except JobQueueFull as e:
+        return JSONResponse({"detail": f"Job queue is full: {e}"}, status=status.HTTP_503_SERVICE_UNAVAILABLE)
+    status_url = request.build_absolute_uri(reverse('job-status', args=[job.id]))
+    return JSONResponse(
+        {"job_id": str(job.id), "status": job.status, "status_url": status_url},
+        status=status.HTTP_202_ACCEPTED,
+        headers={"Location": status_url},
+    )
+
+# --- Health Check ---
+# Liveness probe for the dashboard sidebar: answers without touching the database or the agents
+@api_view(['GET'])
+def health_view(request):
+    return Response({"status": "ok"}, status=status.HTTP_200_OK)
+
+# --- Metrics ---
+# Prometheus scrape target (mounted at /metrics in caller/urls.py); plain Django view so the
+# text exposition format isn't subject to DRF content negotiation
+def metrics_view(request):
+    if not METRICS_ENABLED:
+        raise Http404("Metrics are disabled.")
+    if request.method != 'GET':
+        return HttpResponse(status=405, headers={"Allow": "GET"})
+    if METRICS_TOKEN and not hmac.compare_digest(request.headers.get("Authorization", ""), f"Bearer {METRICS_TOKEN}"):
+        return HttpResponse(status=401, headers={"WWW-Authenticate": "Bearer"})
+    return HttpResponse(render_metrics(), content_type=METRICS_CONTENT_TYPE)
+
+# --- Request Profiles ---
+# Profiles stored by ProfilingMiddleware (mounted at /profiles/ in caller/urls.py). Same
+# X-Calli-Profile token as the profiling trigger; with no token configured, DEBUG only.
+def _profiles_denied(request):
+    if request.method != 'GET':
+        return HttpResponse(status=405, headers={"Allow": "GET"})
+    if not profiling_authorized(request):
+        return HttpResponse(status=403)
+    return None
+
+@profiling_exempt
+def profile_list_view(request):
+    denied = _profiles_denied(request)
+    if denied:
+        return denied
+    profiles = list_profiles()
+    for profile in profiles:
+        profile["download_url"] = request.build_absolute_uri(reverse('profile-download', args=[profile["id"]]))
+    return JsonResponse({"count": len(profiles), "results": profiles})
+
+@profiling_exempt
+def profile_download_view(request, profile_id):
+    # Collapsed stacks: load into speedscope, or `flamegraph.pl <id>.folded > <id>.svg`
+    denied = _profiles_denied(request)
+    if denied:
+        return denied
+    stacks = read_profile(profile_id)
+    if stacks is None:
+        raise Http404("Profile not found.")
+    return HttpResponse(stacks, content_type="text/plain; charset=utf-8",
+                        headers={"Content-Disposition": f'attachment; filename="{profile_id}.folded"'})
+
 # --- Booking API Views ---
-class BookingListCreate(generics.ListCreateAPIView):
+class BookingListCreate(NDJSONStreamMixin, generics.ListCreateAPIView):
     queryset = Booking.objects.all()
     serializer_class = BookingSerializer
+    pagination_class = BookingCursorPagination
+
+    def get_queryset(self):
+        return replica_queryset(super().get_queryset()) # Creates still go to the primary
+
+# Bulk import of a CSV/NDJSON booking export, uploaded as multipart field 'file'
+@api_view(['POST'])
+def import_bookings_view(request):
+    if 'file' not in request.FILES:
+        return Response({"detail": "No file uploaded."}, status=status.HTTP_400_BAD_REQUEST)
+
+    uploaded_file = request.FILES['file']
+    file_format = request.data.get('format') or detect_import_format(uploaded_file.name, uploaded_file.content_type)
+    if file_format not in ("csv", "ndjson"):
+        return Response({"detail": "format must be 'csv' or 'ndjson'."}, status=status.HTTP_400_BAD_REQUEST)
+
+    report = import_bookings(uploaded_file.file, file_format)
+    return Response(report, status=status.HTTP_200_OK)
 
 # class BookingDetail(generics.RetrieveUpdateDestroyAPIView):
 #     queryset = Booking.objects.all()
 #     serializer_class = BookingSerializer
 
 # --- Call Log API Views ---
-class CallLogList(generics.ListAPIView):
+class CallLogList(NDJSONStreamMixin, generics.ListAPIView):
     queryset = CallLog.objects.all()
     serializer_class = CallLogSerializer
+    pagination_class = CallLogCursorPagination
 
-# --- Voice Cloning View ---
+    def get_queryset(self):
+        return replica_queryset(super().get_queryset())
+
+# --- Call Recordings ---
+# GET streams the recording with Range support so players can seek; POST uploads it (field 'file')
 @api_view(['POST'])
-async def clone_voice_view(request):
+def upload_call_recording_view(request, pk):
+    call_log = get_object_or_404(CallLog, pk=pk)
     if 'file' not in request.FILES:
         return Response({"detail": "No file uploaded."}, status=status.HTTP_400_BAD_REQUEST)
+    uploaded_file = request.FILES['file']
+    if uploaded_file.size > RECORDING_MAX_BYTES:
+        return Response({"detail": f"Recording exceeds {RECORDING_MAX_BYTES} bytes."}, status=status.HTTP_413_REQUEST_ENTITY_TOO_LARGE)
+    store_recording(call_log, uploaded_file)
+    return Response(CallLogSerializer(call_log, context={'request': request}).data, status=status.HTTP_201_CREATED)
+
+@csrf_exempt
+def call_recording_view(request, pk):
+    # Plain Django view for downloads: audio players send Accept headers DRF's negotiation would reject
+    if request.method == 'POST':
+        return upload_call_recording_view(request, pk)
+    if request.method not in ('GET', 'HEAD'):
+        return HttpResponse(status=405, headers={"Allow": "GET, HEAD, POST"})
+    audio_file = CallLog.objects.filter(pk=pk).values_list('audio_file', flat=True).first()
+    path = resolve_recording(audio_file)
+    if path is None:
+        raise Http404("No recording stored for this call.")
+    return recording_response(request, path)
+
+# --- Call Analytics ---
+# Aggregates come from the CallDailyStat rollup, so reports never scan the call log
+@cached_read
+@api_view(['GET'])
+def call_analytics_view(request):
+    query = CallAnalyticsQuerySerializer(data=request.query_params)
+    if not query.is_valid():
+        return Response(query.errors, status=status.HTTP_400_BAD_REQUEST)
+    return Response(call_stats(**query.validated_data), status=status.HTTP_200_OK)
+
+# --- Voice Cloning View ---
+VOICE_SAMPLE_MAX_BYTES = getattr(settings, "VOICE_SAMPLE_MAX_BYTES", 20 * 1024 * 1024)
+
+@async_api_view(['POST'])
+async def clone_voice_view(request):
+    # Reject oversized samples from the declared length before any of the body is read
+    content_length = request.META.get('CONTENT_LENGTH')
+    if content_length and content_length.isdigit() and int(content_length) > VOICE_SAMPLE_MAX_BYTES:
+        return JSONResponse({"detail": f"Voice sample exceeds {VOICE_SAMPLE_MAX_BYTES} bytes."}, status=status.HTTP_413_REQUEST_ENTITY_TOO_LARGE)
+
+    if 'file' not in request.FILES:
+        return JSONResponse({"detail": "No file uploaded."}, status=status.HTTP_400_BAD_REQUEST)
 
     uploaded_file = request.FILES['file']
-    file_name = default_storage.save(f"temp_{uploaded_file.name}", ContentFile(uploaded_file.read()))
-    file_path = default_storage.path(file_name)
+    if uploaded_file.size > VOICE_SAMPLE_MAX_BYTES:
+        return JSONResponse({"detail": f"Voice sample exceeds {VOICE_SAMPLE_MAX_BYTES} bytes."}, status=status.HTTP_413_REQUEST_ENTITY_TOO_LARGE)
 
-    try:
-        # Run the Agno task
-        task_result = await run_agno_task(
-            task_name="Clone Voice Task",
-            description=f"Clone voice from {uploaded_file.name}",
-            agent_name="VoiceCloningAgent",
-            action="clone_voice_hf",
-            args={"audio_file_path": file_path}
-        )
+    if _wants_async(request):
+        # The request's upload is gone once it returns, so the job gets its own copy on disk
+        file_path = await asyncio.to_thread(spool_job_upload, uploaded_file)
+        return await _accept_job(request, "Clone Voice Task", "VoiceCloningAgent", "clone_voice_hf", {"audio_file_path": file_path})
 
-        if task_result.status == "completed":
-            return Response({"voice_id": task_result.output.get("voice_id")}, status=status.HTTP_200_OK)
-        else:
-            return Response({"detail": f"Voice cloning failed: {task_result.error}"}, status=status.HTTP_500_INTERNAL_SERVER_ERROR)
-    finally:
-        if os.path.exists(file_path):
-            os.remove(file_path) # Clean up the temporary file
+    # The upload is handed to the agent as-is: Django keeps small files in memory and spools
+    # large ones to a temp file (FILE_UPLOAD_MAX_MEMORY_SIZE), and the agent streams it in chunks.
+    task_result = await run_agno_task(
+        task_name="Clone Voice Task",
+        description=f"Clone voice from {uploaded_file.name}",
+        agent_name="VoiceCloningAgent",
+        action="clone_voice_hf",
+        args={"audio_file": uploaded_file}
+    )
+
+    if task_result.status == "completed":
+        return JSONResponse({"voice_id": task_result.output.get("voice_id")}, status=status.HTTP_200_OK)
+    else:
+        return JSONResponse({"detail": f"Voice cloning failed: {task_result.error}"}, status=status.HTTP_500_INTERNAL_SERVER_ERROR)
+
+
+@api_view(['GET'])
+def voice_clone_cache_stats_view(request):
+    # Hit/miss counters of this worker's voice-clone cache
+    return Response(voice_clone_cache.get_stats(), status=status.HTTP_200_OK)
 
 
 # --- Outbound Call Initiation View ---
-@api_view(['POST'])
+@async_api_view(['POST'])
 async def initiate_outbound_call_view(request):
     call_data = request.data
     required_fields = ["booking_id", "guest_name", "phone_number", "call_type", "room_number"]
     if not all(field in call_data for field in required_fields):
-        return Response({"detail": "Missing required call data fields."}, status=status.HTTP_400_BAD_REQUEST)
+        return JSONResponse({"detail": "Missing required call data fields."}, status=status.HTTP_400_BAD_REQUEST)
+
+    if _wants_async(request):
+        return await _accept_job(request, f"Outbound {call_data['call_type']} Call", "CallAgent", "make_outbound_call", dict(call_data.items()))
 
     # Run the Agno task
     task_result = await run_agno_task(
@@ -90,33 +256,153 @@ async def initiate_outbound_call_view(request):
     )
 
     if task_result.status == "completed":
-        return Response(task_result.output, status=status.HTTP_200_OK)
+        return JSONResponse(task_result.output, status=status.HTTP_200_OK)
     else:
-        return Response({"detail": f"Call simulation failed: {task_result.error}"}, status=status.HTTP_500_INTERNAL_SERVER_ERROR)
+        return JSONResponse({"detail": f"Call simulation failed: {task_result.error}"}, status=status.HTTP_500_INTERNAL_SERVER_ERROR)
 
-# --- Agno Agent Trigger Endpoints ---
+# --- Call Campaign View ---
+# A campaign can dial hundreds of calls, so it always runs as a background AgentJob; the 202
+# response points at jobs/<id>/, whose result is the campaign summary
+@async_api_view(['POST'])
+async def start_call_campaign_view(request):
+    serializer = CallCampaignSerializer(data=request.data)
+    if not serializer.is_valid():
+        return JSONResponse(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
+
+    # Dials every selected booking server-side instead of one HTTP request per booking.
+    # serializer.data is the JSON form of the validated request (dates as ISO strings).
+    return await _accept_job(request, f"{serializer.validated_data['call_type'].title()} call campaign", "", "run_call_campaign", dict(serializer.data))
+
+# --- Call Retry Queue ---
+@api_view(['POST'])
+def schedule_call_retry_view(request):
+    serializer = CallRetryRequestSerializer(data=request.data)
+    if not serializer.is_valid():
+        return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
+    data = serializer.validated_data
+    try:
+        retry = async_to_sync(enqueue_call_retry)(
+            data['booking_id'], data['call_type'], data['error'], delay=data.get('delay_seconds')
+        )
+    except Booking.DoesNotExist:
+        return Response({"detail": f"Booking {data['booking_id']} not found."}, status=status.HTTP_404_NOT_FOUND)
+    return Response(CallRetrySerializer(retry).data, status=status.HTTP_202_ACCEPTED)
+
+@api_view(['POST'])
+def mark_call_failed_view(request):
+    serializer = CallRetryRequestSerializer(data=request.data)
+    if not serializer.is_valid():
+        return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
+    data = serializer.validated_data
+    updated = async_to_sync(mark_call_failed)(data['booking_id'], data['call_type'], data['error'])
+    return Response({"booking_id": data['booking_id'], "call_type": data['call_type'], "retries_exhausted": updated}, status=status.HTTP_200_OK)
+
+# --- Call Result Ingestion ---
+@api_view(['POST'])
+def ingest_call_results_view(request):
+    # Telephony callbacks post one result or a list; results are buffered and written in batches.
+    # ?flush=true writes the buffer before answering, for callers that need the rows right away.
+    many = isinstance(request.data, list)
+    serializer = CallResultSerializer(data=request.data, many=many)
+    if not serializer.is_valid():
+        return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
+    # Once accepted, results are written eventually even if a flush fails now, so errors after
+    # this point must not reach the caller as a failure it would retry (and duplicate)
+    try:
+        accepted = call_result_buffer.add(serializer.validated_data if many else [serializer.validated_data])
+    except CallResultBufferFull as e:
+        return Response({"detail": f"Call result buffer is full: {e}"}, status=status.HTTP_503_SERVICE_UNAVAILABLE,
+                        headers={"Retry-After": "30"})
+    if request.query_params.get('flush', '').lower() in ('1', 'true', 'yes'):
+        flushed = call_result_buffer.try_flush()
+        if flushed is not None:
+            return Response({"accepted": accepted, "flushed": flushed}, status=status.HTTP_200_OK)
+    return Response({"accepted": accepted, "buffered": len(call_result_buffer)}, status=status.HTTP_202_ACCEPTED)
+
+# --- Background Job Status ---
+@async_api_view(['GET'])
+async def job_status_view(request, job_id):
+    # Poll, or long-poll with ?wait=<seconds> until the job finishes. Async, so a waiting poller
+    # holds no worker thread.
+    try:
+        wait = float(request.query_params.get('wait', 0))
+    except ValueError:
+        wait = math.nan
+    if not math.isfinite(wait) or wait < 0:
+        return JSONResponse({"detail": "wait must be a non-negative number of seconds."}, status=status.HTTP_400_BAD_REQUEST)
+
+    deadline = time.monotonic() + min(wait, JOB_STATUS_MAX_WAIT)
+    while True:
+        job = await AgentJob.objects.filter(id=job_id).afirst()
+        if job is None:
+            return JSONResponse({"detail": "Job not found."}, status=status.HTTP_404_NOT_FOUND)
+        if job_is_orphaned(job):
+            # Its process is gone: take over its jobs here rather than leave them queued forever
+            job_runner.start()
+            await job_runner.recover()
+            job = await AgentJob.objects.aget(id=job_id)
+        if job.status in (AgentJob.STATUS_COMPLETED, AgentJob.STATUS_FAILED) or time.monotonic() >= deadline:
+            return JSONResponse(AgentJobSerializer(job).data, status=status.HTTP_200_OK)
+        await asyncio.sleep(0.25)
+
+# --- Agno Task History ---
 @api_view(['GET'])
+def agno_task_list_view(request):
+    try:
+        limit = max(1, min(int(request.query_params.get('limit', 50)), 500))
+    except ValueError:
+        return Response({"detail": "limit must be an integer."}, status=status.HTTP_400_BAD_REQUEST)
+    return Response(get_task_store().recent(limit), status=status.HTTP_200_OK)
+
+@api_view(['GET'])
+def agno_task_detail_view(request, task_id):
+    record = get_task_store().get(task_id)
+    if record is None:
+        return Response({"detail": "Task not found."}, status=status.HTTP_404_NOT_FOUND)
+    return Response(record, status=status.HTTP_200_OK)
+
+# --- Agno Agent Trigger Endpoints ---
+# Agent-backed endpoints (these, clone-voice and calls/outbound) are native async views
+# (call_app/async_api.py): under ASGI they run on the event loop end to end.
+# Dashboard reads are cached until the next Booking/CallLog write, with ETag/If-None-Match support
+@cached_read
+@async_api_view(['GET'])
 async def get_pending_confirmations_view(request):
+    # Optional ?date= / ?date_from= / ?date_to= / ?limit= / ?fields= are applied in SQL
+    query = BookingSelectionQuerySerializer(data=request.query_params)
+    if not query.is_valid():
+        return JSONResponse(query.errors, status=status.HTTP_400_BAD_REQUEST)
+
     task_result = await run_agno_task(
         task_name="Get Pending Confirmations",
         description="Retrieve bookings awaiting confirmation calls",
         agent_name="BookingManagementAgent",
-        action="check_pending_confirmations"
+        action="check_pending_confirmations",
+        args=query.validated_data,
+        fast_path=True # Read-only single-step action, no orchestration needed
     )
     if task_result.status == "completed":
-        return Response(task_result.output, status=status.HTTP_200_OK)
+        return JSONResponse(task_result.output, status=status.HTTP_200_OK)
     else:
-        return Response({"detail": f"Failed to fetch pending confirmations: {task_result.error}"}, status=status.HTTP_500_INTERNAL_SERVER_ERROR)
+        return JSONResponse({"detail": f"Failed to fetch pending confirmations: {task_result.error}"}, status=status.HTTP_500_INTERNAL_SERVER_ERROR)
 
-@api_view(['GET'])
+@cached_read
+@async_api_view(['GET'])
 async def get_recent_checkouts_view(request):
+    # Optional ?date= / ?date_from= / ?date_to= / ?limit= / ?fields= are applied in SQL
+    query = BookingSelectionQuerySerializer(data=request.query_params)
+    if not query.is_valid():
+        return JSONResponse(query.errors, status=status.HTTP_400_BAD_REQUEST)
+
     task_result = await run_agno_task(
         task_name="Get Recent Checkouts for Survey",
         description="Retrieve bookings for which surveys should be sent",
         agent_name="BookingManagementAgent",
-        action="get_recent_checkouts_for_survey"
+        action="get_recent_checkouts_for_survey",
+        args=query.validated_data,
+        fast_path=True # Read-only single-step action, no orchestration needed
     )
     if task_result.status == "completed":
-        return Response(task_result.output, status=status.HTTP_200_OK)
+        return JSONResponse(task_result.output, status=status.HTTP_200_OK)
     else:
-        return Response({"detail": f"Failed to fetch survey candidates: {task_result.error}"}, status=status.HTTP_500_INTERNAL_SERVER_ERROR)
\ No newline at end of file
+        return JSONResponse({"detail": f"Failed to fetch survey candidates: {task_result.error}"}, status=status.HTTP_500_INTERNAL_SERVER_ERROR)
\ No newline at end of file
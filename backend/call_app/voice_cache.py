@@ -0,0 +1,133 @@
+# CALLI/backend/call_app/voice_cache.py
+
+import hashlib
+import threading
+import time
+from collections import OrderedDict
+from datetime import timedelta
+
+from django.conf import settings
+from django.db.models import F
+from django.utils import timezone
+
+from .models import VoiceCloneResult
+
+VOICE_CLONE_CACHE_TTL = getattr(settings, "VOICE_CLONE_CACHE_TTL", 30 * 24 * 3600) # seconds
+VOICE_CLONE_CACHE_MEMORY_SIZE = getattr(settings, "VOICE_CLONE_CACHE_MEMORY_SIZE", 1024) # entries
+
+HASH_CHUNK_SIZE = 1024 * 1024
+
+
+def hash_audio_file(f, chunk_size=HASH_CHUNK_SIZE):
+    """sha256 of a file-like object's full content, read in chunks. Leaves the file rewound."""
+    digest = hashlib.sha256()
+    f.seek(0)
+    while True:
+        chunk = f.read(chunk_size)
+        if not chunk:
+            break
+        digest.update(chunk)
+    f.seek(0)
+    return digest.hexdigest()
+
+
+class VoiceCloneCache:
+    """Content-addressed cache of voice-clone results.
+
+    Lookups go to an in-process LRU first and then to the VoiceCloneResult table; entries older
+    than ``ttl`` seconds are treated as misses and removed.
+    """
+
+    def __init__(self, ttl=VOICE_CLONE_CACHE_TTL, max_memory_entries=VOICE_CLONE_CACHE_MEMORY_SIZE):
+        self.ttl = ttl
+        self.max_memory_entries = max_memory_entries
+        self._entries = OrderedDict() # (content_hash, model_id) -> (voice_id, expires_at monotonic)
+        self._lock = threading.Lock()
+        self.stats = {"memory_hits": 0, "db_hits": 0, "misses": 0, "stores": 0, "evictions": 0, "expired": 0}
+
+    # --- In-process LRU tier ---
+
+    def _memory_get(self, key):
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+            voice_id, expires_at = entry
+            if expires_at <= time.monotonic():
+                del self._entries[key]
+                self.stats["expired"] += 1
+                return None
+            self._entries.move_to_end(key)
+            self.stats["memory_hits"] += 1
+            return voice_id
+
+    def _memory_set(self, key, voice_id, remaining_ttl):
+        with self._lock:
+            self._entries[key] = (voice_id, time.monotonic() + remaining_ttl)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_memory_entries:
+                self._entries.popitem(last=False)
+                self.stats["evictions"] += 1
+
+    def _count(self, stat):
+        with self._lock:
+            self.stats[stat] += 1
+
+    # --- Public API ---
+
+    async def aget(self, content_hash, model_id):
+        key = (content_hash, model_id)
+        voice_id = self._memory_get(key)
+        if voice_id is not None:
+            return voice_id
+
+        cutoff = timezone.now() - timedelta(seconds=self.ttl)
+        try:
+            result = await VoiceCloneResult.objects.aget(content_hash=content_hash, model_id=model_id)
+        except VoiceCloneResult.DoesNotExist:
+            self._count("misses")
+            return None
+        if result.created_at <= cutoff:
+            await VoiceCloneResult.objects.filter(pk=result.pk).adelete()
+            self._count("expired")
+            self._count("misses")
+            return None
+
+        await VoiceCloneResult.objects.filter(pk=result.pk).aupdate(
+            hit_count=F("hit_count") + 1, last_used_at=timezone.now()
+        )
+        remaining = (result.created_at - cutoff).total_seconds()
+        self._memory_set(key, result.voice_id, remaining)
+        self._count("db_hits")
+        return result.voice_id
+
+    async def aset(self, content_hash, model_id, voice_id):
+        # created_at is reset on overwrite so the TTL restarts from the fresh inference
+        await VoiceCloneResult.objects.aupdate_or_create(
+            content_hash=content_hash,
+            model_id=model_id,
+            defaults={"voice_id": voice_id, "created_at": timezone.now(), "hit_count": 0},
+        )
+        self._memory_set((content_hash, model_id), voice_id, self.ttl)
+        self._count("stores")
+
+    def purge_expired(self):
+        """Delete persisted entries past the TTL; returns the number of rows removed."""
+        cutoff = timezone.now() - timedelta(seconds=self.ttl)
+        deleted, _ = VoiceCloneResult.objects.filter(created_at__lte=cutoff).delete()
+        return deleted
+
+    def clear_memory(self):
+        with self._lock:
+            self._entries.clear()
+
+    def get_stats(self):
+        with self._lock:
+            stats = dict(self.stats)
+            stats["memory_entries"] = len(self._entries)
+        lookups = stats["memory_hits"] + stats["db_hits"] + stats["misses"]
+        stats["hit_rate"] = round((stats["memory_hits"] + stats["db_hits"]) / lookups, 4) if lookups else 0.0
+        return stats
+
+
+voice_clone_cache = VoiceCloneCache()
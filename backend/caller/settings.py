@@ -42,6 +42,8 @@ INSTALLED_APPS = [
 ]
 
 MIDDLEWARE = [
+    'call_app.metrics.MetricsMiddleware',  # First, so it times the rest of the stack
+    'call_app.profiling.ProfilingMiddleware',
     'django.middleware.security.SecurityMiddleware',
     'django.contrib.sessions.middleware.SessionMiddleware',
     'django.middleware.common.CommonMiddleware',
@@ -122,3 +124,197 @@ STATIC_URL = 'static/'
 # https://docs.djangoproject.com/en/5.2/ref/settings/#default-auto-field
 
 DEFAULT_AUTO_FIELD = 'django.db.models.BigAutoField'
+
+
+# Call campaigns
+# Number of outbound calls a campaign keeps in flight at once (requests may ask for
+# fewer, never more than the maximum).
+
+CALL_CAMPAIGN_CONCURRENCY = 10
+
+CALL_CAMPAIGN_MAX_CONCURRENCY = 50
+
+
+# Outbound inference HTTP client (Hugging Face)
+# Shared keep-alive pool per event loop; see call_app/http_client.py for the full list of knobs.
+
+INFERENCE_TIMEOUT = 60.0
+
+INFERENCE_MAX_RETRIES = 3
+
+INFERENCE_MAX_CONCURRENCY = 8
+
+
+# Voice sample uploads
+# Uploads above FILE_UPLOAD_MAX_MEMORY_SIZE are spooled to a temp file instead of memory;
+# samples above VOICE_SAMPLE_MAX_BYTES are rejected with 413 before the body is read.
+
+FILE_UPLOAD_MAX_MEMORY_SIZE = 1024 * 1024
+
+VOICE_SAMPLE_MAX_BYTES = 20 * 1024 * 1024
+
+
+# Voice-clone cache
+# Keyed by sha256 of the sample + model id; in-process LRU in front of the VoiceCloneResult table.
+
+VOICE_CLONE_CACHE_TTL = 30 * 24 * 3600  # seconds
+
+VOICE_CLONE_CACHE_MEMORY_SIZE = 1024
+
+
+# Background agent jobs
+# ?async=true on agent-backed endpoints returns 202 and runs the task on a bounded worker pool.
+
+JOB_WORKERS = 4
+
+JOB_MAX_PENDING = 1000
+
+JOB_UPLOAD_DIR = BASE_DIR / 'job_uploads'
+
+# Jobs left queued by a process that stopped are run by another one once their lease
+# (renewed every JOB_HEARTBEAT_INTERVAL seconds) is JOB_LEASE_TIMEOUT old; running ones are
+# marked failed instead of being started twice.
+
+JOB_HEARTBEAT_INTERVAL = 15
+
+JOB_LEASE_TIMEOUT = 60
+
+
+# Agno dispatch
+# Lets run_agno_task(fast_path=True) await read-only single-step actions directly.
+
+AGNO_FAST_PATH_ENABLED = True
+
+AGNO_APP_OPTIONS = {}  # Agno(**AGNO_APP_OPTIONS), e.g. a storage backend that bounds its task history
+
+
+# Agno task store
+# Where run_agno_task records task history: DjangoTaskStore (AgnoTaskRecord table, shared by all
+# workers) or MemoryTaskStore (this process only). Both keep a bounded LRU/TTL tier in memory.
+
+AGNO_TASK_STORE = 'call_app.task_store.DjangoTaskStore'
+
+AGNO_TASK_STORE_MEMORY_SIZE = 1000
+
+AGNO_TASK_STORE_BATCH_SIZE = 50
+
+AGNO_TASK_STORE_FLUSH_INTERVAL = 2.0  # seconds; a background thread writes whatever is buffered
+
+AGNO_TASK_STORE_RETENTION_DAYS = 30  # DjangoTaskStore deletes older records hourly; 0 keeps them all
+
+
+# Call scheduler (python manage.py run_scheduler)
+# Cron-style schedules that replace the n8n confirmation/survey workflows. offset_days picks the
+# check-in (confirmation) or check-out (survey) day relative to the run date.
+
+CALL_SCHEDULES = [
+    {"name": "confirmation-calls", "cron": "0 10 * * *", "call_type": "confirmation", "offset_days": 1},
+    {"name": "survey-calls", "cron": "0 14 * * *", "call_type": "survey", "offset_days": -2},
+]
+
+SCHEDULER_JITTER_SECONDS = 30
+
+SCHEDULER_CATCHUP_SECONDS = 6 * 3600
+
+
+# Call retry queue
+# Failed calls are retried with exponential backoff (base * 2^attempt, jittered, capped) up to
+# CALL_RETRY_MAX_ATTEMPTS, drained in batches by run_scheduler or drain_call_retries. Attempts that
+# may have reached the guest (timeouts after dialing, cancelled attempts) are set aside as
+# needs_review instead of being dialed again.
+
+CALL_RETRY_MAX_ATTEMPTS = 3
+
+CALL_RETRY_BASE_DELAY = 300  # seconds
+
+CALL_RETRY_MAX_DELAY = 6 * 3600
+
+CALL_RETRY_BATCH_SIZE = 50
+
+CALL_RETRY_CONCURRENCY = 5
+
+
+# Call result ingestion (POST calls/results/)
+# Telephony callbacks are buffered and written in batches: one bulk insert of CallLog rows plus
+# one UPDATE per booking flag, in a single transaction.
+
+CALL_RESULT_BUFFER_SIZE = 500  # results that trigger an immediate flush
+
+CALL_RESULT_FLUSH_INTERVAL = 2.0  # seconds
+
+CALL_RESULT_MAX_PENDING = 10000  # while writes fail; further results get 503
+
+
+# Dashboard read cache
+# GET bookings/, call-logs/, bookings/pending-confirmation/ and bookings/recent-checkouts/ are
+# cached until the next Booking/CallLog write and answer If-None-Match with 304. With several
+# worker processes, point READ_CACHE_ALIAS at a shared cache (Redis/Memcached) so a write in one
+# worker invalidates the others; the default local-memory cache is per process.
+
+READ_CACHE_ALIAS = 'default'
+
+READ_CACHE_TIMEOUT = 300  # seconds
+
+# With a read replica (see settings_production.py), misses within this many seconds of a write
+# are read from the primary, so a replica that hasn't caught up yet isn't cached; 0 disables it
+READ_CACHE_REPLICA_LAG = 5  # seconds
+
+
+# Call analytics (GET call-analytics/)
+# Served from the CallDailyStat rollup, which is updated as calls are logged. Backfill or repair
+# it with `python manage.py rebuild_call_stats`.
+
+CALL_ANSWERED_STATUSES = ['completed']
+
+
+# Call recordings (GET/POST call-logs/<id>/recording/)
+# Stored as RECORDINGS_ROOT/YYYY/MM/DD/<call id>-<random>.<ext> and streamed with Range support.
+# Under gunicorn the body goes out via sendfile; behind nginx, RECORDINGS_ROOT can also be
+# served directly.
+
+RECORDINGS_ROOT = BASE_DIR / 'recordings'
+
+RECORDING_MAX_BYTES = 200 * 1024 * 1024
+
+
+# Voice sample preprocessing (call_app/audio.py)
+# WAV samples are downmixed to mono, resampled to the model rate, trimmed of leading/trailing
+# silence, loudness-normalized and capped in length before upload. Benchmark with
+# `python manage.py bench_audio_preprocess`.
+
+VOICE_PREPROCESSING_ENABLED = True
+
+VOICE_SAMPLE_RATE = 16000  # Hz
+
+VOICE_SAMPLE_MAX_SECONDS = 30  # only this much of an upload is decoded
+
+VOICE_TARGET_LOUDNESS_DB = -20.0  # RMS dBFS
+
+
+# Metrics (GET /metrics)
+# Prometheus text format, kept per worker process: request latency and database queries/time per
+# route, run_agno_task latency per agent/action and outbound HTTP latency per host. With
+# METRICS_TOKEN set, scrapes must send `Authorization: Bearer <token>`.
+
+METRICS_ENABLED = True
+
+METRICS_TOKEN = None  # settings_production reads it from the environment
+
+
+# Request profiling (call_app/profiling.py)
+# Requests sent with `X-Calli-Profile: <PROFILING_TOKEN>`, plus a random PROFILING_SAMPLE_RATE
+# share of all requests, are sampled every PROFILING_INTERVAL seconds, covering the ORM and time
+# awaited in Agno tasks (requests shorter than the interval may get no samples). The response
+# names the profile in X-Calli-Profile-Id; the newest PROFILING_MAX_PROFILES are kept in
+# PROFILING_DIR and listed at GET /profiles/ (same header).
+# With neither a token nor a sample rate, the middleware is not loaded.
+
+PROFILING_TOKEN = None  # settings_production reads it from the environment
+
+PROFILING_SAMPLE_RATE = 0.0
+
+PROFILING_INTERVAL = 0.005  # seconds
+
+PROFILING_DIR = BASE_DIR / 'profiles'
+
+PROFILING_MAX_PROFILES = 200
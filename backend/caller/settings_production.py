@@ -0,0 +1,101 @@
+"""
+Production settings for caller project.
+
+Use with DJANGO_SETTINGS_MODULE=caller.settings_production. Everything not overridden here
+comes from caller/settings.py. Configuration is read from the environment:
+
+    DJANGO_SECRET_KEY (required unless DJANGO_DEBUG=1), DJANGO_ALLOWED_HOSTS (comma-separated), DJANGO_DEBUG=1
+    CALLI_DB_ENGINE=sqlite (default) or postgresql (needs psycopg installed)
+    SQLite:     SQLITE_PATH (default BASE_DIR/db.sqlite3), SQLITE_BUSY_TIMEOUT (seconds)
+    PostgreSQL: POSTGRES_DB, POSTGRES_USER, POSTGRES_PASSWORD, POSTGRES_HOST, POSTGRES_PORT,
+                POSTGRES_REPLICA_HOST (optional streaming replica for reads)
+    DB_CONN_MAX_AGE (seconds a connection is reused, default 600)
+    METRICS_TOKEN (bearer token required to scrape /metrics)
+    PROFILING_TOKEN (X-Calli-Profile header value that profiles a request), PROFILING_SAMPLE_RATE
+"""
+
+import os
+
+from django.core.exceptions import ImproperlyConfigured
+
+from .settings import *  # noqa: F401,F403
+from .settings import BASE_DIR, SECRET_KEY as _DEV_SECRET_KEY
+
+# DEBUG keeps every executed query in connection.queries, so it stays off in production
+DEBUG = os.environ.get('DJANGO_DEBUG') == '1'
+
+SECRET_KEY = os.environ.get('DJANGO_SECRET_KEY')
+if not SECRET_KEY:
+    # The key in settings.py is committed to the repository; it is only acceptable with DEBUG on
+    if not DEBUG:
+        raise ImproperlyConfigured('Set DJANGO_SECRET_KEY (or DJANGO_DEBUG=1 for a local run).')
+    SECRET_KEY = _DEV_SECRET_KEY
+
+ALLOWED_HOSTS = [host for host in os.environ.get('DJANGO_ALLOWED_HOSTS', 'localhost,127.0.0.1').split(',') if host]
+
+METRICS_TOKEN = os.environ.get('METRICS_TOKEN') or None
+
+PROFILING_TOKEN = os.environ.get('PROFILING_TOKEN') or None
+PROFILING_SAMPLE_RATE = float(os.environ.get('PROFILING_SAMPLE_RATE', 0))
+
+
+# Database
+# Connections are kept open between requests (CONN_MAX_AGE) and health-checked before reuse, so
+# request threads and the async ORM's worker thread don't reconnect on every request.
+
+DB_CONN_MAX_AGE = int(os.environ.get('DB_CONN_MAX_AGE', 600))
+
+if os.environ.get('CALLI_DB_ENGINE', 'sqlite') == 'postgresql':
+    _postgres = {
+        'ENGINE': 'django.db.backends.postgresql',
+        'NAME': os.environ.get('POSTGRES_DB', 'calli'),
+        'USER': os.environ.get('POSTGRES_USER', 'calli'),
+        'PASSWORD': os.environ.get('POSTGRES_PASSWORD', ''),
+        'HOST': os.environ.get('POSTGRES_HOST', 'localhost'),
+        'PORT': os.environ.get('POSTGRES_PORT', '5432'),
+        'CONN_MAX_AGE': DB_CONN_MAX_AGE,
+        'CONN_HEALTH_CHECKS': True,
+    }
+    DATABASES = {'default': _postgres}
+    if os.environ.get('POSTGRES_REPLICA_HOST'):
+        DATABASES['replica'] = {
+            **_postgres,
+            'HOST': os.environ['POSTGRES_REPLICA_HOST'],
+            'TEST': {'MIRROR': 'default'},
+        }
+else:
+    _sqlite_path = os.environ.get('SQLITE_PATH', str(BASE_DIR / 'db.sqlite3'))
+    _busy_timeout = float(os.environ.get('SQLITE_BUSY_TIMEOUT', 20))
+    DATABASES = {
+        'default': {
+            'ENGINE': 'django.db.backends.sqlite3',
+            'NAME': _sqlite_path,
+            'CONN_MAX_AGE': DB_CONN_MAX_AGE,
+            'CONN_HEALTH_CHECKS': True,
+            'OPTIONS': {
+                # WAL lets readers run alongside the single writer; writers queue for up to
+                # `timeout` seconds instead of failing with "database is locked"
+                'timeout': _busy_timeout,
+                'transaction_mode': 'IMMEDIATE',
+                'init_command': (
+                    'PRAGMA journal_mode=WAL;'
+                    'PRAGMA synchronous=NORMAL;'
+                    'PRAGMA temp_store=MEMORY;'
+                    'PRAGMA mmap_size=134217728'
+                ),
+            },
+        },
+        # Read-only connections to the same file for the routed reads: under WAL they never
+        # wait on the writer, and they can't take the write lock by accident
+        'replica': {
+            'ENGINE': 'django.db.backends.sqlite3',
+            'NAME': f'file:{_sqlite_path}?mode=ro',
+            'CONN_MAX_AGE': DB_CONN_MAX_AGE,
+            'CONN_HEALTH_CHECKS': True,
+            'OPTIONS': {'timeout': _busy_timeout, 'init_command': 'PRAGMA query_only=ON'},
+            'TEST': {'MIRROR': 'default'},
+        },
+    }
+
+# Agent selections and list views read from 'replica' when it is configured
+DATABASE_ROUTERS = ['call_app.db_router.ReadReplicaRouter']
@@ -18,7 +18,12 @@ Including another URLconf
 from django.contrib import admin
 from django.urls import path, include
 
+from call_app.views import metrics_view, profile_download_view, profile_list_view
+
 urlpatterns = [
     path('admin/', admin.site.urls),
     path('api/', include('call_app.urls')),  # Route to your app
+    path('metrics', metrics_view, name='metrics'),  # Prometheus scrape target
+    path('profiles/', profile_list_view, name='profile-list'),  # Request profiles (call_app/profiling.py)
+    path('profiles/<str:profile_id>/', profile_download_view, name='profile-download'),
 ]
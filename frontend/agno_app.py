@@ -1,45 +1,9 @@
 import streamlit as st
 import requests
-from sqlalchemy import create_engine, select # Still needed if you interact with hotel.db directly from frontend
-from sqlalchemy.orm import sessionmaker
-from sqlalchemy.ext.declarative import declarative_base
-from sqlalchemy import Column, Integer, String, Boolean, DateTime, ForeignKey
 import json
 from datetime import datetime
 
-# --- Database Setup (Keep if you still want Streamlit to read from hotel.db directly) ---
-# Note: Ideally, all DB interaction should go through your backend (Django)
-Base = declarative_base()
-
-class Booking(Base):
-    __tablename__ = 'bookings'
-    id = Column(Integer, primary_key=True)
-    guest_name = Column(String)
-    phone_number = Column(String)
-    check_in_date = Column(String)
-    room_number = Column(String)
-    confirmation_call_made = Column(Boolean, default=False)
-    survey_completed = Column(Boolean, default=False)
-    check_out_date = Column(String)
-
-class CallLog(Base):
-    __tablename__ = 'call_logs'
-    id = Column(Integer, primary_key=True)
-    booking_id = Column(Integer, ForeignKey('bookings.id'))
-    guest_name = Column(String)
-    phone_number = Column(String)
-    call_type = Column(String)
-    status = Column(String)
-    duration = Column(Integer)
-    timestamp = Column(String)
-    audio_file = Column(String)
-
-engine = create_engine('sqlite:///hotel.db')
-Base.metadata.create_all(engine)
-Session = sessionmaker(bind=engine)
-
-# Django backend URL (assuming Django runs on 8000)
-API_BASE_URL = "http://localhost:8000/api" # Updated to include /api/ prefix
+import api_client # Pooled session, cached reads and concurrent fetches against the Django API
 
 # --- Streamlit App ---
 st.set_page_config(page_title="AI Hotel Concierge Dashboard", layout="wide")
@@ -64,7 +28,7 @@ if page == "🎤 Voice Cloning":
             # Ensure file is sent as bytes, with a filename and content type
             files = {"file": (audio_file.name, audio_file.getvalue(), audio_file.type)} 
             try:
-                response = requests.post(f"{API_BASE_URL}/clone-voice/", files=files) # Added trailing slash
+                response = api_client.post("clone-voice/", files=files, timeout=api_client.AGENT_REQUEST_TIMEOUT) # Added trailing slash
                 if response.status_code == 200:
                     result = response.json()
                     st.success(f"✅ Voice cloned successfully! Voice ID: {result['voice_id']}")
@@ -99,7 +63,7 @@ elif page == "📋 Booking Management":
                 }
                 
                 try:
-                    response = requests.post(f"{API_BASE_URL}/bookings/", json=booking_data) # Added trailing slash
+                    response = api_client.post("bookings/", json=booking_data) # Added trailing slash
                     if response.status_code == 201: # DRF Create returns 201 Created
                         st.success("✅ Booking added successfully!")
                         st.rerun()
@@ -111,26 +75,24 @@ elif page == "📋 Booking Management":
     with col2:
         st.subheader("📋 Current Bookings")
         try:
-            response = requests.get(f"{API_BASE_URL}/bookings/") # Added trailing slash
-            if response.status_code == 200:
-                bookings = response.json()
-                
-                if bookings:
-                    for booking in bookings:
-                        with st.expander(f"🏨 {booking['guest_name']} - Room {booking['room_number']}"):
-                            col_a, col_b = st.columns(2)
-                            with col_a:
-                                st.write(f"📞 Phone: {booking['phone_number']}")
-                                # Ensure date fields are correctly displayed (they come as strings)
-                                st.write(f"📅 Check-in: {booking['check_in_date']}")
-                                st.write(f"📅 Check-out: {booking['check_out_date']}")
-                            with col_b:
-                                st.write(f"✅ Confirmation Call: {'Done' if booking['confirmation_call_made'] else 'Pending'}")
-                                st.write(f"📊 Survey: {'Completed' if booking['survey_completed'] else 'Pending'}")
-                else:
-                    st.info("No bookings found")
+            bookings = api_client.get_json("bookings/")["results"] # First page of the cursor-paginated list: the newest bookings
+            
+            if bookings:
+                for booking in bookings:
+                    with st.expander(f"🏨 {booking['guest_name']} - Room {booking['room_number']}"):
+                        col_a, col_b = st.columns(2)
+                        with col_a:
+                            st.write(f"📞 Phone: {booking['phone_number']}")
+                            # Ensure date fields are correctly displayed (they come as strings)
+                            st.write(f"📅 Check-in: {booking['check_in_date']}")
+                            st.write(f"📅 Check-out: {booking['check_out_date']}")
+                        with col_b:
+                            st.write(f"✅ Confirmation Call: {'Done' if booking['confirmation_call_made'] else 'Pending'}")
+                            st.write(f"📊 Survey: {'Completed' if booking['survey_completed'] else 'Pending'}")
             else:
-                st.error("Failed to fetch bookings")
+                st.info("No bookings found")
+        except api_client.ApiError:
+            st.error("Failed to fetch bookings")
         except requests.exceptions.RequestException as e:
             st.error("❌ Connection error: Make sure Django server is running") # Updated error message
 
@@ -139,31 +101,32 @@ elif page == "📞 Call Logs":
     st.header("View Call History")
     
     try:
-        response = requests.get(f"{API_BASE_URL}/call-logs/") # Added trailing slash
-        if response.status_code == 200:
-            call_logs = response.json()
-            
-            if call_logs:
-                # Create a more detailed display
-                for log in call_logs:
-                    status_emoji = "✅" if log['status'] == 'completed' else "❌" if log['status'] == 'failed' else "⏳"
-                    
-                    with st.expander(f"{status_emoji} {log['guest_name']} - {log['call_type'].title()} Call"):
-                        col1, col2 = st.columns(2)
-                        with col1:
-                            st.write(f"📞 Phone: {log['phone_number']}")
-                            st.write(f"🔄 Type: {log['call_type']}")
-                            st.write(f"📊 Status: {log['status']}")
-                        with col2:
-                            st.write(f"⏱️ Duration: {log['duration']} seconds" if log['duration'] is not None else "N/A")
-                            # Ensure timestamp is correctly displayed (comes as string)
-                            st.write(f"🕐 Time: {log['timestamp']}")
-                            if log['audio_file']:
-                                st.write(f"🎵 Audio: {log['audio_file']}")
-            else:
-                st.info("No call logs found")
+        call_logs = api_client.get_json("call-logs/")["results"] # Newest calls first
+        
+        if call_logs:
+            # Create a more detailed display
+            for log in call_logs:
+                status_emoji = "✅" if log['status'] == 'completed' else "❌" if log['status'] == 'failed' else "⏳"
+                
+                with st.expander(f"{status_emoji} {log['guest_name']} - {log['call_type'].title()} Call"):
+                    col1, col2 = st.columns(2)
+                    with col1:
+                        st.write(f"📞 Phone: {log['phone_number']}")
+                        st.write(f"🔄 Type: {log['call_type']}")
+                        st.write(f"📊 Status: {log['status']}")
+                    with col2:
+                        st.write(f"⏱️ Duration: {log['duration']} seconds" if log['duration'] is not None else "N/A")
+                        # Ensure timestamp is correctly displayed (comes as string)
+                        st.write(f"🕐 Time: {log['timestamp']}")
+                        if log['audio_file']:
+                            st.write(f"🎵 Audio: {log['audio_file']}")
+                    if log.get('recording_url'):
+                        # The browser fetches the audio itself with Range requests, so seeking doesn't download the whole call
+                        st.audio(log['recording_url'])
         else:
-            st.error("Failed to fetch call logs")
+            st.info("No call logs found")
+    except api_client.ApiError:
+        st.error("Failed to fetch call logs")
     except requests.exceptions.RequestException as e:
         st.error("❌ Connection error: Make sure Django server is running") # Updated error message
 
@@ -172,55 +135,53 @@ elif page == "🔄 Simulate Call":
     st.header("Simulate Guest Interaction")
     
     try:
-        response = requests.get(f"{API_BASE_URL}/bookings/") # Added trailing slash
-        if response.status_code == 200:
-            bookings = response.json()
+        bookings = api_client.get_json("bookings/")["results"] # First page of the cursor-paginated list: the newest bookings
+        
+        if bookings:
+            booking_options = {f"{b['guest_name']} (Room {b['room_number']})": b for b in bookings}
+            selected_booking_key = st.selectbox("Select Booking for Call Simulation", options=list(booking_options.keys()))
             
-            if bookings:
-                booking_options = {f"{b['guest_name']} (Room {b['room_number']})": b for b in bookings}
-                selected_booking_key = st.selectbox("Select Booking for Call Simulation", options=list(booking_options.keys()))
+            if selected_booking_key:
+                selected_booking = booking_options[selected_booking_key]
                 
-                if selected_booking_key:
-                    selected_booking = booking_options[selected_booking_key]
-                    
-                    col1, col2 = st.columns(2)
-                    
-                    with col1:
-                        st.subheader("📋 Booking Details")
-                        st.write(f"**Guest:** {selected_booking['guest_name']}")
-                        st.write(f"**Room:** {selected_booking['room_number']}")
-                        st.write(f"**Phone:** {selected_booking['phone_number']}")
-                        st.write(f"**Check-in:** {selected_booking['check_in_date']}")
+                col1, col2 = st.columns(2)
+                
+                with col1:
+                    st.subheader("📋 Booking Details")
+                    st.write(f"**Guest:** {selected_booking['guest_name']}")
+                    st.write(f"**Room:** {selected_booking['room_number']}")
+                    st.write(f"**Phone:** {selected_booking['phone_number']}")
+                    st.write(f"**Check-in:** {selected_booking['check_in_date']}")
+                
+                with col2:
+                    st.subheader("🎯 Call Type")
+                    call_type = st.selectbox("Select Call Type", ["confirmation", "survey", "upsell"])
                     
-                    with col2:
-                        st.subheader("🎯 Call Type")
-                        call_type = st.selectbox("Select Call Type", ["confirmation", "survey", "upsell"])
-                        
-                        if st.button("📞 Start Call Simulation"):
-                            with st.spinner("Simulating call..."):
-                                call_data = {
-                                    "booking_id": selected_booking['id'],
-                                    "guest_name": selected_booking['guest_name'],
-                                    "phone_number": selected_booking['phone_number'],
-                                    "call_type": call_type,
-                                    "room_number": selected_booking['room_number']
-                                }
-                                
-                                try:
-                                    response = requests.post(f"{API_BASE_URL}/calls/outbound/", json=call_data) # Added trailing slash
-                                    if response.status_code == 200:
-                                        result = response.json()
-                                        st.success(f"✅ Call simulation completed!")
-                                        st.json(result)
-                                        st.balloons()
-                                    else:
-                                        st.error(f"❌ Call simulation failed: {response.text}")
-                                except requests.exceptions.RequestException as e:
-                                    st.error("❌ Connection error: Make sure Django server is running") # Updated error message
-            else:
-                st.info("No bookings available for simulation")
+                    if st.button("📞 Start Call Simulation"):
+                        with st.spinner("Simulating call..."):
+                            call_data = {
+                                "booking_id": selected_booking['id'],
+                                "guest_name": selected_booking['guest_name'],
+                                "phone_number": selected_booking['phone_number'],
+                                "call_type": call_type,
+                                "room_number": selected_booking['room_number']
+                            }
+                            
+                            try:
+                                response = api_client.post("calls/outbound/", json=call_data, timeout=api_client.AGENT_REQUEST_TIMEOUT) # Added trailing slash
+                                if response.status_code == 200:
+                                    result = response.json()
+                                    st.success(f"✅ Call simulation completed!")
+                                    st.json(result)
+                                    st.balloons()
+                                else:
+                                    st.error(f"❌ Call simulation failed: {response.text}")
+                            except requests.exceptions.RequestException as e:
+                                st.error("❌ Connection error: Make sure Django server is running") # Updated error message
         else:
-            st.error("Failed to fetch bookings")
+            st.info("No bookings available for simulation")
+    except api_client.ApiError:
+        st.error("Failed to fetch bookings")
     except requests.exceptions.RequestException as e:
         st.error("❌ Connection error: Make sure Django server is running") # Updated error message
 
@@ -230,45 +191,45 @@ elif page == "🧠 Agno Workflows": # Renamed this page
     
     st.info("This page shows the status of automated workflows orchestrated by Agno Agents. Check Django backend logs for detailed Agno status.") # Updated info
     
+    # Both agent queries run concurrently, so the page waits for the slower one, not their sum
+    workflow_data = api_client.get_many({
+        "pending": "bookings/pending-confirmation/",
+        "candidates": "bookings/recent-checkouts/",
+    })
+
     col1, col2 = st.columns(2)
     
     with col1:
         st.subheader("📅 Pending Confirmations (via Agno Agent)") # Updated text
-        try:
-            response = requests.get(f"{API_BASE_URL}/bookings/pending-confirmation/") # Added trailing slash
-            if response.status_code == 200:
-                pending = response.json()
-                if pending:
-                    for booking in pending:
-                        st.write(f"🏨 {booking['guest_name']} - Room {booking['room_number']}")
-                        st.write(f"📞 {booking['phone_number']}")
-                        st.write(f"📅 Check-in: {booking['check_in_date']}")
-                        st.divider()
-                else:
-                    st.success("✅ No pending confirmations")
-            else:
-                st.error("Failed to fetch pending confirmations")
-        except requests.exceptions.RequestException as e:
+        pending = workflow_data["pending"]
+        if isinstance(pending, api_client.ApiError):
+            st.error("Failed to fetch pending confirmations")
+        elif isinstance(pending, Exception):
             st.error("❌ Connection error: Make sure Django server is running") # Updated error message
+        elif pending:
+            for booking in pending:
+                st.write(f"🏨 {booking['guest_name']} - Room {booking['room_number']}")
+                st.write(f"📞 {booking['phone_number']}")
+                st.write(f"📅 Check-in: {booking['check_in_date']}")
+                st.divider()
+        else:
+            st.success("✅ No pending confirmations")
     
     with col2:
         st.subheader("📊 Survey Candidates (via Agno Agent)") # Updated text
-        try:
-            response = requests.get(f"{API_BASE_URL}/bookings/recent-checkouts/") # Added trailing slash
-            if response.status_code == 200:
-                candidates = response.json()
-                if candidates:
-                    for booking in candidates:
-                        st.write(f"🏨 {booking['guest_name']}")
-                        st.write(f"📞 {booking['phone_number']}")
-                        st.write(f"📅 Checked out: {booking['check_out_date']}")
-                        st.divider()
-                else:
-                    st.success("✅ No survey candidates")
-            else:
-                st.error("Failed to fetch survey candidates")
-        except requests.exceptions.RequestException as e:
+        candidates = workflow_data["candidates"]
+        if isinstance(candidates, api_client.ApiError):
+            st.error("Failed to fetch survey candidates")
+        elif isinstance(candidates, Exception):
             st.error("❌ Connection error: Make sure Django server is running") # Updated error message
+        elif candidates:
+            for booking in candidates:
+                st.write(f"🏨 {booking['guest_name']}")
+                st.write(f"📞 {booking['phone_number']}")
+                st.write(f"📅 Checked out: {booking['check_out_date']}")
+                st.divider()
+        else:
+            st.success("✅ No survey candidates")
     
     # Removed n8n specific status check as Agno is managed within the Django app.
     st.subheader("🔧 Backend Agno Status") # Updated text
@@ -280,12 +241,8 @@ st.sidebar.markdown("---")
 st.sidebar.markdown("### 🚀 Hotel Voice Agent")
 st.sidebar.markdown("AI-powered guest communication system")
 
-# Status indicator in sidebar
-try:
-    response = requests.get(f"{API_BASE_URL}/bookings/", timeout=2) # Pointing to a new Django endpoint
-    if response.status_code == 200:
-        st.sidebar.success("🟢 API Connected")
-    else:
-        st.sidebar.error("🔴 API Error")
-except:
-    st.sidebar.error("🔴 API Disconnected")
\ No newline at end of file
+# Status indicator in sidebar (health/ is a tiny response, cached for a few seconds)
+if api_client.is_healthy():
+    st.sidebar.success("🟢 API Connected")
+else:
+    st.sidebar.error("🔴 API Disconnected")
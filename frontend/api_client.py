@@ -0,0 +1,122 @@
+# CALLI/frontend/api_client.py
+
+import os
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import requests
+from requests.adapters import HTTPAdapter
+
+# Django backend URL (assuming Django runs on 8000)
+API_BASE_URL = os.getenv("CALLI_API_BASE_URL", "http://localhost:8000/api")
+
+READ_CACHE_TTL = float(os.getenv("CALLI_READ_CACHE_TTL", "5")) # seconds a read is served without asking the API
+REQUEST_TIMEOUT = float(os.getenv("CALLI_REQUEST_TIMEOUT", "10"))
+# Agent-backed POSTs answer once the agent is done: a voice clone can take the backend's 60 s
+# inference timeout on each of its 4 attempts (INFERENCE_MAX_RETRIES), plus backoff
+AGENT_REQUEST_TIMEOUT = float(os.getenv("CALLI_AGENT_REQUEST_TIMEOUT", "300"))
+HEALTH_TIMEOUT = 2
+HEALTH_CACHE_TTL = 10
+POOL_SIZE = 10
+
+# Streamlit re-runs the page script on every interaction, but imported modules stay loaded,
+# so the session (and its keep-alive connections) and the read cache live across reruns.
+_session = None
+_session_lock = threading.Lock()
+_cache = {} # (path, params) -> (body, etag, fetched_at monotonic)
+_cache_lock = threading.Lock()
+_executor = ThreadPoolExecutor(max_workers=POOL_SIZE, thread_name_prefix="calli-api")
+
+
+class ApiError(Exception):
+    def __init__(self, response):
+        super().__init__(f"{response.status_code}: {response.text}")
+        self.status_code = response.status_code
+        self.text = response.text
+
+
+def get_session():
+    global _session
+    if _session is None:
+        with _session_lock:
+            if _session is None:
+                session = requests.Session()
+                adapter = HTTPAdapter(pool_connections=POOL_SIZE, pool_maxsize=POOL_SIZE)
+                session.mount("http://", adapter)
+                session.mount("https://", adapter)
+                _session = session
+    return _session
+
+
+def _url(path):
+    return f"{API_BASE_URL}/{path.lstrip('/')}"
+
+
+def get_json(path, params=None, ttl=READ_CACHE_TTL, timeout=REQUEST_TIMEOUT):
+    """GET an API path and return the decoded JSON.
+
+    Responses are reused for ``ttl`` seconds; after that the request is revalidated with
+    If-None-Match, so unchanged data comes back as an empty 304. Raises ApiError for error
+    statuses and requests.exceptions.RequestException when the API is unreachable.
+    """
+    key = (path, tuple(sorted((params or {}).items())))
+    with _cache_lock:
+        cached = _cache.get(key)
+    if cached and time.monotonic() - cached[2] < ttl:
+        return cached[0]
+
+    headers = {"If-None-Match": cached[1]} if cached and cached[1] else {}
+    response = get_session().get(_url(path), params=params, headers=headers, timeout=timeout)
+    if response.status_code == 304 and cached:
+        body = cached[0]
+    elif response.status_code == 200:
+        body = response.json()
+    else:
+        raise ApiError(response)
+    with _cache_lock:
+        _cache[key] = (body, response.headers.get("ETag") or (cached and cached[1]), time.monotonic())
+    return body
+
+
+def get_many(requests_by_name):
+    """Fetch several paths concurrently: {name: path or (path, params)} -> {name: JSON or exception}.
+
+    The page waits for the slowest call instead of the sum of all of them.
+    """
+    futures = {}
+    for name, request in requests_by_name.items():
+        path, params = request if isinstance(request, tuple) else (request, None)
+        futures[name] = _executor.submit(get_json, path, params)
+    results = {}
+    for name, future in futures.items():
+        try:
+            results[name] = future.result()
+        except Exception as e:
+            results[name] = e
+    return results
+
+
+def post(path, **kwargs):
+    """POST to an API path. Cached reads are dropped so the next render shows the change.
+
+    Waits up to REQUEST_TIMEOUT unless ``timeout`` is given (AGENT_REQUEST_TIMEOUT for agent endpoints).
+    """
+    kwargs.setdefault("timeout", REQUEST_TIMEOUT)
+    response = get_session().post(_url(path), **kwargs)
+    invalidate()
+    return response
+
+
+def invalidate():
+    with _cache_lock:
+        _cache.clear()
+
+
+def is_healthy():
+    """Cheap connectivity check against health/, cached for a few seconds."""
+    try:
+        get_json("health/", ttl=HEALTH_CACHE_TTL, timeout=HEALTH_TIMEOUT)
+        return True
+    except (ApiError, requests.exceptions.RequestException):
+        return False